@@ -0,0 +1,34 @@
+import sys
+sys.path.append("..")
+import time
+from src.compact import *
+from src.sock import *
+"""
+Bytes per pattern for plain text directions against the compact template encoding, and how fast compact patterns decode.
+"""
+
+GUAGE=Guage((30,4),(30,4),'in')
+
+def run(n=5000):
+    sizes=[7+i/10 for i in range(40) if round(GUAGE.stitches(0.9*(7+i/10))/2)%2==0]
+    patterns=[ToeUpSockPattern({'around_foot':sizes[i%len(sizes)],'toe_to_heel':8+(i%30)/10},GUAGE,verbose=False).directions() for i in range(n)]
+    archive=DirectionArchive()
+    start=time.perf_counter()
+    for d in patterns:
+        archive.append(d)
+    encode_time=time.perf_counter()-start
+    text_bytes=sum(len("\n".join(d).encode()) for d in patterns)
+    template_bytes=len(json.dumps(archive.templates.to_list()).encode())
+    print(f"{n} patterns, {len(archive.templates)} templates ({template_bytes} bytes)")
+    print(f"text: {text_bytes/n:.1f} bytes per pattern")
+    print(f"compact: {archive.n_bytes()/n:.1f} bytes per pattern ({(archive.n_bytes()+template_bytes)/n:.1f} with the templates)")
+    start=time.perf_counter()
+    decoded=list(archive)
+    decode_time=time.perf_counter()-start
+    if decoded!=patterns:
+        raise ValueError("Decoded directions don't match the text they were encoded from.")
+    print(f"encode: {n/encode_time:.0f} patterns/s")
+    print(f"decode: {n/decode_time:.0f} patterns/s")
+
+if __name__=="__main__":
+    run()
@@ -0,0 +1,39 @@
+import sys
+sys.path.append("..")
+import time
+from multiprocessing import Pool
+from src.sharedmem import *
+"""
+Time multiprocess generation that pickles whole patterns back to the parent against generate_shared,
+which returns counts and directions through one shared memory block.
+"""
+
+GUAGE={"s_per_unit":[30,4],"r_per_unit":[30,4],"units":"in"}
+
+def make_sock(record):
+    pattern=pattern_from_record(record)
+    #Build every section so the pickled pattern carries what the shared version writes
+    pattern.pattern_sections
+    pattern.directions()
+    return pattern
+
+def run(n=20000,processes=4):
+    sizes=[7+i/10 for i in range(40) if round(30/4*0.9*(7+i/10)/2)%2==0]
+    records=[{"around_foot":sizes[i%len(sizes)],"toe_to_heel":8+(i%30)/10,"guage":GUAGE} for i in range(n)]
+    print(f"Generating {n} patterns in {processes} processes")
+    start=time.perf_counter()
+    with Pool(processes) as pool:
+        patterns=pool.map(make_sock,records,chunksize=256)
+    pickled=time.perf_counter()-start
+    print(f"pickled patterns: {pickled:.3f}s")
+    start=time.perf_counter()
+    with generate_shared(records,processes=processes) as batch:
+        shared=time.perf_counter()-start
+        if batch.n_errors:
+            raise ValueError(f"{batch.n_errors} patterns failed.")
+        if list(batch["s_around_foot"])!=[p.stitches.s_around_foot for p in patterns]:
+            raise ValueError("Shared results don't match pickled results.")
+    print(f"shared memory: {shared:.3f}s ({pickled/shared:.2f}x)")
+
+if __name__=="__main__":
+    run()
@@ -0,0 +1,36 @@
+import sys
+sys.path.append("..")
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.sock import *
+"""
+Time sock pattern generation serially and in a ThreadPoolExecutor.
+On a free-threaded CPython build (python3.13t and later) the threads run in parallel.
+"""
+
+GUAGE=Guage((30,4),(30,4),'in')
+
+def make_sock(foot_measure_dict):
+    return ToeUpSockPattern(foot_measure_dict,GUAGE,verbose=False).directions()
+
+def run(n=2000,workers=(1,2,4,8)):
+    #Only feet where the toe casts on an even number of stitches
+    sizes=[7+i/10 for i in range(40) if round(GUAGE.stitches(0.9*(7+i/10))/2)%2==0]
+    feet=[{'around_foot':sizes[i%len(sizes)],'toe_to_heel':8+(i%30)/10} for i in range(n)]
+    gil=getattr(sys,"_is_gil_enabled",lambda:True)()
+    print(f"Generating {n} patterns. GIL enabled: {gil}")
+    start=time.perf_counter()
+    serial=[make_sock(f) for f in feet]
+    serial_time=time.perf_counter()-start
+    print(f"serial: {serial_time:.3f}s")
+    for w in workers:
+        start=time.perf_counter()
+        with ThreadPoolExecutor(max_workers=w) as pool:
+            threaded=list(pool.map(make_sock,feet))
+        t=time.perf_counter()-start
+        if threaded!=serial:
+            raise ValueError(f"Threaded results with {w} workers don't match serial results.")
+        print(f"{w} threads: {t:.3f}s ({serial_time/t:.2f}x)")
+
+if __name__=="__main__":
+    run()
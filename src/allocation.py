@@ -0,0 +1,219 @@
+from bisect import bisect_left, insort
+from src.catalog import _read_records
+from src.sock import *
+"""
+Assign skeins from a warehouse inventory to sock orders. Each order needs enough yards of its yarn weight (worked out from its
+pattern's sections) and all of an order's skeins come from one dye lot. Orders are placed largest first: the lots that can
+hold an order are found by bisecting the lots of its yarn weight sorted by yards left, and the lot and skeins that leave the
+fewest yards over are used.
+"""
+
+SKEIN_FIELDS=["skein","weight","lot","yards"]
+#Yarn in one knit stitch, in stitch widths. Rule of thumb: a pair of fingering weight knee-highs takes about 400 yards.
+YARN_PER_STITCH=4.5
+#Extra yarn on top of the estimate (swatch, tails, gauge drift)
+SPARE=0.1
+#Lots (smallest big enough first) checked for the fewest yards left over
+CANDIDATE_LOTS=4
+
+def pattern_stitches(pattern):
+    """
+    Stitches knit in one sock: each section's average stitches times its rows
+    """
+    total=0
+    for s in pattern.pattern_sections:
+        if s is not None:
+            total+=(s.start_stitches()+s.end_stitches())/2*s.n_rows()
+    return total
+
+def yards_needed(pattern,socks=2,spare=SPARE,yarn_per_stitch=YARN_PER_STITCH):
+    """
+    Yards of yarn to knit socks socks from a pattern
+    """
+    g=pattern.guage
+    #Stitch width in inches
+    stitch_width=g.s_per_unit[1]/g.s_per_unit[0]/(2.54 if g.units=='cm' else 1)
+    return pattern_stitches(pattern)*socks*stitch_width*yarn_per_stitch/36*(1+spare)
+
+class OrderYarn(NamedTuple):
+    """
+    Yarn one order needs
+    order: order id
+    yarn_weight: integer 0-7 (see YarnWeight)
+    yards: yards needed
+    """
+    order:object
+    yarn_weight:int
+    yards:float
+
+def order_yarn(order,pattern,yarn_weight,socks=2,spare=SPARE):
+    """
+    OrderYarn for an order knit from pattern in yarn_weight (an int or YarnWeight)
+    """
+    yarn_weight=yarn_weight.value if isinstance(yarn_weight,YarnWeight) else int(yarn_weight)
+    if yarn_weight not in RECOMMENDED_NEEDLES_IN_MM:
+        raise ValueError(f"Yarn weight must be an integer between 0 and 7. Weight given is {yarn_weight}")
+    return OrderYarn(order,yarn_weight,yards_needed(pattern,socks=socks,spare=spare))
+
+class Skein(NamedTuple):
+    """
+    One skein in the warehouse
+    skein: skein id
+    lot: dye lot
+    """
+    skein:object
+    yarn_weight:int
+    lot:object
+    yards:float
+
+class Allocation(NamedTuple):
+    """
+    Skeins given to one order
+    skeins: skein ids
+    yards: yards of those skeins
+    leftover: yards - order's yards
+    """
+    order:object
+    lot:object
+    skeins:tuple
+    yards:float
+    leftover:float
+
+class AllocationResult(NamedTuple):
+    """
+    allocations: list of Allocation in the order the orders were given
+    unfilled: OrderYarns no single dye lot could fill
+    """
+    allocations:list
+    unfilled:list
+
+    def leftover(self):
+        return sum(a.leftover for a in self.allocations)
+
+    def __str__(self):
+        return "{0} orders filled, {1} unfilled, {2:.0f} yards left over.".format(len(self.allocations),len(self.unfilled),self.leftover())
+
+class _Lot:
+    """
+    Skeins of one dye lot that haven't been given out, sorted by yards
+    """
+    __slots__=("lot","yards","skeins","total")
+
+    def __init__(self,lot):
+        self.lot=lot
+        self.yards=[]
+        self.skeins=[]
+        self.total=0
+
+    def add(self,skein):
+        i=bisect_left(self.yards,skein.yards)
+        self.yards.insert(i,skein.yards)
+        self.skeins.insert(i,skein.skein)
+        self.total+=skein.yards
+
+    def pick(self,yards):
+        """
+        Positions of the skeins that cover yards with little left over: the largest skeins until one skein can finish
+        the order, then the smallest skein that does
+        """
+        picked=[]
+        need=yards
+        top=len(self.yards)-1
+        while need>0:
+            if top<0:
+                return None
+            if self.yards[top]>=need:
+                picked.append(bisect_left(self.yards,need,0,top+1))
+                return picked
+            picked.append(top)
+            need-=self.yards[top]
+            top-=1
+        return picked
+
+    def take(self,positions):
+        taken=[]
+        for i in sorted(positions,reverse=True):
+            taken.append((self.skeins.pop(i),self.yards.pop(i)))
+        self.total-=sum(y for s,y in taken)
+        return taken[::-1]
+
+class Inventory:
+    """
+    Skeins by yarn weight and dye lot.
+    Members
+    _lots: dictionary of (yarn weight,lot) to _Lot
+    _by_total: dictionary of yarn weight to a sorted list of (yards left,lot) for its lots
+    """
+    def __init__(self,skeins=()):
+        self._lots={}
+        for s in skeins:
+            key=(s.yarn_weight,s.lot)
+            if key not in self._lots:
+                self._lots[key]=_Lot(s.lot)
+            self._lots[key].add(s)
+        self._by_total={}
+        for (weight,lot),l in self._lots.items():
+            self._by_total.setdefault(weight,[]).append((l.total,lot))
+        for totals in self._by_total.values():
+            totals.sort()
+
+    @classmethod
+    def from_records(cls,records):
+        """
+        Inventory from dictionaries with SKEIN_FIELDS
+        """
+        return cls(Skein(r["skein"],int(r["weight"]),r["lot"],float(r["yards"])) for r in records)
+
+    @classmethod
+    def load(cls,path):
+        """
+        Load skeins from a .csv or .json file with columns: skein,weight,lot,yards
+        """
+        return cls.from_records(_read_records(path,SKEIN_FIELDS))
+
+    def yards(self,yarn_weight=None):
+        return sum(l.total for (w,lot),l in self._lots.items() if yarn_weight is None or w==yarn_weight)
+
+    def _place(self,order,candidates):
+        """
+        Give an order skeins from the lot (of the candidates smallest lots big enough) that leaves the fewest yards over
+        """
+        totals=self._by_total.get(order.yarn_weight)
+        if not totals:
+            return None
+        best=None
+        start=bisect_left(totals,(order.yards,))
+        for total,lot in totals[start:start+candidates]:
+            l=self._lots[(order.yarn_weight,lot)]
+            positions=l.pick(order.yards)
+            if positions is None:
+                continue
+            yards=sum(l.yards[i] for i in positions)
+            if best is None or yards<best[0]:
+                best=(yards,lot,positions)
+        if best is None:
+            return None
+        yards,lot,positions=best
+        l=self._lots[(order.yarn_weight,lot)]
+        del totals[bisect_left(totals,(l.total,lot))]
+        taken=l.take(positions)
+        if l.skeins:
+            insort(totals,(l.total,lot))
+        return Allocation(order.order,lot,tuple(s for s,y in taken),yards,yards-order.yards)
+
+    def allocate(self,orders,candidates=CANDIDATE_LOTS):
+        """
+        AllocationResult for OrderYarns. Skeins given out are taken out of the inventory.
+        """
+        orders=list(orders)
+        placed={}
+        for i in sorted(range(len(orders)),key=lambda i:-orders[i].yards):
+            placed[i]=self._place(orders[i],candidates)
+        return AllocationResult([placed[i] for i in range(len(orders)) if placed[i] is not None],
+            [o for i,o in enumerate(orders) if placed[i] is None])
+
+    def __len__(self):
+        return sum(len(l.skeins) for l in self._lots.values())
+
+    def __str__(self):
+        return f"Inventory of {len(self)} skeins in {len(self._lots)} dye lots."
@@ -0,0 +1,233 @@
+import csv
+import json
+from bisect import bisect_left, bisect_right
+from statistics import median
+from src.conversions import *
+"""
+Yarn and needle catalogs loaded from data files, with an interval index for range queries.
+"""
+
+YARN_FIELDS=["name","weight","s_min","s_max","needle_min","needle_max"]
+NEEDLE_FIELDS=["mm","us","uk"]
+
+class YarnRecord(NamedTuple):
+    """
+    NamedTuple for a commercial yarn.
+    s_min, s_max: recommended stitches per 4 inches
+    needle_min, needle_max: recommended needle sizes in mm
+    """
+    name:str
+    weight:int
+    s_min:float
+    s_max:float
+    needle_min:float
+    needle_max:float
+
+    def covers(self,s_per_4=None,needle_size=None):
+        """
+        True if the yarn's stitch range covers s_per_4 and its needle range covers needle_size (either can be None)
+        """
+        if s_per_4 is not None and not (self.s_min<=s_per_4<=self.s_max):
+            return False
+        if needle_size is not None and not (self.needle_min<=needle_size<=self.needle_max):
+            return False
+        return True
+
+class _IntervalNode:
+    """
+    Node of a centered interval tree. Intervals that contain center are stored twice: sorted by low end and by high end.
+    """
+    __slots__=("center","lows","by_low","highs","by_high","left","right")
+
+    def __init__(self,center,here,left,right):
+        self.center=center
+        by_low=sorted(here,key=lambda i:i[0])
+        by_high=sorted(here,key=lambda i:i[1])
+        self.lows=[i[0] for i in by_low]
+        self.by_low=[i[2] for i in by_low]
+        self.highs=[i[1] for i in by_high]
+        self.by_high=[i[2] for i in by_high]
+        self.left=left
+        self.right=right
+
+class IntervalIndex:
+    """
+    Static centered interval tree over (low,high,item) triples (both ends inclusive).
+    stab(point) returns every item whose interval contains point in O(log n + k).
+    """
+    def __init__(self,intervals):
+        intervals=list(intervals)
+        for lo,hi,_ in intervals:
+            if lo>hi:
+                raise ValueError(f"Interval low end {lo} is larger than high end {hi}.")
+        self._size=len(intervals)
+        self._root=self._build(intervals)
+
+    def _build(self,intervals):
+        if len(intervals)==0:
+            return None
+        ends=sorted(e for lo,hi,_ in intervals for e in (lo,hi))
+        center=ends[len(ends)//2]
+        here=[i for i in intervals if i[0]<=center<=i[1]]
+        left=[i for i in intervals if i[1]<center]
+        right=[i for i in intervals if i[0]>center]
+        return _IntervalNode(center,here,self._build(left),self._build(right))
+
+    def stab(self,point):
+        """
+        List of items whose interval contains point
+        """
+        found=[]
+        node=self._root
+        while node is not None:
+            if point<node.center:
+                found.extend(node.by_low[:bisect_right(node.lows,point)])
+                node=node.left
+            elif point>node.center:
+                found.extend(node.by_high[bisect_left(node.highs,point):])
+                node=node.right
+            else:
+                found.extend(node.by_low)
+                break
+        return found
+
+    def __len__(self):
+        return self._size
+
+def _parse_size(v):
+    """
+    Needle sizes in data files can be numbers, strings like '000' or blank.
+    """
+    if v is None:
+        return None
+    if not isinstance(v,str):
+        return v
+    v=v.strip()
+    if v=="":
+        return None
+    if v.startswith("0") and len(v)>1 and "." not in v:
+        return v
+    try:
+        return int(v)
+    except ValueError:
+        pass
+    try:
+        return float(v)
+    except ValueError:
+        return v
+
+def _read_records(path,fields):
+    """
+    Read a list of dictionaries from a .csv file (with a header) or a .json file (a list of objects)
+    """
+    if str(path).endswith(".csv"):
+        with open(path,newline="") as f:
+            records=list(csv.DictReader(f))
+    elif str(path).endswith(".json"):
+        with open(path) as f:
+            records=json.load(f)
+    else:
+        raise ValueError(f"Catalog files must be .csv or .json. File given: {path}")
+    for r in records:
+        missing=set(fields)-set(r.keys())
+        if missing:
+            raise ValueError(f"Catalog record {r} is missing: {missing}")
+    return records
+
+def load_needle_chart(path):
+    """
+    Load a needle chart (mm,us,uk) from a data file. Returns a dictionary indexed by mm like NEEDLE_CHART.
+    """
+    chart={}
+    for r in _read_records(path,NEEDLE_FIELDS):
+        mm=float(r["mm"])
+        chart[mm]=Needle(mm=mm,us=_parse_size(r["us"]),uk=_parse_size(r["uk"]))
+    return chart
+
+class YarnCatalog:
+    """
+    A catalog of yarns indexed by stitch range and needle range.
+    Members:
+    _yarns: list of YarnRecords
+    _by_stitches: IntervalIndex on (s_min,s_max)
+    _by_needle: IntervalIndex on (needle_min,needle_max)
+    """
+    def __init__(self,yarns):
+        self._yarns=list(yarns)
+        self._by_stitches=IntervalIndex((y.s_min,y.s_max,y) for y in self._yarns)
+        self._by_needle=IntervalIndex((y.needle_min,y.needle_max,y) for y in self._yarns)
+
+    @classmethod
+    def load(cls,path):
+        """
+        Load yarn records from a .csv or .json file with columns: name,weight,s_min,s_max,needle_min,needle_max
+        """
+        yarns=[]
+        for r in _read_records(path,YARN_FIELDS):
+            yarns.append(YarnRecord(str(r["name"]),int(r["weight"]),float(r["s_min"]),float(r["s_max"]),
+                float(r["needle_min"]),float(r["needle_max"])))
+        return cls(yarns)
+
+    @classmethod
+    def from_standard(cls):
+        """
+        Catalog with one generic yarn per yarn weight from STITCHES_PER_4_INCHES and RECOMMENDED_NEEDLES_IN_MM
+        """
+        yarns=[]
+        for w in YarnWeight:
+            stitches=list(STITCHES_PER_4_INCHES[w.value])
+            needles=RECOMMENDED_NEEDLES_IN_MM[w.value]
+            yarns.append(YarnRecord(w.name.lower(),w.value,min(stitches),max(stitches),min(needles),max(needles)))
+        return cls(yarns)
+
+    def query(self,s_per_4=None,needle_size=None,weight=None):
+        """
+        All yarns whose stitch range covers s_per_4 and whose needle range covers needle_size, optionally of one yarn weight.
+        With both, each index is stabbed and the smaller result is kept where the larger has the same yarn.
+        """
+        if s_per_4 is not None and needle_size is not None:
+            found=sorted((self._by_stitches.stab(s_per_4),self._by_needle.stab(needle_size)),key=len)
+            in_both={id(y) for y in found[1]}
+            found=[y for y in found[0] if id(y) in in_both]
+        elif s_per_4 is not None:
+            found=self._by_stitches.stab(s_per_4)
+        elif needle_size is not None:
+            found=self._by_needle.stab(needle_size)
+        else:
+            found=self._yarns
+        return [y for y in found if weight is None or y.weight==weight]
+
+    def __len__(self):
+        return len(self._yarns)
+
+    def __iter__(self):
+        return iter(self._yarns)
+
+    def __str__(self):
+        return f"Yarn catalog with {len(self)} yarns."
+
+class CatalogGuage(StandardGuage):
+    """
+    StandardGuage that guesses stitches per 4 inches from the yarns in a YarnCatalog.
+    Falls back to the standard yarn weight tables when the catalog has no yarn for the weight and needle.
+    """
+    def __init__(self,catalog):
+        self.catalog=catalog
+
+    def _guess_s_per_4(self,yarn_weight,needle_size,knitter):
+        if needle_size is None:
+            needle_size=self._guess_needle_size(yarn_weight,knitter=knitter)
+        yarns=self.catalog.query(needle_size=needle_size,weight=yarn_weight)
+        if len(yarns)==0:
+            return super()._guess_s_per_4(yarn_weight,needle_size,knitter)
+        #Same idea as StandardGuage: larger needles and looser knitters move toward the bottom of each yarn's stitch range
+        guesses=[]
+        for y in yarns:
+            needle_span=y.needle_max-y.needle_min
+            needle_pos=(needle_size-y.needle_min)/needle_span if needle_span>0 else 0.5
+            s_pos=min(max((knitter+(1-needle_pos))/2,0),1)
+            guesses.append(y.s_min+s_pos*(y.s_max-y.s_min))
+        return round(median(guesses))
+
+    def __str__(self):
+        return "Class to guess guage from a yarn catalog: {0}".format(self.catalog)
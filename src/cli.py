@@ -0,0 +1,102 @@
+import argparse
+import json
+import os
+import sys
+from src.sock import *
+from src.i18n import DEFAULT_LANGUAGE, languages, render
+"""
+Command-line pipeline stage: read foot measurement and guage records as JSONL on stdin, write one pattern record per line on stdout.
+
+    python -m src.cli < feet.jsonl > patterns.jsonl
+
+Input records have around_foot and toe_to_heel plus either a guage or a yarn weight to guess the guage from:
+    {"id": 1, "around_foot": 8.2, "toe_to_heel": 9.5, "guage": {"s_per_unit": [30, 4], "r_per_unit": [30, 4], "units": "in"}}
+    {"id": 2, "around_foot": 8.2, "toe_to_heel": 9.5, "yarn_weight": 1, "needle_size": 2.25, "knitter": 0.5}
+Optional keys: "ease" (measurements already ease adjusted), "units" (with yarn_weight)
+and leg measurements for a leg with calf shaping: "leg_length", "around_calf", "around_ankle" and "calf_height".
+Records that can't be made into a sock are written as {"line": n, "id": ..., "error": "..."}.
+"""
+
+#Errors from a record that can't be made into a sock (e.g. a zero in a guage is an ArithmeticError). Written as error records.
+RECORD_ERRORS=(ValueError,KeyError,TypeError,AttributeError,ArithmeticError,Warning)
+
+def guage_from_record(record):
+    """
+    Guage from a record's "guage" object or a StandardGuage guess from "yarn_weight"
+    """
+    g=record.get("guage")
+    if g is not None:
+        return Guage(tuple(g["s_per_unit"]),tuple(g["r_per_unit"]),g.get("units","in"))
+    if "yarn_weight" in record:
+        knitter=record.get("knitter",0.5)
+        if not 0<=knitter<1:
+            raise ValueError(f"knitter must be at least 0 and less than 1. Knitter given is {knitter}.")
+        return StandardGuage().guess_guage(record["yarn_weight"],units=record.get("units","in"),
+            needle_size=record.get("needle_size"),knitter=knitter)
+    raise ValueError("Record needs a guage or a yarn_weight.")
+
+def pattern_from_record(record,pattern_class=ToeUpSockPattern):
+    """
+    Quiet (verbose=False) sock pattern for one input record. A foot too short for its toe and heel is a ValueError.
+    """
+    foot_measure_dict={k:record[k] for k in ("around_foot","toe_to_heel")}
+    foot_measure_dict.update({k:record[k] for k in LEG_CIRCUMFERENCES+LEG_LENGTHS if k in record})
+    pattern=pattern_class(foot_measure_dict,guage_from_record(record),verbose=False,ease=record.get("ease",False))
+    if pattern.stitches.instep_rows<0:
+        raise ValueError(f"Foot is too short for its toe and heel: {pattern.stitches.instep_rows} instep rows.")
+    return pattern
+
+def pattern_record(pattern,directions=True,language=DEFAULT_LANGUAGE):
+    """
+    Dictionary of stitch counts, section counts and (optionally) rendered directions for a pattern, in language
+    """
+    sections={}
+    for name,s in zip(SockPatternSections._fields,pattern.pattern_sections):
+        if s is not None:
+            sections[name]={"start_stitches":s.start_stitches(),"end_stitches":s.end_stitches(),"n_rows":s.n_rows()}
+    record={"stitches":pattern.stitches._asdict(),"guage":pattern.guage._asdict(),"sections":sections}
+    if directions:
+        record["directions"]=list(render(pattern,language))
+    return record
+
+def process(lines,out,directions=True,pattern_class=ToeUpSockPattern,first_line=1,language=DEFAULT_LANGUAGE):
+    """
+    Turn each JSONL input line into one JSONL output line. Works one line at a time and flushes after every line.
+    first_line is the line number of the first line (for error records when lines are part of a bigger file).
+    Returns the number of error records written.
+    """
+    n_errors=0
+    for n,line in enumerate(lines,start=first_line):
+        if line.strip()=="":
+            continue
+        record={}
+        try:
+            record=json.loads(line)
+            result=pattern_record(pattern_from_record(record,pattern_class),directions=directions,language=language)
+        except RECORD_ERRORS as e:
+            result={"line":n,"error":str(e)}
+            n_errors+=1
+        if isinstance(record,dict) and "id" in record:
+            result={"id":record["id"],**result}
+        out.write(json.dumps(result)+"\n")
+        out.flush()
+    return n_errors
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(description="Read foot measurement JSONL on stdin and write toe-up sock pattern JSONL on stdout.")
+    parser.add_argument("--no-directions",action="store_true",help="Only write stitch and row counts.")
+    parser.add_argument("--strict",action="store_true",help="Exit with status 1 if any record failed.")
+    parser.add_argument("--language",default=DEFAULT_LANGUAGE,choices=languages(),help="Language for directions.")
+    args=parser.parse_args(argv)
+    try:
+        n_errors=process(sys.stdin,sys.stdout,directions=not args.no_directions,language=args.language)
+    except BrokenPipeError:
+        #The next stage stopped reading (e.g. head). Don't let Python complain when it flushes stdout on exit.
+        os.dup2(os.open(os.devnull,os.O_WRONLY),sys.stdout.fileno())
+        return 1
+    if args.strict and n_errors>0:
+        return 1
+    return 0
+
+if __name__=="__main__":
+    sys.exit(main())
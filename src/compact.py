@@ -0,0 +1,201 @@
+import json
+import re
+"""
+Compact storage for rendered directions. Almost all of a pattern's text is boilerplate shared with every other pattern
+(pattern_repeat lines, cuff lines, heel rows), so each line is stored as a template from a shared dictionary plus the numbers
+that fill it in. Decoding gives back exactly the text that was encoded.
+"""
+
+#Numbers in directions: ints, decimals, float reprs and Fractions. "p2tog" is text, not a number (a number can't run into a letter).
+NUMBER=re.compile(r"\d+(?:\.\d+)?(?:e[-+]?\d+)?(?:/\d+)?(?![A-Za-z0-9]|\.\d)")
+#Numbers stored as ints: ASCII digits with no leading zero (int() would also take "٣", which decodes as "3")
+PLAIN_INT=re.compile(r"0|[1-9][0-9]*")
+MAGIC=b"KNITDIR1"
+
+#Parameter tags (the low 2 bits of a parameter's varint)
+INT=0
+INT_POINT_ZERO=1
+TEXT=2
+
+def write_varint(out,n):
+    """
+    Append n (an int >= 0) to bytearray out, 7 bits per byte
+    """
+    while n>=0x80:
+        out.append((n&0x7f)|0x80)
+        n>>=7
+    out.append(n)
+
+def read_varint(data,pos):
+    """
+    Read a varint from data at pos. Returns (value,next position).
+    """
+    n=0
+    shift=0
+    while True:
+        b=data[pos]
+        pos+=1
+        n|=(b&0x7f)<<shift
+        if b<0x80:
+            return n,pos
+        shift+=7
+
+def _is_plain_int(text):
+    return PLAIN_INT.fullmatch(text) is not None
+
+def split_line(line):
+    """
+    Split a line of directions into its template (the text between numbers) and its numbers (as text).
+    """
+    literals=[]
+    params=[]
+    last=0
+    for m in NUMBER.finditer(line):
+        literals.append(line[last:m.start()])
+        params.append(m.group())
+        last=m.end()
+    literals.append(line[last:])
+    return tuple(literals),params
+
+class DirectionTemplates:
+    """
+    Shared template dictionary. Patterns are encoded to bytes that only make sense with the same (or a grown) dictionary.
+    Members
+    _templates: list of templates (tuples of the text between numbers), indexed by template id
+    _ids: dictionary of template to template id
+    """
+    def __init__(self,templates=()):
+        self._templates=[]
+        self._ids={}
+        for t in templates:
+            self.template_id(tuple(t))
+
+    def __len__(self):
+        return len(self._templates)
+
+    def template_id(self,template):
+        """
+        Id of a template, adding it to the dictionary if it's new
+        """
+        i=self._ids.get(template)
+        if i is None:
+            i=len(self._templates)
+            self._templates.append(template)
+            self._ids[template]=i
+        return i
+
+    def encode(self,directions):
+        """
+        Bytes for a sequence of direction lines: line count, then a template id and the template's numbers for each line.
+        """
+        out=bytearray()
+        write_varint(out,len(directions))
+        for line in directions:
+            template,params=split_line(line)
+            write_varint(out,self.template_id(template))
+            for p in params:
+                if _is_plain_int(p):
+                    write_varint(out,(int(p)<<2)|INT)
+                elif p.endswith(".0") and _is_plain_int(p[:-2]):
+                    write_varint(out,(int(p[:-2])<<2)|INT_POINT_ZERO)
+                else:
+                    data=p.encode()
+                    write_varint(out,(len(data)<<2)|TEXT)
+                    out+=data
+        return bytes(out)
+
+    def decode(self,data):
+        """
+        Direction lines (a tuple, like SockPattern.directions) from bytes made by encode
+        """
+        n_lines,pos=read_varint(data,0)
+        lines=[]
+        for i in range(n_lines):
+            t,pos=read_varint(data,pos)
+            template=self._templates[t]
+            parts=[template[0]]
+            for literal in template[1:]:
+                v,pos=read_varint(data,pos)
+                tag=v&3
+                if tag==TEXT:
+                    end=pos+(v>>2)
+                    parts.append(bytes(data[pos:end]).decode())
+                    pos=end
+                elif tag==INT_POINT_ZERO:
+                    parts.append(f"{v>>2}.0")
+                else:
+                    parts.append(str(v>>2))
+                parts.append(literal)
+            lines.append("".join(parts))
+        return tuple(lines)
+
+    def to_list(self):
+        return [list(t) for t in self._templates]
+
+class DirectionArchive:
+    """
+    Directions for many patterns sharing one DirectionTemplates. Patterns are stored encoded and expanded to text when asked for.
+    Members
+    templates: DirectionTemplates shared by every pattern in the archive
+    _records: encoded bytes for each pattern
+    """
+    def __init__(self,templates=None):
+        self.templates=templates if templates is not None else DirectionTemplates()
+        self._records=[]
+
+    def append(self,directions):
+        """
+        Add a pattern's direction lines (e.g. pattern.directions()). Returns its index.
+        """
+        self._records.append(self.templates.encode(directions))
+        return len(self._records)-1
+
+    def add_pattern(self,pattern):
+        return self.append(pattern.directions())
+
+    def __len__(self):
+        return len(self._records)
+
+    def __getitem__(self,i):
+        return self.templates.decode(self._records[i])
+
+    def __iter__(self):
+        for r in self._records:
+            yield self.templates.decode(r)
+
+    def n_bytes(self):
+        """
+        Bytes for the encoded patterns (not counting the template dictionary)
+        """
+        return sum(len(r) for r in self._records)
+
+    def write(self,path):
+        """
+        Write MAGIC, the template dictionary (JSON), then each encoded pattern, all length prefixed
+        """
+        out=bytearray(MAGIC)
+        header=json.dumps(self.templates.to_list()).encode()
+        write_varint(out,len(header))
+        out+=header
+        write_varint(out,len(self._records))
+        for r in self._records:
+            write_varint(out,len(r))
+            out+=r
+        with open(path,"wb") as f:
+            f.write(out)
+
+    @classmethod
+    def load(cls,path):
+        with open(path,"rb") as f:
+            data=f.read()
+        if data[:len(MAGIC)]!=MAGIC:
+            raise ValueError(f"{path} is not a direction archive.")
+        n,pos=read_varint(data,len(MAGIC))
+        archive=cls(DirectionTemplates(json.loads(data[pos:pos+n].decode())))
+        pos+=n
+        n_records,pos=read_varint(data,pos)
+        for i in range(n_records):
+            n,pos=read_varint(data,pos)
+            archive._records.append(data[pos:pos+n])
+            pos+=n
+        return archive
@@ -3,7 +3,8 @@ from enum import IntEnum,Enum
 from copy import deepcopy
 from tabnanny import verbose
 from unicodedata import ucd_3_2_0
-from math import floor
+from math import floor,isfinite
+from fractions import Fraction
 from collections import namedtuple
 from typing import NamedTuple
 
@@ -83,11 +84,13 @@ class NeedleConversion:
     _needles: A dictionary of needle conversions indexed by size in mm. Has US and UK sizes  
     _us_to_mm: Dictionary converting US needle sizes to size in mm
     _uk_to_mm: Dictionary converting UK needle sizes to size in mm
+    _chart: Needle chart indexed by size in mm (NEEDLE_CHART unless a chart is loaded from a data file)
     """
-    def __init__(self):
+    def __init__(self,needle_chart=None):
+        self._chart=NEEDLE_CHART if needle_chart is None else needle_chart
         self._us_to_mm={}
         self._uk_to_mm={}
-        for k,v in NEEDLE_CHART.items():
+        for k,v in self._chart.items():
             if v.us is not None:
                 self._us_to_mm[v.us]=k
             if v.uk is not None:
@@ -110,7 +113,7 @@ class NeedleConversion:
             return mm
 
     def mm_to_uk(self,mm):
-        size=NEEDLE_CHART.get(mm).uk
+        size=self._chart.get(mm).uk
         if size is None:
             if mm>10.0:
                 raise ValueError(f"There is no UK size needle larger than 10.0mm. Use US measurements.")
@@ -119,7 +122,7 @@ class NeedleConversion:
         return size
 
     def mm_to_us(self,mm):
-        size=NEEDLE_CHART.get(mm).us
+        size=self._chart.get(mm).us
         if size is None:
             size=self.get_closest_needle(mm,"us")
         return size
@@ -130,50 +133,94 @@ class NeedleConversion:
         """
         if units not in ("us","uk"):
             raise ValueError(f"We only have US or UK needle sizes available. Given: {units}")
-        size=NEEDLE_CHART.get(mm).__getattribute__(units)
+        size=self._chart.get(mm).__getattribute__(units)
         if size is not None:
             return size
-        possible_mms=list(NEEDLE_CHART.keys())
+        possible_mms=list(self._chart.keys())
         diff=[abs(mm-x) for x in possible_mms]
         smallest_diff=min([d for d in diff if d>0])
         #TODO: could do this one more time to get multiple needle possibilities
         #return a list of needles and let the user sort this out
         #or base the response on an input guage
         i=diff.index(smallest_diff)
-        size=NEEDLE_CHART[possible_mms[i]].__getattribute__(units)
+        size=self._chart[possible_mms[i]].__getattribute__(units)
         if size is not None:
             return size
         raise ValueError(f"No close needle of size {mm} mms in {units}.")
     
+def is_exact(v):
+    """
+    True for values that exact arithmetic carries: ints (not bools) and Fractions
+    """
+    return isinstance(v,(int,Fraction)) and not isinstance(v,bool)
+
+def to_exact(v):
+    """
+    Exact version of v. A float becomes the Fraction of its shortest decimal form (0.9 is 9/10, not the binary double).
+    Whole Fractions become ints so the common case stays on plain int arithmetic.
+    """
+    if isinstance(v,float):
+        if not isfinite(v):
+            raise ValueError(f"Can't make {v} exact.")
+        v=Fraction(repr(v))
+    elif not is_exact(v):
+        raise TypeError(f"Can't make a {type(v)} exact. Value given is {v}.")
+    if isinstance(v,Fraction) and v.denominator==1:
+        return v.numerator
+    return v
+
+def exact_div(a,b):
+    """
+    a/b that keeps exact values exact: ints that divide evenly give an int, other ints and Fractions give a Fraction.
+    Anything else (floats) is plain division, so float patterns calculate exactly as before.
+    """
+    if type(a) is int and type(b) is int:
+        if b!=0 and a%b==0:
+            return a//b
+        return Fraction(a,b)
+    if is_exact(a) and is_exact(b):
+        q=Fraction(a)/Fraction(b)
+        return q.numerator if q.denominator==1 else q
+    return a/b
+
 class Guage(NamedTuple):
     """
     An object to keep track of knitters guage and calculate stitches/rows for a given units input.
+    exact=True gives ints or Fractions (see to_exact) instead of floats.
     """
     s_per_unit:float
     r_per_unit: float
     units: float
-    def stitches(self,v):
+    def stitches(self,v,exact=False):
         """
         Guage is set as x stitches per y units.
         """
+        if exact:
+            return to_exact(exact_div(to_exact(self.s_per_unit[0]),to_exact(self.s_per_unit[1]))*to_exact(v))
         return self.s_per_unit[0]/self.s_per_unit[1]*v
 
-    def rows(self,v):
+    def rows(self,v,exact=False):
         """
         Guage is often set as x rows per y units.
         """
+        if exact:
+            return to_exact(exact_div(to_exact(self.r_per_unit[0]),to_exact(self.r_per_unit[1]))*to_exact(v))
         return self.r_per_unit[0]/self.r_per_unit[1]*v
         
-    def units_to_rows(self,v):
+    def units_to_rows(self,v,exact=False):
         """
         Given inches or cm, return number of rows
         """
+        if exact:
+            return to_exact(exact_div(to_exact(self.r_per_unit[1]),to_exact(self.r_per_unit[0]))*to_exact(v))
         return self.r_per_unit[1]/self.r_per_unit[0]*v
         
-    def units_to_stitches(self,v):
+    def units_to_stitches(self,v,exact=False):
         """
         Given inches or cm, return number of stitches
         """
+        if exact:
+            return to_exact(exact_div(to_exact(self.s_per_unit[1]),to_exact(self.s_per_unit[0]))*to_exact(v))
         return self.s_per_unit[1]/self.s_per_unit[0]*v
 
     def __str__(self):
@@ -228,11 +275,14 @@ class StandardGuage():
              return stitch_list[floor(s_pos*len(stitch_list))]
     
     def guess_guage(self,yarn_weight,units='in',needle_size=None,knitter=0.5):
+        """
+        Guessed guage in units. Standard guages are per 4 inches, so a cm guage is the same count per 10.16 cm.
+        """
         s_per_4_inch=self._guess_s_per_4(yarn_weight,needle_size,knitter)
         if units=='in':
             return Guage((s_per_4_inch,4),(s_per_4_inch,4),units='in')
         elif units=='cm':
-            return Guage((s_per_4_inch,4),(s_per_4_inch,4),units='cm')
+            return Guage((s_per_4_inch,4*2.54),(s_per_4_inch,4*2.54),units='cm')
         else:
             raise ValueError(f"Please measure in cm or in, units given was:{units}.") 
         
@@ -0,0 +1,194 @@
+import json
+from src.sock import *
+from src.cli import pattern_record
+"""
+Structural diff between sock patterns: stitch counts, guage and each section's measurements instead of rendered text.
+Catalogs (many patterns keyed by their input, as SockPatterns or src/cli.py output records) can be diffed in one go.
+"""
+
+#Stitch counts compared, including the ones worked out from SockStitches fields
+STITCHES_FIELDS=list(SockStitches._fields)+["toe_start","toe_rows","instep_rows","gusset_increase"]
+
+class FieldChange(NamedTuple):
+    """
+    One changed value
+    path: where the value lives, e.g. "stitches.s_around_foot" or "sections.heel.first_turn"
+    old, new: the values (None when the value only exists on one side)
+    """
+    path:str
+    old:object
+    new:object
+
+class PatternDiff(NamedTuple):
+    """
+    Differences between two patterns
+    changes: tuple of FieldChange in path order
+    rows: dictionary of changed section name to (old rows,new rows), each (first,last) absolute rows or None if the side has no such rows
+    """
+    changes:tuple
+    rows:dict
+
+    def __bool__(self):
+        return len(self.changes)>0
+
+    def sections(self):
+        """
+        Names of sections with changes, in knitting order
+        """
+        return [name for name in SockPatternSections._fields if name in self.rows]
+
+    def section_changes(self,name):
+        prefix=f"sections.{name}."
+        return [c for c in self.changes if c.path.startswith(prefix)]
+
+    def __str__(self):
+        if not self.changes:
+            return "No changes."
+        lines=[f"{c.path}: {c.old} -> {c.new}" for c in self.changes]
+        for name in self.sections():
+            old,new=self.rows[name]
+            lines.append(f"{name} rows: {old} -> {new}")
+        return "\n".join(lines)
+
+class CatalogDiff(NamedTuple):
+    """
+    Differences between two catalogs of patterns keyed by input
+    added: keys only in the new catalog
+    removed: keys only in the old catalog
+    changed: dictionary of key to PatternDiff for keys whose patterns differ
+    unchanged: number of keys whose patterns are the same
+    """
+    added:list
+    removed:list
+    changed:dict
+    unchanged:int
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __str__(self):
+        return "{0} added, {1} removed, {2} changed, {3} unchanged.".format(len(self.added),len(self.removed),len(self.changed),self.unchanged)
+
+def pattern_summary(pattern,sections=True):
+    """
+    Nested dictionary of everything the diff compares for a SockPattern
+    """
+    summary={"type":type(pattern).__name__,
+        "stitches":{f:getattr(pattern.stitches,f) for f in STITCHES_FIELDS},
+        "guage":pattern.guage._asdict()}
+    if sections:
+        summary["sections"]={name:s.measures() for name in SockPatternSections._fields for s in (pattern.section(name),) if s is not None}
+    return summary
+
+def record_summary(record):
+    """
+    Nested dictionary of everything the diff compares for a src/cli.py output record (directions aren't compared)
+    """
+    return {k:v for k,v in record.items() if k not in ("directions","id","line")}
+
+def _flatten(value,path,out):
+    if isinstance(value,dict):
+        for k,v in value.items():
+            _flatten(v,f"{path}.{k}" if path else str(k),out)
+    elif isinstance(value,tuple):
+        #JSON records have lists where patterns have tuples
+        out[path]=list(value)
+    else:
+        out[path]=value
+    return out
+
+def _same(old,new,tolerance):
+    if tolerance and isinstance(old,(int,float)) and isinstance(new,(int,float)) and not isinstance(old,bool):
+        return abs(old-new)<=tolerance
+    return old==new
+
+def section_rows(sections):
+    """
+    (first,last) absolute rows of each section from a summary's sections, counted the way RowIndex counts them
+    """
+    rows={}
+    total=0
+    for name in SockPatternSections._fields:
+        s=sections.get(name)
+        if s is None or "n_rows" not in s:
+            continue
+        n=int(round(s["n_rows"]))
+        if n<=0:
+            continue
+        rows[name]=(total+1,total+n)
+        total+=n
+    return rows
+
+def diff_summaries(old,new,tolerance=0):
+    """
+    PatternDiff between two summaries (see pattern_summary and record_summary). Numbers within tolerance count as the same.
+    """
+    flat_old=_flatten(old,"",{})
+    flat_new=_flatten(new,"",{})
+    changes=[]
+    for path in sorted(flat_old.keys()|flat_new.keys()):
+        o=flat_old.get(path)
+        n=flat_new.get(path)
+        if path not in flat_old or path not in flat_new or not _same(o,n,tolerance):
+            changes.append(FieldChange(path,o,n))
+    rows={}
+    old_rows=section_rows(old.get("sections",{}))
+    new_rows=section_rows(new.get("sections",{}))
+    for c in changes:
+        parts=c.path.split(".")
+        if len(parts)>=2 and parts[0]=="sections":
+            rows[parts[1]]=(old_rows.get(parts[1]),new_rows.get(parts[1]))
+    return PatternDiff(tuple(changes),rows)
+
+def diff_patterns(old,new,tolerance=0):
+    """
+    PatternDiff between two SockPatterns.
+    Sections are only built and compared when the patterns' section inputs differ (the same inputs always give the same sections).
+    """
+    same_inputs=(type(old) is type(new) and old._section_inputs()==new._section_inputs())
+    return diff_summaries(pattern_summary(old,sections=not same_inputs),pattern_summary(new,sections=not same_inputs),tolerance=tolerance)
+
+def _summary(item):
+    #A SockPattern diffed against a record is summarised as the record src/cli.py would write for it, so both sides have the same fields
+    if isinstance(item,SockPattern):
+        item=pattern_record(item,directions=False)
+    return record_summary(item)
+
+def diff_catalogs(old,new,tolerance=0):
+    """
+    CatalogDiff between two catalogs: mappings of input key to SockPattern or src/cli.py output record (e.g. from load_catalog).
+    Two SockPatterns are diffed with diff_patterns. A SockPattern and a record are compared on the fields a record has.
+    """
+    added=[k for k in new.keys() if k not in old]
+    removed=[k for k in old.keys() if k not in new]
+    changed={}
+    unchanged=0
+    for k,o in old.items():
+        if k not in new:
+            continue
+        n=new[k]
+        if isinstance(o,SockPattern) and isinstance(n,SockPattern):
+            d=diff_patterns(o,n,tolerance=tolerance)
+        else:
+            d=diff_summaries(_summary(o),_summary(n),tolerance=tolerance)
+        if d:
+            changed[k]=d
+        else:
+            unchanged+=1
+    return CatalogDiff(added,removed,changed,unchanged)
+
+def load_catalog(path,key="id"):
+    """
+    Catalog from a JSONL file written by src/cli.py, keyed by each record's key (its line number if it has none)
+    """
+    catalog={}
+    with open(path) as f:
+        for n,line in enumerate(f,start=1):
+            if line.strip()=="":
+                continue
+            record=json.loads(line)
+            k=record.get(key,record.get("line",n))
+            if k in catalog:
+                raise ValueError(f"Key {k} is in {path} more than once.")
+            catalog[k]=record
+    return catalog
@@ -0,0 +1,251 @@
+from functools import lru_cache
+from src.sock import *
+"""
+Edit history for the pattern designer. Every change to the foot measurements, guage, section overrides or pattern options
+is an event. States are immutable, so undo and redo just apply an event (or its inverse) to the current state.
+Snapshots every snapshot_every events let any point in the history be rebuilt from a snapshot plus a short tail of events,
+and history older than max_history events is compacted away so long sessions don't grow without limit.
+"""
+
+FOOT="foot"
+GUAGE="guage"
+OVERRIDE="override"
+OPTION="option"
+#Pattern options an event can set
+OPTIONS=("ease","exact")
+#Patterns each session keeps for recently visited states (undo/redo often goes back to one)
+PATTERN_CACHE_SIZE=32
+
+def _freeze(value):
+    """
+    Hashable copy of an edit value. Lists (e.g. from JSON) become tuples.
+    """
+    if isinstance(value,list):
+        value=tuple(_freeze(v) for v in value)
+    try:
+        hash(value)
+    except TypeError:
+        raise ValueError(f"Edit values must be numbers, strings or lists of them. Value given is {value!r}.") from None
+    return value
+
+def _set(pairs,key,value):
+    """
+    Sorted tuple of (key,value) pairs with key set to value (or removed if value is None)
+    """
+    d=dict(pairs)
+    if value is None:
+        d.pop(key,None)
+    else:
+        d[key]=value
+    return tuple(sorted(d.items()))
+
+class DesignState(NamedTuple):
+    """
+    Everything a pattern is built from, as hashable tuples of sorted (name,value) pairs
+    foot: foot (and leg) measurements
+    guage: Guage
+    overrides: (section,((measure,value),...)) pairs for SockPattern overrides
+    options: pattern options (see OPTIONS)
+    """
+    foot:tuple
+    guage:Guage
+    overrides:tuple
+    options:tuple
+
+    @classmethod
+    def create(cls,foot_measure_dict,guage,overrides=None,**options):
+        overrides=check_overrides(overrides)
+        def pairs(d):
+            return tuple(sorted((k,_freeze(v)) for k,v in d.items()))
+        return cls(pairs(foot_measure_dict),guage,tuple(sorted((k,pairs(v)) for k,v in overrides.items())),pairs(options))
+
+    def get(self,kind,key=None):
+        """
+        Current value of what an event of this kind and key changes (None if it isn't set)
+        """
+        if kind==FOOT:
+            return dict(self.foot).get(key)
+        if kind==GUAGE:
+            return self.guage
+        if kind==OVERRIDE:
+            section,measure=key
+            return dict(dict(self.overrides).get(section,())).get(measure)
+        if kind==OPTION:
+            return dict(self.options).get(key)
+        raise ValueError(f"Unknown edit kind {kind}.")
+
+    def apply(self,kind,key,value):
+        """
+        New state with one value changed. None removes a foot measure, override or option.
+        """
+        value=_freeze(value)
+        if kind==FOOT:
+            return self._replace(foot=_set(self.foot,key,value))
+        if kind==GUAGE:
+            if not isinstance(value,Guage):
+                raise ValueError(f"Guage edits need a Guage. Value given is {value}.")
+            return self._replace(guage=value)
+        if kind==OVERRIDE:
+            section,measure=key
+            if section not in SockPatternSections._fields:
+                raise ValueError(f"Can't override section {section}. Sections are: {SockPatternSections._fields}")
+            measures=_set(dict(self.overrides).get(section,()),measure,value)
+            return self._replace(overrides=_set(self.overrides,section,measures or None))
+        if kind==OPTION:
+            if key not in OPTIONS:
+                raise ValueError(f"Unknown pattern option {key}. Options are: {OPTIONS}")
+            return self._replace(options=_set(self.options,key,value))
+        raise ValueError(f"Unknown edit kind {kind}.")
+
+    def pattern(self,pattern_class=ToeUpSockPattern):
+        """
+        New pattern built from this state
+        """
+        overrides={section:dict(measures) for section,measures in self.overrides}
+        return pattern_class(dict(self.foot),self.guage,verbose=False,overrides=overrides,**dict(self.options))
+
+class Event(NamedTuple):
+    """
+    One edit. old is the value before the edit, so the inverse of an event is the same edit back to old.
+    """
+    kind:str
+    key:object
+    value:object
+    old:object
+
+    def inverse(self):
+        return Event(self.kind,self.key,self.old,self.value)
+
+class DesignSession:
+    """
+    Edit log for one design.
+    Members
+    _events: events after _base (absolute event numbers _base, _base+1, ...). Events after _position are the redo tail.
+    _base: absolute number of the first event kept (older events have been compacted into the snapshot at _base)
+    _position: absolute number of events applied to get the current state
+    _snapshots: dictionary of absolute event number to the state after that many events (always has _base)
+    _state: current state
+    snapshot_every: events between snapshots
+    max_history: events that can always be undone (older ones may be compacted away)
+    _pattern: this session's cache of state to pattern (patterns aren't shared with other sessions, which may change them)
+    """
+    def __init__(self,foot_measure_dict,guage,overrides=None,pattern_class=ToeUpSockPattern,snapshot_every=64,max_history=1024,**options):
+        if snapshot_every<1 or max_history<1:
+            raise ValueError(f"snapshot_every and max_history must be at least 1. Given {snapshot_every} and {max_history}.")
+        self.pattern_class=pattern_class
+        self.snapshot_every=snapshot_every
+        self.max_history=max_history
+        self._state=DesignState.create(foot_measure_dict,guage,overrides,**options)
+        self._events=[]
+        self._base=0
+        self._position=0
+        self._snapshots={0:self._state}
+        self._pattern=lru_cache(maxsize=PATTERN_CACHE_SIZE)(self._build)
+
+    def state(self):
+        return self._state
+
+    def pattern(self):
+        """
+        Pattern for the current state. Patterns for recent states are cached, so undo and redo don't rebuild them.
+        """
+        return self._pattern(self._state)
+
+    def _build(self,state):
+        return state.pattern(self.pattern_class)
+
+    def edit(self,kind,key,value):
+        """
+        Record and apply one edit. Anything that could be redone is dropped. Returns the new state.
+        """
+        value=_freeze(value)
+        old=self._state.get(kind,key)
+        if value==old:
+            return self._state
+        state=self._state.apply(kind,key,value)
+        del self._events[self._position-self._base:]
+        for p in [p for p in self._snapshots if p>self._position]:
+            del self._snapshots[p]
+        self._events.append(Event(kind,key,value,old))
+        self._position+=1
+        self._state=state
+        if self._position%self.snapshot_every==0:
+            self._snapshots[self._position]=state
+        self._compact()
+        return state
+
+    def set_foot(self,measure,value):
+        return self.edit(FOOT,measure,value)
+
+    def set_guage(self,guage):
+        return self.edit(GUAGE,None,guage)
+
+    def set_override(self,section,measure,value):
+        return self.edit(OVERRIDE,(section,measure),value)
+
+    def set_option(self,option,value):
+        return self.edit(OPTION,option,value)
+
+    def can_undo(self):
+        return self._position>self._base
+
+    def can_redo(self):
+        return self._position<self._base+len(self._events)
+
+    def undo(self):
+        """
+        Step back one edit in O(1) by applying its inverse. Returns the new state.
+        """
+        if not self.can_undo():
+            raise ValueError("Nothing to undo.")
+        self._position-=1
+        e=self._events[self._position-self._base].inverse()
+        self._state=self._state.apply(e.kind,e.key,e.value)
+        return self._state
+
+    def redo(self):
+        if not self.can_redo():
+            raise ValueError("Nothing to redo.")
+        e=self._events[self._position-self._base]
+        self._position+=1
+        self._state=self._state.apply(e.kind,e.key,e.value)
+        return self._state
+
+    def state_at(self,position):
+        """
+        State after position events (absolute), rebuilt from the closest snapshot at or before it plus the events after that
+        """
+        if not (self._base<=position<=self._base+len(self._events)):
+            raise ValueError(f"History has events {self._base} to {self._base+len(self._events)}. Position given is {position}.")
+        start=max(p for p in self._snapshots if p<=position)
+        state=self._snapshots[start]
+        for e in self._events[start-self._base:position-self._base]:
+            state=state.apply(e.kind,e.key,e.value)
+        return state
+
+    def history(self):
+        """
+        (first,current,last) absolute event numbers that the session can move between
+        """
+        return (self._base,self._position,self._base+len(self._events))
+
+    def _compact(self):
+        """
+        Drop events (and snapshots) older than max_history events before the current position,
+        keeping the snapshot they were compacted into
+        """
+        if len(self._events)<=self.max_history+self.snapshot_every:
+            return
+        keep=[p for p in self._snapshots if p<=self._position-self.max_history]
+        if not keep:
+            return
+        new_base=max(keep)
+        if new_base<=self._base:
+            return
+        del self._events[:new_base-self._base]
+        for p in [p for p in self._snapshots if p<new_base]:
+            del self._snapshots[p]
+        self._base=new_base
+
+    def __len__(self):
+        return len(self._events)
@@ -0,0 +1,147 @@
+import json
+import mmap
+import sys
+from array import array
+from math import nan
+from src.sock import *
+"""
+Columnar export of generated sock patterns: one array per stitch count, guage value and section start/end/rows.
+Columns are standard library arrays, so any buffer-protocol reader (numpy.frombuffer, memoryview) can use them without copying.
+"""
+
+MAGIC=b"KNITCOL1"
+#Column data starts on 8 byte boundaries so mapped columns can be cast to doubles
+ALIGN=8
+
+SOCK_STITCHES_COLUMNS=list(SockStitches._fields)+["toe_start","toe_rows","instep_rows","gusset_increase"]
+GUAGE_COLUMNS=["guage_stitches","guage_stitch_units","guage_rows","guage_row_units","guage_cm"]
+SECTION_COLUMNS=[f"{s}_{m}" for s in SockPatternSections._fields for m in ("start_stitches","end_stitches","n_rows")]
+COLUMNS=SOCK_STITCHES_COLUMNS+GUAGE_COLUMNS+SECTION_COLUMNS
+
+def pattern_row(pattern):
+    """
+    Values for one pattern in COLUMNS order. Missing sections (e.g. no leg) are nan.
+    """
+    st=pattern.stitches
+    g=pattern.guage
+    row=[getattr(st,c) for c in SOCK_STITCHES_COLUMNS]
+    row+=[g.s_per_unit[0],g.s_per_unit[1],g.r_per_unit[0],g.r_per_unit[1],1 if g.units=='cm' else 0]
+    for s in pattern.pattern_sections:
+        if s is None:
+            row+=[nan,nan,nan]
+        else:
+            row+=[s.start_stitches(),s.end_stitches(),s.n_rows()]
+    return [float(v) for v in row]
+
+class PatternColumns:
+    """
+    Columns for a batch of patterns.
+    Members
+    _columns: dictionary of column name to array('d'), one entry per pattern
+    """
+    def __init__(self,patterns=()):
+        self._columns={c:array('d') for c in COLUMNS}
+        self.extend(patterns)
+
+    def append(self,pattern):
+        for c,v in zip(COLUMNS,pattern_row(pattern)):
+            self._columns[c].append(v)
+
+    def extend(self,patterns):
+        for p in patterns:
+            self.append(p)
+
+    def columns(self):
+        return list(self._columns.keys())
+
+    def __getitem__(self,name):
+        return self._columns[name]
+
+    def __len__(self):
+        return len(self._columns[COLUMNS[0]])
+
+    def write(self,path):
+        """
+        Write columns to a file: magic, header length, JSON header with column offsets, then aligned column data.
+        """
+        write_columns(path,self._columns)
+
+def write_columns(path,columns,meta=None):
+    """
+    Write a dictionary of equal-length arrays to a columnar file that load_columns can memory-map.
+    meta is a JSON-able dictionary kept in the header (MappedColumns.meta).
+    """
+    lengths={len(a) for a in columns.values()}
+    if len(lengths)>1:
+        raise ValueError(f"All columns must be the same length. Lengths: {lengths}")
+    n=lengths.pop() if lengths else 0
+    entries=[]
+    offset=0
+    for name,a in columns.items():
+        entries.append({"name":name,"typecode":a.typecode,"offset":offset})
+        offset+=-(-len(a)*a.itemsize//ALIGN)*ALIGN
+    header=json.dumps({"n":n,"byteorder":sys.byteorder,"columns":entries,"meta":meta or {}}).encode()
+    header+=b" "*(-(len(MAGIC)+8+len(header))%ALIGN)
+    with open(path,"wb") as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8,"little"))
+        f.write(header)
+        for a in columns.values():
+            data=a.tobytes()
+            f.write(data)
+            f.write(b"\0"*(-len(data)%ALIGN))
+
+class MappedColumns:
+    """
+    Read-only columns memory-mapped from a file written by write_columns. Each column is a memoryview into the map (no copy).
+    meta is the header's meta dictionary. Close (or use as a context manager) to release the map.
+    """
+    def __init__(self,path):
+        with open(path,"rb") as f:
+            self._map=mmap.mmap(f.fileno(),0,access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)]!=MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a pattern column file.")
+        header_length=int.from_bytes(self._map[len(MAGIC):len(MAGIC)+8],"little")
+        start=len(MAGIC)+8
+        header=json.loads(bytes(self._map[start:start+header_length]))
+        if header["byteorder"]!=sys.byteorder:
+            self._map.close()
+            raise ValueError(f"{path} was written on a {header['byteorder']} endian machine.")
+        self._n=header["n"]
+        self.meta=header.get("meta",{})
+        data_start=start+header_length
+        view=memoryview(self._map)
+        self._columns={}
+        for c in header["columns"]:
+            itemsize=array(c["typecode"]).itemsize
+            begin=data_start+c["offset"]
+            self._columns[c["name"]]=view[begin:begin+self._n*itemsize].cast(c["typecode"])
+        view.release()
+
+    def columns(self):
+        return list(self._columns.keys())
+
+    def __getitem__(self,name):
+        return self._columns[name]
+
+    def __len__(self):
+        return self._n
+
+    def close(self):
+        for v in self._columns.values():
+            v.release()
+        self._columns={}
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        self.close()
+
+def load_columns(path):
+    """
+    Memory-map a columnar pattern file.
+    """
+    return MappedColumns(path)
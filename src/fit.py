@@ -0,0 +1,115 @@
+from concurrent.futures import ThreadPoolExecutor
+from math import floor, ceil, lcm
+from src.sock import *
+"""
+Search needle sizes, knitter tightness and whole stitch counts for the best fitting sock.
+"""
+
+#Stitches around must come out in whole increase rows: the toe adds half the stitches (TOE_INCREASE a row) and the gusset a
+#quarter (GUSSET_INCREASE a row), so with 4 and 2 stitches a row this is 8
+STITCH_MULTIPLE=lcm(2*TOE_INCREASE[0],4*GUSSET_INCREASE[0])
+#Smallest sock worth knitting. Anything smaller is pruned.
+MIN_STITCHES=16
+KNITTERS=(0.0,0.25,0.5,0.75,0.99)
+
+class FitCandidate(NamedTuple):
+    """
+    One needle/knitter/stitch count combination and its fit error (relative to the ease adjusted foot)
+    """
+    needle_size:float
+    knitter:float
+    guage:Guage
+    stitches:SockStitches
+    error:float
+
+class FitOptimizer:
+    """
+    Search for the best-fitting whole-stitch sock for a foot and yarn weight.
+    Members
+    foot_measurements: ease adjusted FootMeasure we are fitting
+    yarn_weight: integer 0-7
+    needles: candidate needle sizes in mm (recommended needles for yarn weight in NEEDLE_CHART by default)
+    knitters: candidate knitter settings (0 loose to 1 tight)
+    """
+    def __init__(self,foot_measure_dict,yarn_weight,units='in',needles=None,knitters=KNITTERS,guesser=None,ease=False):
+        self.foot_measurements=FootMeasure(foot_measure_dict,units=units,ease=ease)
+        self.units=units
+        self.yarn_weight=yarn_weight
+        if needles is None:
+            recommended=RECOMMENDED_NEEDLES_IN_MM.get(yarn_weight)
+            if recommended is None:
+                raise ValueError(f"Yarn weight must be an integer between 0 and 7. Weight given is {yarn_weight}")
+            needles=[mm for mm in NEEDLE_CHART.keys() if mm in recommended]
+        self.needles=list(needles)
+        self.knitters=list(knitters)
+        self.guesser=StandardGuage() if guesser is None else guesser
+
+    def _guages(self):
+        """
+        One (needle,knitter,guage) per distinct guage. Needles that aren't recommended for the yarn are pruned.
+        """
+        guages={}
+        for needle in self.needles:
+            for knitter in self.knitters:
+                try:
+                    g=self.guesser.guess_guage(self.yarn_weight,units=self.units,needle_size=needle,knitter=knitter)
+                except Warning:
+                    continue
+                if g not in guages:
+                    guages[g]=(needle,knitter,g)
+        return list(guages.values())
+
+    def _evaluate(self,needle_knitter_guage):
+        """
+        Best candidate for one guage, or None if no whole stitch count is feasible.
+        """
+        needle,knitter,g=needle_knitter_guage
+        ideal=g.stitches(self.foot_measurements.measure_values('around_foot'))
+        rows=round(g.rows(self.foot_measurements.measure_values('toe_to_heel')))
+        r_per_unit=rows_per_inch(g)
+        best=None
+        #Only the multiples of STITCH_MULTIPLE on either side of the ideal stitch count can be best for this guage
+        for n in (floor(ideal/STITCH_MULTIPLE),ceil(ideal/STITCH_MULTIPLE)):
+            s=n*STITCH_MULTIPLE
+            if s<MIN_STITCHES:
+                continue
+            stitches=SockStitches(s,rows,r_per_unit)
+            if stitches.instep_rows<=0:
+                continue
+            error=abs(s-ideal)/ideal
+            if best is None or error<best.error:
+                best=FitCandidate(needle,knitter,g,stitches,error)
+        return best
+
+    def candidates(self,max_workers=None):
+        """
+        Best candidate for each feasible guage. Evaluated in a thread pool if max_workers>1.
+        """
+        guages=self._guages()
+        if max_workers is not None and max_workers>1:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                found=list(pool.map(self._evaluate,guages))
+        else:
+            found=[self._evaluate(g) for g in guages]
+        return [c for c in found if c is not None]
+
+    def best(self,max_workers=None):
+        """
+        Candidate with the smallest fit error. Ties go to the most average knitter, then the smaller needle.
+        """
+        found=self.candidates(max_workers=max_workers)
+        if len(found)==0:
+            raise ValueError("No feasible stitch count for {0} with yarn weight {1}.".format(self.foot_measurements,self.yarn_weight))
+        return min(found,key=lambda c:(c.error,abs(c.knitter-0.5),c.needle_size))
+
+    def best_pattern(self,max_workers=None,pattern_class=None):
+        """
+        ToeUpSockPattern (or pattern_class) for the best candidate
+        """
+        best=self.best(max_workers=max_workers)
+        if pattern_class is None:
+            pattern_class=ToeUpSockPattern
+        return pattern_class.from_stitches(best.stitches,best.guage)
+
+    def __str__(self):
+        return "Fit search for {0} with yarn weight {1}.".format(self.foot_measurements,self.yarn_weight)
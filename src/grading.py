@@ -0,0 +1,103 @@
+from array import array
+from src.fit import *
+"""
+Grade a size run from one base pattern with grading rules instead of building every size from made-up foot measurements.
+"""
+
+SECTION_FIELDS=("start_stitches","end_stitches","n_rows")
+
+class GradingRule(NamedTuple):
+    """
+    How much each size step adds.
+    stitches_per_size: stitches around the foot added per size (must keep the stitch multiple)
+    rows_per_size: toe-to-heel rows added per size
+    multiple: stitches around are always a multiple of this (a multiple of STITCH_MULTIPLE, so the toe and gusset increase rows are whole)
+    """
+    stitches_per_size:int
+    rows_per_size:int
+    multiple:int=STITCH_MULTIPLE
+
+class SizeRun:
+    """
+    Every size of a graded run, worked out column by column.
+    Members
+    base: the base pattern
+    rule: GradingRule
+    steps: size steps relative to the base (0 is the base size)
+    _columns: dictionary of column name to array, one entry per size
+    """
+    def __init__(self,base_pattern,rule,steps=range(-3,4)):
+        if rule.multiple%STITCH_MULTIPLE:
+            raise ValueError(f"Grading multiple ({rule.multiple}) must be a multiple of {STITCH_MULTIPLE}.")
+        if rule.stitches_per_size%rule.multiple:
+            raise ValueError(f"Stitches per size ({rule.stitches_per_size}) must be a multiple of {rule.multiple}.")
+        self.base=base_pattern
+        self.rule=rule
+        self.steps=list(steps)
+        #Round the base once. Every other size is a whole number of steps away, so it stays rounded.
+        base_stitches=int(round(base_pattern.stitches.s_around_foot/rule.multiple))*rule.multiple
+        base_rows=int(round(base_pattern.stitches.r_toe_to_heel))
+        r_per_inch=base_pattern.stitches.r_per_inch
+        s=[base_stitches+k*rule.stitches_per_size for k in self.steps]
+        r=[base_rows+k*rule.rows_per_size for k in self.steps]
+        self._columns={"size":array('l',self.steps),"s_around_foot":array('l',s),"r_toe_to_heel":array('l',r)}
+        self._columns.update(self._section_columns(s,r,r_per_inch))
+        self.r_per_inch=r_per_inch
+        self.check_myself()
+
+    @staticmethod
+    def _section_columns(s,r,r_per_inch):
+        """
+        Section counts for every size with the same arithmetic as ToeUpSockPattern.make_section
+        """
+        half=[n//2 for n in s]
+        quarter=[n//4 for n in s]
+        counts={
+            "toe":(half,s,quarter),
+            "instep":(s,s,[rows-h-r_per_inch*2 for rows,h in zip(r,half)]),
+            "gusset":(s,[n+q for n,q in zip(s,quarter)],quarter),
+            "heel":([h+q for h,q in zip(half,quarter)],half,quarter),
+            "cuff":(s,s,[r_per_inch]*len(s))}
+        columns={}
+        for section,values in counts.items():
+            for field,v in zip(SECTION_FIELDS,values):
+                columns[f"{section}_{field}"]=array('l',v)
+        return columns
+
+    def check_myself(self):
+        """
+        Make sure every size in the run can be knit.
+        """
+        bad=[k for k,s,rows in zip(self.steps,self["s_around_foot"],self["instep_n_rows"]) if s<MIN_STITCHES or rows<=0]
+        if bad:
+            raise ValueError(f"Size steps {bad} are too small to knit with rule {self.rule}.")
+
+    def columns(self):
+        return list(self._columns.keys())
+
+    def __getitem__(self,name):
+        return self._columns[name]
+
+    def __len__(self):
+        return len(self.steps)
+
+    def table(self):
+        """
+        One tuple per size in columns() order
+        """
+        return list(zip(*self._columns.values()))
+
+    def stitches(self,i):
+        """
+        SockStitches for size i (an index into steps)
+        """
+        return SockStitches(self["s_around_foot"][i],self["r_toe_to_heel"][i],self.r_per_inch)
+
+    def pattern(self,i,pattern_class=ToeUpSockPattern):
+        """
+        Full pattern for size i (an index into steps)
+        """
+        return pattern_class.from_stitches(self.stitches(i),self.base.guage,verbose=False)
+
+    def __str__(self):
+        return "Size run of {0} sizes graded by {1} stitches and {2} rows per size.".format(len(self),self.rule.stitches_per_size,self.rule.rows_per_size)
@@ -0,0 +1,92 @@
+import json
+import os
+from functools import lru_cache
+from string import Formatter
+"""
+Localized directions. Sections write their directions as Messages: a message id (the English text with {0}, {1}, ...
+where the values go) and the values. A message catalog (src/locales/<language>.json) maps message ids to translations
+with the same placeholders, so rendering another language is a dictionary lookup and a format per line, the same work as
+rendering English. Catalogs are loaded and checked once per language. Rendering another language reuses the pattern's built sections.
+"""
+
+LOCALE_DIR=os.path.join(os.path.dirname(os.path.abspath(__file__)),"locales")
+DEFAULT_LANGUAGE="en"
+
+def _placeholders(msgid):
+    return [field for literal,field,spec,conversion in Formatter().parse(msgid) if field is not None]
+
+def _check(msgid,msgstr):
+    """
+    Translation checked against the message id's placeholders
+    """
+    n_params=len(_placeholders(msgid))
+    for field in _placeholders(msgstr):
+        if not field.isdigit() or int(field)>=n_params:
+            raise ValueError(f"Translation {msgstr!r} uses {{{field}}}, but {msgid!r} only has {n_params} placeholders.")
+    return msgstr
+
+class MessageCatalog:
+    """
+    Checked translations for one language. Messages without a translation stay in English.
+    Members
+    language: language code (the catalog's file name)
+    name: language name
+    _messages: dictionary of message id to translation
+    """
+    def __init__(self,language,messages,name=None):
+        self.language=language
+        self.name=name if name is not None else language
+        self._messages={msgid:_check(msgid,msgstr) for msgid,msgstr in messages.items()}
+
+    def translate(self,message):
+        """
+        One Message as a line of directions in this language
+        """
+        return self._messages.get(message.msgid,message.msgid).format(*message.args)
+
+    def render(self,messages):
+        """
+        Translated lines (a tuple, like SockPattern.directions)
+        """
+        get=self._messages.get
+        return tuple(get(msgid,msgid).format(*args) for msgid,args in messages)
+
+    def missing(self,messages):
+        """
+        Message ids that have no translation in this catalog
+        """
+        return sorted({m.msgid for m in messages if m.msgid not in self._messages})
+
+    def __len__(self):
+        return len(self._messages)
+
+def languages():
+    """
+    Language codes with a catalog in LOCALE_DIR
+    """
+    return sorted(f[:-len(".json")] for f in os.listdir(LOCALE_DIR) if f.endswith(".json"))
+
+@lru_cache(maxsize=None)
+def message_catalog(language=DEFAULT_LANGUAGE):
+    """
+    MessageCatalog for a language, loaded and checked the first time it is asked for
+    """
+    path=os.path.join(LOCALE_DIR,f"{language}.json")
+    if not (language in languages() and os.path.exists(path)):
+        raise ValueError(f"No directions catalog for language {language}. Languages are: {languages()}")
+    with open(path,encoding="utf-8") as f:
+        data=json.load(f)
+    return MessageCatalog(language,data["messages"],name=data.get("name"))
+
+def render(pattern,language=DEFAULT_LANGUAGE):
+    """
+    A pattern's directions in a language
+    """
+    return message_catalog(language).render(pattern.messages())
+
+def render_batch(patterns,language=DEFAULT_LANGUAGE):
+    """
+    Directions for each pattern in a language (one catalog lookup for the whole batch)
+    """
+    catalog=message_catalog(language)
+    return [catalog.render(p.messages()) for p in patterns]
@@ -0,0 +1,177 @@
+import argparse
+import os
+import socket
+import sqlite3
+import sys
+import time
+from src.cli import process
+"""
+Resumable bulk pattern generation. Input JSONL (see src/cli.py) is split into numbered chunks that are tracked in a SQLite checkpoint file.
+Any number of worker processes on one machine can run the same job: each claims one chunk at a time, writes chunk_NNNNNN.jsonl
+and marks it done. A chunk claimed by a worker that died is handed out again after the lease runs out. Workers on several machines
+can only share a job if the checkpoint file is on a filesystem whose locking SQLite can rely on (NFS and many other network
+filesystems aren't), otherwise two workers can claim the same chunk.
+
+    python -m src.jobs feet.jsonl out_dir --chunk-size 1000
+"""
+
+PENDING="pending"
+RUNNING="running"
+DONE="done"
+
+class JobRunner:
+    """
+    Members
+    input_path: JSONL file of foot measurement records
+    output_dir: directory for chunk output files (and the checkpoint file unless one is given)
+    checkpoint_path: SQLite file that records chunks and their status
+    chunk_size: input lines per chunk (when this worker plans the job)
+    worker: name of this worker (host:pid by default)
+    lease: seconds before a running chunk is assumed dead and can be claimed again
+    """
+    def __init__(self,input_path,output_dir,checkpoint_path=None,chunk_size=1000,worker=None,lease=600):
+        if chunk_size<1:
+            raise ValueError(f"Chunk size must be at least 1. Chunk size given is {chunk_size}.")
+        self.input_path=input_path
+        self.output_dir=output_dir
+        os.makedirs(output_dir,exist_ok=True)
+        self.checkpoint_path=checkpoint_path if checkpoint_path is not None else os.path.join(output_dir,"checkpoint.sqlite")
+        self.chunk_size=chunk_size
+        self.worker=worker if worker is not None else f"{socket.gethostname()}:{os.getpid()}"
+        self.lease=lease
+
+    def _connect(self):
+        #Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE so claims are atomic across processes (that share working file locks)
+        db=sqlite3.connect(self.checkpoint_path,timeout=60,isolation_level=None)
+        db.execute("CREATE TABLE IF NOT EXISTS chunks (id INTEGER PRIMARY KEY, offset INTEGER, n_lines INTEGER, first_line INTEGER, status TEXT, worker TEXT, claimed_at REAL, finished_at REAL)")
+        return db
+
+    def plan(self):
+        """
+        Split the input into chunks (byte offset, line count and first line number) unless another worker already has.
+        The plan is kept in the checkpoint, so a run resumed with a different chunk_size uses the chunks already planned.
+        Returns the number of chunks.
+        """
+        db=self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            n=db.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+            if n==0:
+                rows=[]
+                offset=0
+                first_line=1
+                with open(self.input_path,"rb") as f:
+                    while True:
+                        start=offset
+                        n_lines=0
+                        for line in f:
+                            offset+=len(line)
+                            n_lines+=1
+                            if n_lines==self.chunk_size:
+                                break
+                        if n_lines==0:
+                            break
+                        rows.append((len(rows),start,n_lines,first_line,PENDING))
+                        first_line+=n_lines
+                db.executemany("INSERT INTO chunks (id,offset,n_lines,first_line,status) VALUES (?,?,?,?,?)",rows)
+                n=len(rows)
+            db.execute("COMMIT")
+        finally:
+            db.close()
+        return n
+
+    def claim(self,db):
+        """
+        Claim the next pending chunk (or a running chunk whose lease ran out). Returns (id,offset,n_lines,first_line) or None when there's nothing left.
+        """
+        now=time.time()
+        db.execute("BEGIN IMMEDIATE")
+        row=db.execute("SELECT id,offset,n_lines,first_line FROM chunks WHERE status=? OR (status=? AND claimed_at<?) ORDER BY id LIMIT 1",
+            (PENDING,RUNNING,now-self.lease)).fetchone()
+        if row is not None:
+            db.execute("UPDATE chunks SET status=?,worker=?,claimed_at=? WHERE id=?",(RUNNING,self.worker,now,row[0]))
+        db.execute("COMMIT")
+        return row
+
+    def chunk_path(self,chunk_id):
+        return os.path.join(self.output_dir,f"chunk_{chunk_id:06d}.jsonl")
+
+    def run_chunk(self,chunk_id,offset,n_lines,first_line):
+        """
+        Generate patterns for one chunk. Output goes to a temporary file that is renamed into place when complete.
+        """
+        tmp=self.chunk_path(chunk_id)+f".{os.getpid()}.tmp"
+        with open(self.input_path,"rb") as f, open(tmp,"w") as out:
+            f.seek(offset)
+            lines=(f.readline().decode() for i in range(n_lines))
+            process(lines,out,first_line=first_line)
+        os.replace(tmp,self.chunk_path(chunk_id))
+
+    def run(self,max_chunks=None):
+        """
+        Claim and run chunks until none are left (or max_chunks have been run). Returns the number of chunks this call ran.
+        """
+        self.plan()
+        db=self._connect()
+        n_run=0
+        try:
+            while max_chunks is None or n_run<max_chunks:
+                chunk=self.claim(db)
+                if chunk is None:
+                    break
+                try:
+                    self.run_chunk(*chunk)
+                except BaseException:
+                    db.execute("UPDATE chunks SET status=? WHERE id=? AND worker=?",(PENDING,chunk[0],self.worker))
+                    raise
+                db.execute("UPDATE chunks SET status=?,finished_at=? WHERE id=? AND worker=?",(DONE,time.time(),chunk[0],self.worker))
+                n_run+=1
+        finally:
+            db.close()
+        return n_run
+
+    def status(self):
+        """
+        Dictionary of status to number of chunks
+        """
+        db=self._connect()
+        try:
+            return dict(db.execute("SELECT status,COUNT(*) FROM chunks GROUP BY status").fetchall())
+        finally:
+            db.close()
+
+    def done(self):
+        status=self.status()
+        return len(status)>0 and set(status.keys())=={DONE}
+
+    def merge(self,out):
+        """
+        Write every chunk's output to out in input order. All chunks must be done.
+        """
+        if not self.done():
+            raise ValueError(f"Job isn't finished. Chunks: {self.status()}")
+        db=self._connect()
+        try:
+            ids=[r[0] for r in db.execute("SELECT id FROM chunks ORDER BY id")]
+        finally:
+            db.close()
+        for i in ids:
+            with open(self.chunk_path(i)) as f:
+                for line in f:
+                    out.write(line)
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(description="Generate sock patterns for a JSONL file in resumable chunks.")
+    parser.add_argument("input",help="JSONL file of foot measurement records")
+    parser.add_argument("output_dir",help="Directory for chunk outputs and the checkpoint file")
+    parser.add_argument("--chunk-size",type=int,default=1000)
+    parser.add_argument("--checkpoint",default=None,help="SQLite checkpoint file (output_dir/checkpoint.sqlite by default)")
+    parser.add_argument("--lease",type=float,default=600,help="Seconds before a dead worker's chunk is handed out again")
+    args=parser.parse_args(argv)
+    runner=JobRunner(args.input,args.output_dir,checkpoint_path=args.checkpoint,chunk_size=args.chunk_size,lease=args.lease)
+    n=runner.run()
+    print(f"{runner.worker} ran {n} chunks. Job status: {runner.status()}",file=sys.stderr)
+    return 0
+
+if __name__=="__main__":
+    sys.exit(main())
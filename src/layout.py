@@ -0,0 +1,184 @@
+from array import array
+from src.sock import *
+"""
+Stitch layouts for any needle configuration. Sections work out their stitches as magic loop does: the front (top of foot,
+Needle 1) and the back (sole, heel and gusset, Needle 2). A layout spreads the front and back over its needles.
+One routine (split_columns) does this for whole columns of counts, so a size run is laid out for every configuration
+at once without building any sections. layout_directions rewrites every line of a pattern's directions that names a
+needle (found by its message id) for the layout's needles.
+"""
+
+class Layout(NamedTuple):
+    """
+    A needle configuration
+    name: name used in directions
+    front_needles: needles holding the front (top of foot) stitches
+    back_needles: needles holding the back (sole) stitches
+    needle: what each holding needle is called in directions
+    """
+    name:str
+    front_needles:int
+    back_needles:int
+    needle:str="Needle"
+
+    def n_needles(self):
+        """
+        Needles holding stitches (a set of DPNs has one more, the working needle)
+        """
+        return self.front_needles+self.back_needles
+
+MAGIC_LOOP=Layout("magic loop",1,1)
+TWO_CIRCULARS=Layout("two circulars",1,1,"Circular")
+#Sets of 3, 4 or 5 double pointed needles: all but one hold stitches
+DPN_3=Layout("3 DPNs",1,1,"DPN")
+DPN_4=Layout("4 DPNs",1,2,"DPN")
+DPN_5=Layout("5 DPNs",2,2,"DPN")
+LAYOUTS={l.name:l for l in (MAGIC_LOOP,TWO_CIRCULARS,DPN_3,DPN_4,DPN_5)}
+
+def split_column(column,k):
+    """
+    Split every count in column over k needles. Returns k columns.
+    Whole counts are split into whole stitches with the first needles taking any extra. Other counts are split evenly
+    (see exact_div), so floats stay floats the way magic loop splits them.
+    """
+    if k==1:
+        return [column]
+    if isinstance(column,array) and column.typecode in "bhilq":
+        return [array(column.typecode,(n//k+(1 if i<n%k else 0) for n in column)) for i in range(k)]
+    parts=[[] for i in range(k)]
+    for n in column:
+        if isinstance(n,int):
+            for i in range(k):
+                parts[i].append(n//k+(1 if i<n%k else 0))
+        else:
+            share=exact_div(n,k)
+            for p in parts:
+                p.append(share)
+    return parts
+
+def split_columns(fronts,backs,layout=MAGIC_LOOP):
+    """
+    Stitches on each of layout's needles for columns of (front,back) counts: a list with one column per needle,
+    front needles first
+    """
+    return split_column(fronts,layout.front_needles)+split_column(backs,layout.back_needles)
+
+def section_ends(pattern):
+    """
+    Dictionary of section name to (front,back) stitches at the end of the section, from the section's needle_counts
+    """
+    ends={}
+    for name in SockPatternSections._fields:
+        s=pattern.section(name)
+        if s is not None:
+            ends[name]=s.needle_counts(s.n_rows())
+    return ends
+
+def pattern_layout(pattern,layout=MAGIC_LOOP):
+    """
+    Dictionary of section name to stitches on each needle at the end of the section
+    """
+    ends=section_ends(pattern)
+    needles=split_columns([f for f,b in ends.values()],[b for f,b in ends.values()],layout)
+    return {name:tuple(n[i] for n in needles) for i,name in enumerate(ends.keys())}
+
+def size_run_ends(run):
+    """
+    Dictionary of section name to (front,back) columns at the end of each section for every size of a SizeRun.
+    Same split as each section's needle_counts: the front keeps half the stitches around (the top of the foot waits on it
+    while the heel is turned) and the back has the rest.
+    """
+    half=array('l',(s//2 for s in run["s_around_foot"]))
+    ends={}
+    for name in ("toe","instep","gusset","heel","cuff"):
+        end=run[f"{name}_end_stitches"]
+        if name=="heel":
+            ends[name]=(half,end)
+        else:
+            ends[name]=(half,array('l',(e-h for e,h in zip(end,half))))
+    return ends
+
+def size_run_layouts(run,layouts=None):
+    """
+    Dictionary of layout name to {section name: one column per needle} for every size of a SizeRun
+    """
+    layouts=LAYOUTS.values() if layouts is None else layouts
+    ends=size_run_ends(run)
+    return {l.name:{name:split_columns(front,back,l) for name,(front,back) in ends.items()} for l in layouts}
+
+def needle_line(counts,layout=MAGIC_LOOP):
+    """
+    Directions text for stitches on each needle, e.g. "16 stitches on Needle 1 and 8 stitches on Needle 2"
+    """
+    if len(counts)!=layout.n_needles():
+        raise ValueError(f"{layout.name} holds stitches on {layout.n_needles()} needles. Counts given are {counts}.")
+    parts=[f"{n} stitches on {layout.needle} {i}" for i,n in enumerate(counts,start=1)]
+    return ", ".join(parts[:-1])+" and "+parts[-1]
+
+def needle_names(layout=MAGIC_LOOP):
+    """
+    (front,back) lists of the names of layout's needles, e.g. (["DPN 1"],["DPN 2","DPN 3"])
+    """
+    names=[f"{layout.needle} {i}" for i in range(1,layout.n_needles()+1)]
+    return names[:layout.front_needles],names[layout.front_needles:]
+
+def _group(names):
+    return names[0] if len(names)==1 else ", ".join(names[:-1])+" and "+names[-1]
+
+def _knit_across(names):
+    return f"{_group(names)}: Knit all stitches across."
+
+def _increase(names):
+    """
+    Clauses for increasing 1 stitch at each end of a group of needles
+    """
+    if len(names)==1:
+        return [f"{names[0]}: K1, M1R, knit to last stitch, M1L, K1."]
+    return [f"{names[0]}: K1, M1R, knit to end."]+[_knit_across([n]) for n in names[1:-1]]+[f"{names[-1]}: Knit to last stitch, M1L, K1."]
+
+def _counts(section,row,layout):
+    front,back=section.needle_counts(row)
+    return tuple(c[0] for c in split_columns([front],[back],layout))
+
+#Lines that name needles, by message id (see the sections in src/sock.py): function of (section,message,layout) to the line for layout
+_NEEDLE_LINES={
+    "Cast on {0} ({1} per needle) in preferred style (Figure 8, crocet, etc).\nKnit all stitches around.":
+        lambda s,m,l:f"Cast on {m.args[0]} in preferred style (Figure 8, crocet, etc) with {needle_line(_counts(s,0,l),l)}.\nKnit all stitches around.",
+    "Row 1: Needle 1: K1 M1R, K to last stitch, M1L K1.\n   Needle 2:K1 M1R, K to last stitch, M1L K1.\nRow 2: Knit all stitches around.\n":
+        lambda s,m,l:"Row 1: "+" ".join(_increase(needle_names(l)[0])+_increase(needle_names(l)[1]))+"\nRow 2: Knit all stitches around.\n",
+    "Repeat Row 1 and Row 2 until there are {0} stitches total on your two needles ({1} on each needle).\n":
+        lambda s,m,l:f"Repeat Row 1 and Row 2 until there are {m.args[0]} stitches total ({needle_line(_counts(s,s.n_rows(),l),l)}).\n",
+    "Row 1: Needle 1: Knit all stitches across. Needle 2: K1, M1R, Knit across to last stitche. M1L K1.\nRow 2: Knit all stitches around.\n":
+        lambda s,m,l:"Row 1: "+" ".join([_knit_across(needle_names(l)[0])]+_increase(needle_names(l)[1]))+"\nRow 2: Knit all stitches around.\n",
+    "Repeat Rows 1 and 2 until there are {0} stitches on Needle 1 and {1} stitches on Needle 2.":
+        lambda s,m,l:f"Repeat Rows 1 and 2 until there are {needle_line(_counts(s,s.n_rows(),l),l)}.",
+    "Knit across needle 1. Leave all top-of-foot stitches on the cable and work back and forth on the gusset stitches as follows:\n":
+        lambda s,m,l:"Knit across {0}. Leave all top-of-foot stitches on {0} and work back and forth on the gusset stitches ({1}) as follows:\n".format(*map(_group,needle_names(l))),
+    "Increase row: Needle 1: Knit all stitches across. Needle 2: K1, M1R, knit to last stitch, M1L, K1.":
+        lambda s,m,l:"Increase row: "+" ".join([_knit_across(needle_names(l)[0])]+_increase(needle_names(l)[1])),
+    "There are now {0} stitches ({1} on Needle 1 and {2} on Needle 2).":
+        lambda s,m,l:f"There are now {m.args[0]} stitches ({needle_line(_counts(s,s.n_rows(),l),l)}).",
+}
+
+def layout_directions(pattern,layout=MAGIC_LOOP):
+    """
+    A pattern's directions for a needle layout. Magic loop is what the sections write.
+    """
+    if layout==MAGIC_LOOP:
+        return pattern.directions()
+    lines=[]
+    for s in pattern.pattern_sections:
+        if s is None:
+            continue
+        for m in s.messages():
+            line=_NEEDLE_LINES.get(m.msgid)
+            lines.append(str(m) if line is None else line(s,m,layout))
+    return tuple(lines)
+
+def render_layouts(pattern,layouts=None):
+    """
+    Dictionary of layout name to the pattern's directions for that layout.
+    The sections are built once and shared by every layout.
+    """
+    layouts=LAYOUTS.values() if layouts is None else layouts
+    return {l.name:layout_directions(pattern,l) for l in layouts}
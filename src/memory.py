@@ -0,0 +1,206 @@
+import argparse
+import sys
+import tracemalloc
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from src.sock import *
+"""
+Where the memory of a batch of patterns goes. Deep sizes (sys.getsizeof of every object reachable from the batch, each
+object counted once) are broken down by object type, by the attribute that holds them (e.g. IncOrDecPatternMeasure._measure_values,
+InstepML._directions) and by section class. tracemalloc shows which lines of code allocated the batch.
+
+    python -m src.memory -n 1000 --top 10
+"""
+
+#Objects that are shared by everything (or aren't data) and are never counted or followed
+_SKIP_TYPES=(type,ModuleType,FunctionType,BuiltinFunctionType,MethodType)
+#Guage for the workload patterns
+GUAGE=Guage((30,4),(30,4),'in')
+
+class TypeUsage(NamedTuple):
+    """
+    Memory used by one group of objects
+    name: type, attribute or section class name
+    count: objects counted
+    n_bytes: bytes (sys.getsizeof) of those objects
+    """
+    name:str
+    count:int
+    n_bytes:int
+
+class TracedAllocation(NamedTuple):
+    """
+    Memory allocated by one line of code while a batch was built (from tracemalloc)
+    """
+    location:str
+    count:int
+    n_bytes:int
+
+def _type_name(obj):
+    """
+    Type name, with NamedTuples reported as "NamedTuple <name>"
+    """
+    t=type(obj)
+    if isinstance(obj,tuple) and hasattr(t,"_fields"):
+        return f"NamedTuple {t.__name__}"
+    return t.__name__
+
+def _children(obj):
+    """
+    (attribute name or None,object) for everything obj refers to that deep sizes follow
+    """
+    if isinstance(obj,dict):
+        for k,v in obj.items():
+            yield None,k
+            yield None,v
+    elif isinstance(obj,(list,tuple,set,frozenset)):
+        for v in obj:
+            yield None,v
+    d=getattr(obj,"__dict__",None)
+    if isinstance(d,dict) and not isinstance(obj,_SKIP_TYPES):
+        yield "__dict__",d
+        for k,v in d.items():
+            yield k,v
+    for name in getattr(type(obj),"__slots__",()):
+        if hasattr(obj,name):
+            yield name,getattr(obj,name)
+
+class MemoryReport:
+    """
+    Deep memory use of a batch of objects.
+    Members
+    total: bytes of every object reachable from the batch (each counted once)
+    n_objects: objects counted
+    by_type: dictionary of type name to [count,bytes]
+    by_attribute: dictionary of "Class.attribute" to [count,bytes] for everything held (directly or not) by that attribute
+    by_section: dictionary of section class name to [count,bytes] for everything reachable from sections of that class
+    """
+    def __init__(self):
+        self.total=0
+        self.n_objects=0
+        self.by_type={}
+        self.by_attribute={}
+        self.by_section={}
+        self._seen=set()
+
+    @staticmethod
+    def _add(table,name,n_bytes):
+        usage=table.get(name)
+        if usage is None:
+            table[name]=[1,n_bytes]
+        else:
+            usage[0]+=1
+            usage[1]+=n_bytes
+
+    def add(self,obj):
+        """
+        Count everything reachable from obj that hasn't been counted yet. Returns the bytes added.
+        """
+        added=0
+        stack=[(obj,None,None)]
+        while stack:
+            o,attribute,section=stack.pop()
+            if o is None or isinstance(o,(bool,*_SKIP_TYPES)) or id(o) in self._seen:
+                continue
+            self._seen.add(id(o))
+            n_bytes=sys.getsizeof(o)
+            added+=n_bytes
+            self.n_objects+=1
+            self._add(self.by_type,_type_name(o),n_bytes)
+            if attribute is not None:
+                self._add(self.by_attribute,attribute,n_bytes)
+            if isinstance(o,PatternSection):
+                section=type(o).__name__
+            if section is not None:
+                self._add(self.by_section,section,n_bytes)
+            owner=type(o).__name__
+            for name,child in _children(o):
+                stack.append((child,attribute if name is None else f"{owner}.{name}",section))
+        self.total+=added
+        return added
+
+    def top(self,table="by_type",n=10):
+        """
+        The n biggest TypeUsages of by_type, by_attribute or by_section
+        """
+        usage=getattr(self,table)
+        return sorted((TypeUsage(k,c,b) for k,(c,b) in usage.items()),key=lambda u:(-u.n_bytes,u.name))[:n]
+
+    def __str__(self):
+        return f"{self.n_objects} objects, {self.total} bytes."
+
+def deep_sizeof(obj):
+    """
+    Bytes of obj and everything reachable from it, each object counted once
+    """
+    return MemoryReport().add(obj)
+
+def memory_report(objects):
+    """
+    MemoryReport for a batch of objects (e.g. a list of SockPatterns)
+    """
+    report=MemoryReport()
+    for o in objects:
+        report.add(o)
+    return report
+
+def traced(build,*args,limit=10,key_type="lineno",**kwargs):
+    """
+    Call build(*args,**kwargs) with tracemalloc on.
+    Returns (result, the limit TracedAllocations that allocated the most, total bytes allocated and still held).
+    """
+    was_tracing=tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        before=tracemalloc.take_snapshot()
+        result=build(*args,**kwargs)
+        after=tracemalloc.take_snapshot()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    filters=[tracemalloc.Filter(False,tracemalloc.__file__)]
+    stats=after.filter_traces(filters).compare_to(before.filter_traces(filters),key_type)
+    allocations=[TracedAllocation(str(s.traceback),s.count_diff,s.size_diff) for s in stats if s.size_diff>0]
+    return result,allocations[:limit],sum(a.n_bytes for a in allocations)
+
+def workload(n,guage=GUAGE,directions=True):
+    """
+    n quiet patterns of different sizes with every section built (and their directions written if directions is True)
+    """
+    #Sizes with an even toe cast on
+    sizes=[7+i/10 for i in range(40) if round(guage.stitches(FOOT_EASE*(7+i/10))/2)%2==0]
+    patterns=[]
+    for i in range(n):
+        p=ToeUpSockPattern({'around_foot':sizes[i%len(sizes)],'toe_to_heel':8+(i%30)/10},guage,verbose=False)
+        if directions:
+            p.write_directions()
+        else:
+            p.pattern_sections
+        patterns.append(p)
+    return patterns
+
+def _print_table(title,usage,total,out):
+    out.write(f"\n{title}\n")
+    for u in usage:
+        out.write(f"  {u.name:<48} {u.count:>9} {u.n_bytes:>12} {100*u.n_bytes/max(total,1):5.1f}%\n")
+
+def main(argv=None,out=None):
+    out=sys.stdout if out is None else out
+    parser=argparse.ArgumentParser(description="Print the biggest memory users of a batch of sock patterns.")
+    parser.add_argument("-n",type=int,default=1000,help="Number of patterns.")
+    parser.add_argument("--top",type=int,default=10,help="Rows per table.")
+    parser.add_argument("--no-directions",action="store_true",help="Build sections without writing their directions.")
+    args=parser.parse_args(argv)
+    patterns,allocations,traced_bytes=traced(workload,args.n,directions=not args.no_directions,limit=args.top)
+    report=memory_report(patterns)
+    out.write(f"{args.n} patterns: {report.total} bytes deep ({report.total/max(args.n,1):.0f} per pattern), {traced_bytes} bytes traced.\n")
+    _print_table("By type",report.top("by_type",args.top),report.total,out)
+    _print_table("By attribute",report.top("by_attribute",args.top),report.total,out)
+    _print_table("By section class",report.top("by_section",args.top),report.total,out)
+    out.write("\nAllocated by\n")
+    for a in allocations:
+        out.write(f"  {a.location:<48} {a.count:>9} {a.n_bytes:>12}\n")
+    return 0
+
+if __name__=="__main__":
+    sys.exit(main())
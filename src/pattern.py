@@ -1,9 +1,22 @@
 from abc import abstractclassmethod
+from copy import copy
 from typing import NamedTuple
 from src.conversions import *
+from math import ceil
 """
 Basic classes for PatternMeasure's and PatternSections
 """
+class Message(NamedTuple):
+    """
+    One line of directions: a message id (the English text with {0}, {1}, ... where the values go) and the values.
+    Translations (see src/i18n.py) are looked up by message id, so only numbers that change from pattern to pattern are values.
+    """
+    msgid:str
+    args:tuple=()
+
+    def __str__(self):
+        return self.msgid.format(*self.args)
+
 class PatternMeasure:
     """
     A base class for classes that can calculate some measurements from others.
@@ -50,7 +63,7 @@ class PatternMeasure:
                 self._label=v
         return self._label
 
-    def edit_measures(self,va=set(),vrm=set()):
+    def edit_measures(self,va=(),vrm=()):
         """
         Add/remove a single string or an iterable that can be made into a set to/from _all_measures
         """
@@ -124,10 +137,24 @@ class PatternMeasure:
         Get a list of strings for measurements that are entered in _measure_values
         """
         return set(self._measure_values.keys())
+
+    def evolve(self,measures_dict):
+        """
+        Copy-on-write edit: return a new measure with values from measures_dict set. This measure is not changed.
+        Values that are not in measures_dict are kept as they are.
+        """
+        new=copy(self)
+        new._measure_values=dict(self._measure_values)
+        new._all_measures=set(self._all_measures)
+        new._vital_measures=set(self._vital_measures)
+        for k,v in measures_dict.items():
+            new.measure_values(k,v)
+        return new
     
 class IncOrDecPatternMeasure(PatternMeasure):
     """
     This class is a pattern measure for a constant increases/decrease over a set number of rows (increase_x_by_y)
+    Ints and Fractions are calculated exactly (see exact_div). Floats are calculated as floats.
     Attributes: 
     _measure_values: dictionary
     _vital_measures: ["start_stitches"] (constant)
@@ -138,8 +165,25 @@ class IncOrDecPatternMeasure(PatternMeasure):
         We must have 3 of the 4 
         """
         super().__init__(["start_stitches"],["increase_x_every_y","end_stitches","n_rows"],measures_dict)
+        self._inputs=set(measures_dict)
         self.fill_in_missing_measures()
 
+    def evolve(self,measures_dict):
+        """
+        Copy-on-write edit: return a new measure calculated from this measure's inputs with values from measures_dict set. This measure is not changed.
+        Calculated values are calculated again, e.g. more n_rows for the same start and end stitches gives a new increase_x_every_y.
+        If that leaves all three of increase_x_every_y, end_stitches and n_rows set, the old input (not the new value) is dropped.
+        """
+        shape=["increase_x_every_y","end_stitches","n_rows"]
+        inputs={k:self.measure_values(k) for k in self._inputs if k not in measures_dict}
+        inputs.update(measures_dict)
+        old_shape=[k for k in shape if k in inputs and k not in measures_dict]
+        while sum(k in inputs for k in shape)>2 and old_shape:
+            del inputs[old_shape.pop(0)]
+        new=type(self)(inputs)
+        new.label(self.label())
+        return new
+
     def _calc_n_rows(self):
         """
         If we have min and max stitches and it's straight-up increase/decrease, calc number of rows
@@ -149,9 +193,9 @@ class IncOrDecPatternMeasure(PatternMeasure):
         if not self.have_what_i_need(need_list):
             raise ValueError("Trying to calculate number of rows in increase but missing: {0}".format(need_list-self.what_do_i_have()))
         increase_rate=self.measure_values("increase_x_every_y")
-        increase_per_row=increase_rate[0]/increase_rate[1]
+        increase_per_row=exact_div(*increase_rate)
         n_to_increase=self.measure_values("end_stitches")-self.measure_values("start_stitches")
-        self.measure_values("n_rows",n_to_increase/increase_per_row)
+        self.measure_values("n_rows",exact_div(n_to_increase,increase_per_row))
         
     def _calc_end_stitches(self):
         """"
@@ -162,7 +206,7 @@ class IncOrDecPatternMeasure(PatternMeasure):
             #raise a value error and return
             raise ValueError("Trying to calculate number of stitches at the end but missing: {0}".format(need_list-self.what_do_i_have()))
         increase_rate=self.measure_values("increase_x_every_y")
-        increase_per_row=increase_rate[0]/increase_rate[1]
+        increase_per_row=exact_div(*increase_rate)
         start=self.measure_values("start_stitches")
         n_rows=self.measure_values("n_rows")
         self.measure_values("end_stitches",start+increase_per_row*n_rows)
@@ -174,7 +218,7 @@ class IncOrDecPatternMeasure(PatternMeasure):
         need_list=["start_stitches","end_stitches","n_rows"]
         if not self.have_what_i_need(need_list):
             raise ValueError("Cannot calculate increase rate. Missing:{0}.".format(need_list-self.what_do_i_have()))
-        x=(self.end_stitches()-self.start_stitches())/self.n_rows()
+        x=exact_div(self.end_stitches()-self.start_stitches(),self.n_rows())
         self.increase_x_every_y((x,1))
             
     def start_stitches(self,v=None):
@@ -229,7 +273,7 @@ class PatternSection:
     Attributes: 
     _label (str) Label used when writing pattern directions
     _measurements (PatternMeasure): object that holds measurements for section
-    _directions (list): Directions for the pattern section in proper order. 
+    _directions (list): Directions for the pattern section in proper order. Replaced (never appended to) by write_directions.
     """
 
     def __init__(self,measures_dict,*args,label="",**kwargs):
@@ -262,11 +306,23 @@ class PatternSection:
         pass
 
     @abstractclassmethod
-    def write_directions(self):
+    def messages(self):
         """
-        How to fill the directions list
+        Return the directions for this section as a tuple of Messages. Must not change the section.
         """
         pass
+
+    def directions(self):
+        """
+        The directions for this section in English, as a tuple of lines
+        """
+        return tuple(str(m) for m in self.messages())
+
+    def write_directions(self):
+        """
+        Fill the directions list. Writing twice gives the same directions, not a doubled list.
+        """
+        self._directions=list(self.directions())
     
     @abstractclassmethod
     def end_stitches(self):
@@ -294,7 +350,42 @@ class IncOrDecPatternSection(PatternSection):
         return self._measurements.measure_values("end_stitches")
 
     def n_rows(self):
-        return self._measurements.measure_values("n_rows")    
+        return self._measurements.measure_values("n_rows")
+
+    def measures(self):
+        """
+        Dictionary of every measurement of this section (a copy, so changing it doesn't change the section)
+        """
+        m=self._measurements
+        return {k:m.measure_values(k) for k in sorted(m.what_do_i_have())}
+
+    def stitches_after(self,row):
+        """
+        Total stitches after knitting row (counting from 1) of this section.
+        increase_x_every_y increases are worked on the first row of every y rows.
+        """
+        if row<=0:
+            return self.start_stitches()
+        if row>=self.n_rows():
+            return self.end_stitches()
+        x,y=self._measurements.increase_x_every_y()
+        stitches=self.start_stitches()+x*ceil(row/y)
+        if x>=0:
+            return min(stitches,self.end_stitches())
+        return max(stitches,self.end_stitches())
+
+    def needle_counts(self,row):
+        """
+        Stitches on (Needle 1, Needle 2) after row. Magic loop splits the stitches evenly.
+        """
+        per_needle=exact_div(self.stitches_after(row),2)
+        return (per_needle,per_needle)
+
+    def row_instruction(self,row):
+        """
+        What to knit on row (counting from 1) of this section. Sections that repeat one instruction return their last line of directions.
+        """
+        return self.directions()[-1]
 
     def __str__(self):
         start=self._measurements.start_stitches()
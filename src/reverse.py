@@ -0,0 +1,162 @@
+from array import array
+from bisect import bisect_right
+from src.catalog import IntervalIndex
+from src.fit import *
+"""
+Reverse lookup: which feet can be knit with the needles and yarn weights someone already owns.
+Every needle in NEEDLE_CHART, yarn weight and knitter is worked out once: each guage and whole stitch count fits feet in an
+interval of around_foot. Queries are then bisects over the merged intervals of the needles and yarns asked about.
+"""
+
+#Largest stitch count worked out (more than any sock needs)
+MAX_STITCHES=160
+#Fit error (relative to the ideal stitch count) a foot can have and still count as knittable
+TOLERANCE=0.05
+
+class KnittableOption(NamedTuple):
+    """
+    One way to knit a sock, and the feet (around_foot, in the index's units) it fits
+    low, high: around_foot interval this option fits within the tolerance
+    """
+    yarn_weight:int
+    needle_size:float
+    knitter:float
+    guage:Guage
+    s_around_foot:int
+    low:float
+    high:float
+
+def merge_intervals(intervals):
+    """
+    Sorted, non overlapping (low,high) intervals covering the same points as intervals
+    """
+    merged=[]
+    for lo,hi in sorted(intervals):
+        if merged and lo<=merged[-1][1]:
+            if hi>merged[-1][1]:
+                merged[-1]=(merged[-1][0],hi)
+        else:
+            merged.append((lo,hi))
+    return merged
+
+def _covers(ranges,point):
+    lows,highs=ranges
+    i=bisect_right(lows,point)-1
+    return i>=0 and point<=highs[i]
+
+class ReverseIndex:
+    """
+    Knittable around_foot intervals for every yarn weight and needle.
+    Members
+    units: 'in' or 'cm' (around_foot is in these units)
+    ease: True if queried feet are already ease adjusted (like FootMeasure, FOOT_EASE is taken off measured feet)
+    _options: dictionary of (yarn weight,needle) to its KnittableOptions sorted by low
+    _ranges: dictionary of (yarn weight,needle) to merged intervals as (lows,highs) arrays
+    _index: IntervalIndex over every KnittableOption
+    """
+    def __init__(self,units='in',knitters=KNITTERS,tolerance=TOLERANCE,guesser=None,ease=False,max_stitches=MAX_STITCHES):
+        if units not in ('in','cm'):
+            raise ValueError(f"Feet are measured in 'in' or 'cm'. Units given are {units}.")
+        if not 0<tolerance<1:
+            raise ValueError(f"Tolerance must be between 0 and 1. Tolerance given is {tolerance}.")
+        self.units=units
+        self.tolerance=tolerance
+        self.ease=ease
+        guesser=StandardGuage() if guesser is None else guesser
+        scale=1 if ease else FOOT_EASE
+        self._options={}
+        for weight in sorted(RECOMMENDED_NEEDLES_IN_MM.keys()):
+            for needle in NEEDLE_CHART.keys():
+                options=[]
+                for g,knitter in self._guages(guesser,weight,needle,knitters):
+                    per_unit=g.stitches(1)*scale
+                    for s in range(MIN_STITCHES,max_stitches+1,STITCH_MULTIPLE):
+                        options.append(KnittableOption(weight,needle,knitter,g,s,s/((1+tolerance)*per_unit),s/((1-tolerance)*per_unit)))
+                if options:
+                    self._options[(weight,needle)]=sorted(options,key=lambda o:o.low)
+        self._ranges={}
+        for key,options in self._options.items():
+            merged=merge_intervals((o.low,o.high) for o in options)
+            self._ranges[key]=(array('d',(lo for lo,hi in merged)),array('d',(hi for lo,hi in merged)))
+        self._index=IntervalIndex((o.low,o.high,o) for options in self._options.values() for o in options)
+        self._inventory_ranges={}
+
+    def _guages(self,guesser,weight,needle,knitters):
+        """
+        (guage,knitter) per distinct guage for a yarn weight and needle. Needles that aren't recommended for the yarn have none.
+        """
+        guages={}
+        for knitter in knitters:
+            try:
+                g=guesser.guess_guage(weight,units=self.units,needle_size=needle,knitter=knitter)
+            except Warning:
+                continue
+            guages.setdefault(g,knitter)
+        return list(guages.items())
+
+    def _keys(self,needles=None,weights=None):
+        if needles is not None:
+            for n in needles:
+                if n not in NEEDLE_CHART:
+                    raise ValueError(f"Needle size {n}mm is not in the needle chart.")
+        return [k for k in self._options.keys() if (weights is None or k[0] in weights) and (needles is None or k[1] in needles)]
+
+    def pairs(self):
+        """
+        (yarn weight,needle) pairs that can knit anything
+        """
+        return list(self._options.keys())
+
+    def knittable(self,around_foot,needles=None,weights=None):
+        """
+        True if a foot can be knit with any of needles (mm) and yarn weights (all of them when None)
+        """
+        return any(_covers(self._ranges[k],around_foot) for k in self._keys(needles,weights))
+
+    def options(self,around_foot,needles=None,weights=None):
+        """
+        Every KnittableOption for a foot with the needles and yarn weights given, best fit first
+        """
+        needles=None if needles is None else set(needles)
+        weights=None if weights is None else set(weights)
+        self._keys(needles,weights)
+        found=[o for o in self._index.stab(around_foot)
+            if (needles is None or o.needle_size in needles) and (weights is None or o.yarn_weight in weights)]
+        scale=1 if self.ease else FOOT_EASE
+        return sorted(found,key=lambda o:(abs(o.s_around_foot-o.guage.stitches(around_foot)*scale),o.yarn_weight,o.needle_size,o.knitter))
+
+    def ranges(self,needles=None,weights=None):
+        """
+        Merged (low,high) around_foot intervals that can be knit with the needles and yarn weights given.
+        Inventories are cached, so many customers with the same needles and yarns cost one merge.
+        """
+        key=(None if needles is None else frozenset(needles),None if weights is None else frozenset(weights))
+        ranges=self._inventory_ranges.get(key)
+        if ranges is None:
+            ranges=merge_intervals((lo,hi) for k in self._keys(key[0],key[1]) for lo,hi in zip(*self._ranges[k]))
+            self._inventory_ranges[key]=ranges
+        return ranges
+
+    def query_batch(self,inventories,around_foot=None):
+        """
+        For each (needles,weights) inventory: its knittable ranges, or if around_foot is given (one foot or one per inventory)
+        whether that foot is knittable
+        """
+        inventories=list(inventories)
+        if around_foot is None:
+            return [self.ranges(needles,weights) for needles,weights in inventories]
+        feet=[around_foot]*len(inventories) if isinstance(around_foot,(int,float)) else list(around_foot)
+        if len(feet)!=len(inventories):
+            raise ValueError(f"Need one foot per inventory. Given {len(feet)} feet and {len(inventories)} inventories.")
+        found=[]
+        for (needles,weights),foot in zip(inventories,feet):
+            ranges=self.ranges(needles,weights)
+            i=bisect_right(ranges,(foot,float("inf")))-1
+            found.append(i>=0 and foot<=ranges[i][1])
+        return found
+
+    def __len__(self):
+        return len(self._index)
+
+    def __str__(self):
+        return f"Reverse index of {len(self)} knittable options for {len(self._options)} yarn weights and needles."
@@ -0,0 +1,99 @@
+from bisect import bisect_right
+from src.sock import *
+"""
+Random access to a sock pattern by absolute row number: which section, what to knit and how many stitches on each needle.
+"""
+
+class RowInfo(NamedTuple):
+    """
+    Everything a knitter needs to know about one row of the pattern
+    row: absolute row number (counting from 1 at the first toe row)
+    section: name of the section (see SockPatternSections)
+    section_row: row number within the section (counting from 1)
+    instruction: what to knit on this row
+    stitches: total stitches on both needles after the row (sum of needle_counts, in every section)
+    needle_counts: stitches on (Needle 1, Needle 2) after the row
+    """
+    row:int
+    section:str
+    section_row:int
+    instruction:str
+    stitches:float
+    needle_counts:tuple
+
+class RowIndex:
+    """
+    Row index for a SockPattern.
+    Members
+    _names: section names in knitting order
+    _sections: sections in knitting order
+    _starts: number of rows knitted before each section (sorted, so rows are found with bisect)
+    total_rows: rows in the whole pattern
+    """
+    def __init__(self,pattern):
+        self._names=[]
+        self._sections=[]
+        self._starts=[]
+        total=0
+        for name in SockPatternSections._fields:
+            s=pattern.section(name)
+            if s is None:
+                continue
+            n=int(round(s.n_rows()))
+            if n<=0:
+                continue
+            self._names.append(name)
+            self._sections.append(s)
+            self._starts.append(total)
+            total+=n
+        self.total_rows=total
+
+    def _info(self,i,row,section_row):
+        s=self._sections[i]
+        needle_counts=s.needle_counts(section_row)
+        return RowInfo(row,self._names[i],section_row,s.row_instruction(section_row),
+            sum(needle_counts),needle_counts)
+
+    def locate(self,row):
+        """
+        (section name, row within section) for an absolute row in O(log n)
+        """
+        i=self._section_index(row)
+        return self._names[i],row-self._starts[i]
+
+    def _section_index(self,row):
+        if not (1<=row<=self.total_rows):
+            raise IndexError(f"Row {row} is not in the pattern. Rows go from 1 to {self.total_rows}.")
+        return bisect_right(self._starts,row-1)-1
+
+    def section_rows(self,name):
+        """
+        (first,last) absolute rows of a section
+        """
+        i=self._names.index(name)
+        end=self._starts[i+1] if i+1<len(self._starts) else self.total_rows
+        return (self._starts[i]+1,end)
+
+    def __getitem__(self,row):
+        i=self._section_index(row)
+        return self._info(i,row,row-self._starts[i])
+
+    def iter_from(self,row=1):
+        """
+        RowInfo for every row from row to the end of the pattern. Only the first row is looked up.
+        """
+        if self.total_rows==0:
+            return
+        i=self._section_index(row)
+        while i<len(self._sections):
+            end=self._starts[i+1] if i+1<len(self._starts) else self.total_rows
+            while row<=end:
+                yield self._info(i,row,row-self._starts[i])
+                row+=1
+            i+=1
+
+    def __iter__(self):
+        return self.iter_from(1)
+
+    def __len__(self):
+        return self.total_rows
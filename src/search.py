@@ -0,0 +1,173 @@
+from bisect import bisect_left, bisect_right, insort
+from math import isnan
+from src.export import *
+"""
+Inverted index for searching archived patterns by stitch counts, guage and section start/end/rows, e.g.
+    index.find(s_around_foot=64,guage_s_per_4=30)
+    index.find(heel_start_stitches=40,instep_rows=(20,None))
+Each column has postings (value to the rows with that value) built the first time the column is searched, so equality is
+a dictionary lookup and ranges are a bisect over the column's distinct values. Patterns can be appended as they are generated.
+"""
+
+#Guage as stitches and rows per 4 units, so 30 stitches per 4 in and 7.5 per 1 in are the same guage
+GUAGE_PER_4_COLUMNS=["guage_s_per_4","guage_r_per_4"]
+INDEX_COLUMNS=COLUMNS+GUAGE_PER_4_COLUMNS
+KEY_COLUMN="key"
+
+def index_row(pattern):
+    """
+    Values for one pattern in INDEX_COLUMNS order
+    """
+    row=pattern_row(pattern)
+    g=pattern.guage
+    return row+[g.s_per_unit[0]/g.s_per_unit[1]*4,g.r_per_unit[0]/g.r_per_unit[1]*4]
+
+class PatternIndex:
+    """
+    Searchable columns for many patterns.
+    Members
+    _columns: dictionary of column name (INDEX_COLUMNS) to array('d'), one entry per pattern
+    _keys: array('q') of each pattern's key (its row number unless a key is given)
+    _postings: dictionary of column name to {value: array('l') of rows}, for columns that have been searched
+    _values: dictionary of column name to the sorted distinct values of its postings (for range queries)
+    """
+    def __init__(self,patterns=()):
+        self._columns={c:array('d') for c in INDEX_COLUMNS}
+        self._keys=array('q')
+        self._postings={}
+        self._values={}
+        self.extend(patterns)
+
+    def append(self,pattern,key=None):
+        """
+        Add one pattern (with an integer key, e.g. its id in the archive). Returns its row.
+        """
+        return self.append_row(index_row(pattern),key=key)
+
+    def append_row(self,row,key=None):
+        i=len(self._keys)
+        self._keys.append(i if key is None else key)
+        for c,v in zip(INDEX_COLUMNS,row):
+            self._columns[c].append(v)
+            postings=self._postings.get(c)
+            if postings is not None and not isnan(v):
+                self._post(c,postings,v,i)
+        return i
+
+    def extend(self,patterns,keys=None):
+        if keys is None:
+            for p in patterns:
+                self.append(p)
+        else:
+            for p,k in zip(patterns,keys):
+                self.append(p,key=k)
+
+    def _post(self,column,postings,value,row):
+        rows=postings.get(value)
+        if rows is None:
+            postings[value]=rows=array('l')
+            insort(self._values[column],value)
+        rows.append(row)
+
+    def postings(self,column):
+        """
+        {value: rows} for a column, built in one pass over the column the first time it is asked for
+        """
+        postings=self._postings.get(column)
+        if postings is None:
+            if column not in self._columns:
+                raise ValueError(f"No column named {column}. Columns are: {INDEX_COLUMNS}")
+            postings={}
+            for i,v in enumerate(self._columns[column]):
+                if isnan(v):
+                    continue
+                rows=postings.get(v)
+                if rows is None:
+                    postings[v]=rows=array('l')
+                rows.append(i)
+            self._values[column]=sorted(postings.keys())
+            self._postings[column]=postings
+        return postings
+
+    def rows(self,column,condition):
+        """
+        Rows (sorted) where column equals condition, or is in the range condition=(low,high) (inclusive, None for no limit)
+        """
+        postings=self.postings(column)
+        if not isinstance(condition,tuple):
+            return postings.get(float(condition),array('l'))
+        low,high=condition
+        values=self._values[column]
+        start=0 if low is None else bisect_left(values,low)
+        end=len(values) if high is None else bisect_right(values,high)
+        if end-start==1:
+            return postings[values[start]]
+        found=array('l')
+        for v in values[start:end]:
+            found.extend(postings[v])
+        return sorted(found)
+
+    def find_rows(self,**conditions):
+        """
+        Sorted rows matching every condition (see rows). The smallest match is checked against the others.
+        """
+        if not conditions:
+            return list(range(len(self)))
+        matches=sorted((self.rows(c,v) for c,v in conditions.items()),key=len)
+        if len(matches[0])==0:
+            return []
+        found=matches[0]
+        for m in matches[1:]:
+            m=set(m)
+            found=[i for i in found if i in m]
+            if not found:
+                break
+        return list(found)
+
+    def find(self,**conditions):
+        """
+        Keys of the patterns matching every condition, e.g. find(s_around_foot=64,heel_start_stitches=(40,48))
+        """
+        keys=self._keys
+        return [keys[i] for i in self.find_rows(**conditions)]
+
+    def count(self,**conditions):
+        return len(self.find_rows(**conditions))
+
+    def row(self,i):
+        """
+        Dictionary of column values for row i
+        """
+        return {c:a[i] for c,a in self._columns.items()}
+
+    def __getitem__(self,name):
+        if name==KEY_COLUMN:
+            return self._keys
+        return self._columns[name]
+
+    def __len__(self):
+        return len(self._keys)
+
+    def write(self,path):
+        """
+        Save the columns and keys with write_columns. Postings are rebuilt when a loaded index is searched.
+        """
+        write_columns(path,{**self._columns,KEY_COLUMN:self._keys})
+
+    @classmethod
+    def load(cls,path):
+        """
+        Index from a file written by write. Loaded indexes can be appended to.
+        """
+        index=cls()
+        with load_columns(path) as mapped:
+            missing=set(INDEX_COLUMNS+[KEY_COLUMN])-set(mapped.columns())
+            if missing:
+                raise ValueError(f"{path} is not a pattern index. Missing columns: {sorted(missing)}")
+            for c in INDEX_COLUMNS:
+                index._columns[c].frombytes(mapped[c].cast('B'))
+            index._keys.frombytes(mapped[KEY_COLUMN].cast('B'))
+        return index
+
+    def __str__(self):
+        return f"Pattern index of {len(self)} patterns."
@@ -0,0 +1,195 @@
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+from src.cli import RECORD_ERRORS, pattern_from_record
+from src.export import COLUMNS, pattern_row
+"""
+Multiprocess pattern generation that hands results back through shared memory instead of pickling SockPattern objects.
+Workers write counts (export.COLUMNS) straight into one preallocated block. Directions aren't known in size until they are
+rendered, so each task writes its patterns' directions, back to back, into a text region of exactly the size they need and
+records where each pattern's text starts in the block's offsets table.
+The parent reads columns as memoryviews into the block and only decodes directions that are asked for.
+"""
+
+#Separates lines of directions in a text region (direction lines can have newlines in them)
+LINE_SEPARATOR="\x1e"
+OK=0
+ERROR=1
+
+class _Layout:
+    """
+    Where everything lives in the shared block for n patterns:
+    columns (n doubles each, column after column), text offsets (n int64, into the pattern's task region), text lengths (n int64), then status (n bytes)
+    """
+    def __init__(self,n):
+        self.n=n
+        self.columns=0
+        self.offsets=self.columns+8*n*len(COLUMNS)
+        self.lengths=self.offsets+8*n
+        self.status=self.lengths+8*n
+        self.size=max(1,self.status+n)
+
+    def column_view(self,buf,c):
+        start=self.columns+8*self.n*c
+        return buf[start:start+8*self.n].cast('d')
+
+    def int_views(self,buf):
+        return buf[self.offsets:self.lengths].cast('q'),buf[self.lengths:self.status].cast('q')
+
+def _region_name(name,task):
+    """
+    Name of the text region for a task (from the block's name, so the parent can find regions of tasks that never reported back)
+    """
+    return f"{name}_{task}"
+
+#Set in each worker by _attach
+_worker=None
+
+def _attach(name,n):
+    global _worker
+    shm=SharedMemory(name=name)
+    layout=_Layout(n)
+    buf=shm.buf
+    _worker=(shm,layout,[layout.column_view(buf,c) for c in range(len(COLUMNS))],*layout.int_views(buf),buf)
+
+def _generate(task):
+    """
+    Worker: build patterns for records starting at index first, write their counts into the shared block and their directions
+    (or error messages) into a new text region. Returns (task,how many failed,region name or None if there's no text).
+    """
+    task,first,records,directions=task
+    shm,layout,columns,offsets,lengths,buf=_worker
+    n_errors=0
+    texts=[]
+    for i,record in enumerate(records,start=first):
+        try:
+            pattern=pattern_from_record(record)
+            row=pattern_row(pattern)
+            text=LINE_SEPARATOR.join(pattern.directions()) if directions else ""
+        except RECORD_ERRORS as e:
+            buf[layout.status+i]=ERROR
+            texts.append(str(e).encode())
+            n_errors+=1
+            continue
+        for column,v in zip(columns,row):
+            column[i]=v
+        buf[layout.status+i]=OK
+        texts.append(text.encode())
+    position=0
+    for i,data in enumerate(texts,start=first):
+        offsets[i]=position
+        lengths[i]=len(data)
+        position+=len(data)
+    if position==0:
+        return task,n_errors,None
+    region=SharedMemory(name=_region_name(shm.name,task),create=True,size=position)
+    region.buf[:position]=b"".join(texts)
+    region.close()
+    return task,n_errors,region.name
+
+def _unlink(name):
+    try:
+        region=SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    region.close()
+    region.unlink()
+
+class SharedPatternBatch:
+    """
+    Results of generate_shared. Columns are memoryviews into shared memory (no copies).
+    Call close() when finished to free the shared memory.
+    Members
+    n_errors: patterns that failed
+    text_size: bytes of directions and error messages held in shared memory
+    _regions: text region (SharedMemory, or None if the task had no text) for each task of chunk_size patterns
+    """
+    def __init__(self,shm,layout,regions,chunk_size,n_errors=0):
+        self._shm=shm
+        self.n_errors=n_errors
+        self._layout=layout
+        self._regions=regions
+        self._chunk_size=chunk_size
+        buf=shm.buf
+        self._columns={c:layout.column_view(buf,i) for i,c in enumerate(COLUMNS)}
+        self._offsets,self._lengths=layout.int_views(buf)
+        self.text_size=sum(self._lengths)
+
+    def __len__(self):
+        return self._layout.n
+
+    def columns(self):
+        return list(self._columns.keys())
+
+    def __getitem__(self,name):
+        return self._columns[name]
+
+    def ok(self,i):
+        return self._shm.buf[self._layout.status+i]==OK
+
+    def _text(self,i):
+        length=self._lengths[i]
+        if length==0:
+            return ""
+        start=self._offsets[i]
+        return bytes(self._regions[i//self._chunk_size].buf[start:start+length]).decode()
+    def error(self,i):
+        """
+        Error message for pattern i (None if it was generated)
+        """
+        return None if self.ok(i) else self._text(i)
+
+    def directions(self,i):
+        """
+        Rendered directions for pattern i, decoded on demand
+        """
+        if not self.ok(i):
+            raise ValueError(f"Pattern {i} failed: {self._text(i)}")
+        text=self._text(i)
+        return tuple(text.split(LINE_SEPARATOR)) if text else ()
+
+    def close(self):
+        for v in self._columns.values():
+            v.release()
+        self._offsets.release()
+        self._lengths.release()
+        self._columns={}
+        for region in self._regions:
+            if region is not None:
+                region.close()
+                region.unlink()
+        self._regions=[]
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        self.close()
+
+def generate_shared(records,processes=None,directions=True,chunk_size=256):
+    """
+    Generate a pattern for every record (see src/cli.py for the record format) in a pool of worker processes.
+    Each task of chunk_size records gets its own text region. Returns a SharedPatternBatch.
+    """
+    records=list(records)
+    layout=_Layout(len(records))
+    shm=SharedMemory(create=True,size=layout.size)
+    tasks=[(k,i,records[i:i+chunk_size],directions) for k,i in enumerate(range(0,len(records),chunk_size))]
+    regions=[None]*len(tasks)
+    try:
+        n_errors=0
+        with Pool(processes,initializer=_attach,initargs=(shm.name,layout.n)) as pool:
+            for task,n_task_errors,region_name in pool.imap_unordered(_generate,tasks):
+                n_errors+=n_task_errors
+                if region_name is not None:
+                    regions[task]=SharedMemory(name=region_name)
+    except BaseException:
+        for k in range(len(tasks)):
+            if regions[k] is not None:
+                regions[k].close()
+            _unlink(_region_name(shm.name,k))
+        shm.close()
+        shm.unlink()
+        raise
+    return SharedPatternBatch(shm,layout,regions,chunk_size,n_errors)
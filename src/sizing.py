@@ -0,0 +1,159 @@
+from math import sqrt
+from src.fit import *
+"""
+Cluster a population of foot measurements into a small set of stock sizes with whole stitch counts.
+"""
+
+class StockSize(NamedTuple):
+    """
+    One stock size of a size chart
+    size: size number (0 is the smallest)
+    around_foot, toe_to_heel: foot measurements (before ease) the size is made for
+    stitches: SockStitches for the size (whole rows, stitches around a multiple of STITCH_MULTIPLE)
+    count: feet in the population that get this size
+    mean_error: mean fit error of those feet
+    coverage: fraction of those feet that fit within the tolerance
+    """
+    size:int
+    around_foot:float
+    toe_to_heel:float
+    stitches:SockStitches
+    count:int
+    mean_error:float
+    coverage:float
+
+def fit_error(stitches,rows,s_around_foot,r_toe_to_heel):
+    """
+    Fit error of a size (stitches,rows) on a foot that ideally needs s_around_foot stitches and r_toe_to_heel rows after ease.
+    Relative errors around and along the foot, combined.
+    """
+    return sqrt(((stitches-s_around_foot)/s_around_foot)**2+((rows-r_toe_to_heel)/r_toe_to_heel)**2)
+
+class SizeChart:
+    """
+    k-means style size chart for a guage.
+    Members
+    guage: Guage every size is knit in
+    k: number of stock sizes
+    tolerance: fit error a foot can have and still count as fitting
+    multiple: stitches around are a multiple of this (a multiple of STITCH_MULTIPLE, so the toe and gusset increase rows are whole)
+    chunk_size: points handled at a time, so memory doesn't grow with the population
+    sizes: list of StockSize once fit() has run
+    collapsed: (stitches,rows) of the sizes more than one of the k centres snapped to, so fit() found fewer than k sizes
+    """
+    def __init__(self,guage,k,tolerance=0.05,multiple=STITCH_MULTIPLE,max_iter=50,chunk_size=65536):
+        if k<1:
+            raise ValueError(f"Need at least one size. k given is {k}.")
+        if multiple%STITCH_MULTIPLE:
+            raise ValueError(f"Stitches around must be a multiple of {STITCH_MULTIPLE}. Multiple given is {multiple}.")
+        self.guage=guage
+        self.k=k
+        self.tolerance=tolerance
+        self.multiple=multiple
+        self.max_iter=max_iter
+        self.chunk_size=chunk_size
+        self.r_per_inch=rows_per_inch(guage)
+        self.sizes=[]
+        self.collapsed=[]
+        self.n_iter=0
+
+    def _chunks(self,around_foot,toe_to_heel):
+        """
+        Ease adjusted (stitches,rows) for each chunk of points
+        """
+        s_factor=self.guage.stitches(FOOT_EASE)
+        r_factor=self.guage.rows(FOOT_EASE)
+        for i in range(0,len(around_foot),self.chunk_size):
+            a=around_foot[i:i+self.chunk_size]
+            l=toe_to_heel[i:i+self.chunk_size]
+            yield [v*s_factor for v in a],[v*r_factor for v in l]
+
+    def _snap(self,s,r):
+        """
+        Nearest whole size: stitches around a multiple of self.multiple, whole rows
+        """
+        return (max(1,round(s/self.multiple))*self.multiple,max(1,round(r)))
+
+    def _initial_centers(self,around_foot,toe_to_heel):
+        """
+        Spread starting sizes over quantiles of stitches around, from an evenly spaced sample of the population
+        """
+        step=max(1,len(around_foot)//10000)
+        s_factor=self.guage.stitches(FOOT_EASE)
+        r_factor=self.guage.rows(FOOT_EASE)
+        sample=sorted((around_foot[i]*s_factor,toe_to_heel[i]*r_factor) for i in range(0,len(around_foot),step))
+        return [self._snap(*sample[int((j+0.5)*len(sample)/self.k)]) for j in range(self.k)]
+
+    @staticmethod
+    def _nearest(centers,s,r):
+        best=0
+        best_error=None
+        for j,(cs,cr) in enumerate(centers):
+            e=fit_error(cs,cr,s,r)
+            if best_error is None or e<best_error:
+                best,best_error=j,e
+        return best,best_error
+
+    def fit(self,around_foot,toe_to_heel):
+        """
+        Find k stock sizes for a population. around_foot and toe_to_heel are equal length sequences
+        (lists, arrays or memory-mapped columns) of foot measurements before ease, in the guage's units.
+        """
+        if len(around_foot)!=len(toe_to_heel):
+            raise ValueError("Need a toe_to_heel for every around_foot.")
+        if len(around_foot)==0:
+            raise ValueError("Need at least one foot to make a size chart.")
+        centers=self._initial_centers(around_foot,toe_to_heel)
+        for n_iter in range(1,self.max_iter+1):
+            sums=[[0.0,0.0,0] for c in centers]
+            for s_chunk,r_chunk in self._chunks(around_foot,toe_to_heel):
+                for s,r in zip(s_chunk,r_chunk):
+                    j,e=self._nearest(centers,s,r)
+                    acc=sums[j]
+                    acc[0]+=s
+                    acc[1]+=r
+                    acc[2]+=1
+            new_centers=[self._snap(acc[0]/acc[2],acc[1]/acc[2]) if acc[2] else c for c,acc in zip(centers,sums)]
+            converged=(new_centers==centers)
+            centers=new_centers
+            if converged:
+                break
+        self.n_iter=n_iter
+        self.collapsed=sorted(c for c in set(centers) if centers.count(c)>1)
+        self.sizes=self._report(sorted(set(centers)),around_foot,toe_to_heel)
+        return self.sizes
+
+    def _report(self,centers,around_foot,toe_to_heel):
+        counts=[0]*len(centers)
+        errors=[0.0]*len(centers)
+        covered=[0]*len(centers)
+        for s_chunk,r_chunk in self._chunks(around_foot,toe_to_heel):
+            for s,r in zip(s_chunk,r_chunk):
+                j,e=self._nearest(centers,s,r)
+                counts[j]+=1
+                errors[j]+=e
+                covered[j]+=(e<=self.tolerance)
+        sizes=[]
+        for j,(s,r) in enumerate(centers):
+            n=counts[j]
+            sizes.append(StockSize(j,self.guage.units_to_stitches(s)/FOOT_EASE,self.guage.units_to_rows(r)/FOOT_EASE,
+                SockStitches(s,r,self.r_per_inch),n,errors[j]/n if n else 0.0,covered[j]/n if n else 0.0))
+        return sizes
+
+    def coverage(self):
+        """
+        Fraction of the whole population that fits within the tolerance
+        """
+        total=sum(s.count for s in self.sizes)
+        if total==0:
+            return 0.0
+        return sum(s.coverage*s.count for s in self.sizes)/total
+
+    def total_error(self):
+        return sum(s.mean_error*s.count for s in self.sizes)
+
+    def __str__(self):
+        chart="Size chart with {0} sizes for {1}".format(len(self.sizes) or self.k,self.guage)
+        if self.collapsed:
+            chart+=" {0} of the {1} sizes asked for collapsed into sizes {2}.".format(self.k-len(self.sizes),self.k,self.collapsed)
+        return chart
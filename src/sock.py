@@ -1,3 +1,5 @@
+from array import array
+from bisect import bisect_right
 from src.pattern import *
 
 class ToeUpToeML(IncOrDecPatternSection):
@@ -16,6 +18,8 @@ class ToeUpToeML(IncOrDecPatternSection):
         start_stitches=measures_dict.get("start_stitches")
         if start_stitches is None:
             raise ValueError("Toe measures dict has only: {0}. Need start_stitches to calculate toe.".format(measures_dict.keys()))
+        #Work on a copy so the caller's dictionary can be shared
+        measures_dict=dict(measures_dict)
         inc=measures_dict.get("increase_x_every_y")
         if inc is None:
             if (measures_dict["start_stitches"]-measures_dict["end_stitches"])%4==0:
@@ -26,31 +30,44 @@ class ToeUpToeML(IncOrDecPatternSection):
         """
         Instructions for starting. This is a toe-up sock, so the toe starts with cast-on instructions.
         """
+        return str(self.cast_on_message())
+
+    def cast_on_message(self):
         n_start=self._measurements.start_stitches()
         if n_start%2:
             raise Warning("Starting stitches is an odd number. Adding 1 stitch.")
         half_of_n_start=int(round(n_start/2))
-        return f"Cast on {n_start} ({half_of_n_start} per needle) in preferred style (Figure 8, crocet, etc).\nKnit all stitches around."
+        return Message("Cast on {0} ({1} per needle) in preferred style (Figure 8, crocet, etc).\nKnit all stitches around.",(n_start,half_of_n_start))
     
     def how_to_end(self):
         """
         Instructions for the end with number of stitches you should have.
         """
+        return str(self.end_message())
+
+    def end_message(self):
         n_end=self._measurements.end_stitches()
-        per_needle=n_end/2
-        return f"Repeat Row 1 and Row 2 until there are {n_end} stitches total on your two needles ({per_needle} on each needle).\n"
+        per_needle=self.needle_counts(self.n_rows())[0]
+        return Message("Repeat Row 1 and Row 2 until there are {0} stitches total on your two needles ({1} on each needle).\n",(n_end,per_needle))
 
     def pattern_repeat(self):
         return f"Row 1: Needle 1: K1 M1R, K to last stitch, M1L K1.\n   Needle 2:K1 M1R, K to last stitch, M1L K1.\nRow 2: Knit all stitches around.\n"
 
-    def write_directions(self):
+    def row_instruction(self,row):
+        """
+        Odd rows are Row 1 (increase) and even rows are Row 2 (knit around).
         """
-        Add lines to directions list.
+        row_1,row_2=self.pattern_repeat().split("Row 2:")
+        return row_1.strip() if row%2 else ("Row 2:"+row_2).strip()
+
+    def messages(self):
+        """
+        Lines of the toe directions.
         """
-        self._directions.append(self.how_to_cast_on())
-        self._directions.append(self.pattern_repeat())
-        self._directions.append(self.how_to_end())
-        self._directions.append("You will have knitted {0} rows.".format(self._measurements.n_rows()))
+        return (self.cast_on_message(),
+            Message(self.pattern_repeat()),
+            self.end_message(),
+            Message("You will have knitted {0} rows.",(self._measurements.n_rows(),)))
     
     def __repr__(self):
         start=self._measurements.start_stitches()
@@ -77,14 +94,16 @@ class InstepML(IncOrDecPatternSection):
         """
         Instep is just knitting around.
         """
-        n_rows=self._measurements.n_rows()
-        return f"Knit all stitches around for {n_rows} rows."
+        return str(self.end_message())
+
+    def end_message(self):
+        return Message("Knit all stitches around for {0} rows.",(self._measurements.n_rows(),))
     
-    def write_directions(self):
+    def messages(self):
         """
-        Gusset is just one line of directions.
+        Instep is just one line of directions.
         """
-        self._directions.append(self.how_to_end())
+        return (self.end_message(),)
 
     def __str__(self):
         start=self._measurements.start_stitches()
@@ -125,22 +144,34 @@ class ToeUpGuessetML(IncOrDecPatternSection):
         """
         return f"Row 1: Needle 1: Knit all stitches across. Needle 2: K1, M1R, Knit across to last stitche. M1L K1.\nRow 2: Knit all stitches around.\n"
 
+    def row_instruction(self,row):
+        """
+        Odd rows are Row 1 (increase on Needle 2) and even rows are Row 2 (knit around).
+        """
+        row_1,row_2=self.pattern_repeat().split("Row 2:")
+        return row_1.strip() if row%2 else ("Row 2:"+row_2).strip()
+
+    def needle_counts(self,row):
+        """
+        Needle 1 keeps half of the starting stitches. All the increases are on Needle 2.
+        """
+        n_per_needle_begin=exact_div(self.start_stitches(),2)
+        return (n_per_needle_begin,self.stitches_after(row)-n_per_needle_begin)
+
     def how_to_end(self):
         """
         Calculate how many stitches are on each needle by end and return line of pattern.
         """
-        end_stitches=self._measurements.end_stitches()
-        start_stiches=self._measurements.start_stitches()
-        n_per_needle_begin=start_stiches/2
-        n_needle_2_end=end_stitches-n_per_needle_begin
-        return f"Repeat Rows 1 and 2 until there are {n_per_needle_begin} stitches on Needle 1 and {n_needle_2_end} stitches on Needle 2."
+        return str(self.end_message())
 
-    def write_directions(self):
+    def end_message(self):
+        return Message("Repeat Rows 1 and 2 until there are {0} stitches on Needle 1 and {1} stitches on Needle 2.",self.needle_counts(self.n_rows()))
+
+    def messages(self):
         """
-        Add all pattern lines to _directions.
+        Lines of the gusset directions.
         """
-        self._directions.append(self.pattern_repeat())
-        self._directions.append(self.how_to_end())
+        return (Message(self.pattern_repeat()),self.end_message())
     
     def __str__(self):
         start=self._measurements.start_stitches()
@@ -152,6 +183,54 @@ class ToeUpGuessetML(IncOrDecPatternSection):
         end=self._measurements.end_stitches()
         return f"ToeUpGussetML({{'start_stitches':{start},'end_stitches':{end},'increase_x_every_y':(1,1)}})."
 
+class HeelGeometry(NamedTuple):
+    """
+    Short row layout for a heel turn that starts with start_stitches and ends with end_stitches
+    n_rows: short rows (one decrease each)
+    first_turn: stitches knit on Row 1 before ssk k1, turn
+    second_turn: stitches purled on Row 2 between S1 and p2tog
+    left_side, right_side: stitches left at each side after Rows 1 and 2. Each later row takes 2 from one side.
+    """
+    start_stitches:int
+    end_stitches:int
+    n_rows:int
+    first_turn:int
+    second_turn:int
+    left_side:int
+    right_side:int
+
+def heel_turn_geometry(start_stitches,end_stitches):
+    """
+    Closed form heel turn for any size. Row r>2 works second_turn+r-2 stitches between S1 and the decrease.
+    Odd rows (3,5,...) use the left side stitches and even rows use the right side, 2 stitches per row.
+    """
+    start=int(round(start_stitches))
+    end=int(round(end_stitches))
+    n_rows=start-end
+    if n_rows<2:
+        raise ValueError(f"A heel turn needs at least 2 short rows. {start} stitches to {end} stitches has {n_rows}.")
+    left_rows=(n_rows-1)//2
+    right_rows=(n_rows-2)//2
+    second_turn=2*end-start-1
+    if second_turn<0:
+        raise ValueError(f"Too few stitches left to turn a heel from {start} stitches to {end} stitches. End with at least {start//2+1} stitches.")
+    return HeelGeometry(start,end,n_rows,start-2*left_rows-3,second_turn,2*left_rows,2*right_rows)
+
+def heel_turn_geometries(start_stitches,end_stitches):
+    """
+    Heel turn geometry for a whole size run. Returns a dictionary of HeelGeometry field name to array of values (one per size).
+    """
+    if len(start_stitches)!=len(end_stitches):
+        raise ValueError("Need one end_stitches for every start_stitches.")
+    columns={f:array('l') for f in HeelGeometry._fields}
+    for g in map(heel_turn_geometry,start_stitches,end_stitches):
+        for f,v in zip(HeelGeometry._fields,g):
+            columns[f].append(v)
+    return columns
+
+HEEL_START=Message("Knit across needle 1. Leave all top-of-foot stitches on the cable and work back and forth on the gusset stitches as follows:\n")
+KNIT_ONE_ROUND=Message("Knit 1 row around.\n")
+
 class HeelTurnML(IncOrDecPatternSection):
     """
     Heel turn with magic loop.
@@ -162,7 +241,7 @@ class HeelTurnML(IncOrDecPatternSection):
             new_measures["increase_x_every_y"]=(-1,1)
             super().__init__(new_measures,label=label)
         else:
-            super().__init__(measures_dict,label,label)
+            super().__init__(measures_dict,label=label)
         if len(self.label())==0:
             self.label("Heel Turn")
         self.fill_in_missing_measures()
@@ -170,16 +249,22 @@ class HeelTurnML(IncOrDecPatternSection):
     def make_measure(self,measures_dict):
         self._measurements=IncOrDecPatternMeasure(measures_dict)
 
+    def geometry(self):
+        """
+        HeelGeometry for this heel's start and end stitches
+        """
+        return heel_turn_geometry(self.start_stitches(),self.end_stitches())
+
     def _calc_first_turn(self):
-        if not self._measurements.have_what_i_need(["start_stitches"]):
-            raise ValueError("start_stitches not in measures dictionary.")
-        self._measurements.measure_values("first_turn",value=self.start_stitches()-1)
+        if not self._measurements.have_what_i_need(["start_stitches","end_stitches"]):
+            raise ValueError("start_stitches and end_stitches must be in measures dictionary.")
+        self._measurements.measure_values("first_turn",value=self.geometry().first_turn)
     
     def _calc_second_turn(self):
         """
-        Heels don't vary that much. The second turn is always 7
+        The second turn grows with the heel: 2*end_stitches-start_stitches-1
         """
-        self._measurements.measure_values("second_turn",7)
+        self._measurements.measure_values("second_turn",self.geometry().second_turn)
 
     def fill_in_missing_measures(self):
         """
@@ -191,20 +276,53 @@ class HeelTurnML(IncOrDecPatternSection):
         if "second_turn" not in values_i_have:
             self._calc_second_turn()
     
-    def write_directions(self):
-        self._directions.append("Knit across needle 1. Leave all top-of-foot stitches on the cable and work back and forth on the gusset stitches as follows:\n")
-        row=1
-        self._directions.append("Row {0}: Knit {1} ssk k1,turn.".format(row,self._measurements.measure_values("end_stitches")-1))
+    def row_instruction(self,row):
+        """
+        Short row directions for one row of the heel turn.
+        """
+        return str(self.row_message(row))
+
+    def row_message(self,row):
+        if row==1:
+            return Message("Row 1: Knit {0} ssk k1,turn.",(self._measurements.measure_values("first_turn"),))
         start=self._measurements.measure_values("second_turn")
-        for i in range(1,11):
-            row=row+1
-            if row%2==0:
-                self._directions.append("Row {0}: S1, p{1}, p2tog, p1, turn.".format(row,start+i-1))
-            else:
-                self._directions.append("Row {0}: S1, k{1}, ssk, k1, turn.".format(row,start+i-1))
-
-        self._directions.append("Continue until there are {0} stitches on the working needle.\n".format(self._measurements.end_stitches()))
-        self._directions.append("Knit 1 row around.\n")
+        if row%2==0:
+            return Message("Row {0}: S1, p{1}, p2tog, p1, turn.",(row,start+row-2))
+        return Message("Row {0}: S1, k{1}, ssk, k1, turn.",(row,start+row-2))
+
+    def iter_rows(self):
+        """
+        Directions for every short row, one at a time.
+        """
+        for row in range(1,self.geometry().n_rows+1):
+            yield self.row_instruction(row)
+
+    def needle_counts(self,row):
+        """
+        The top-of-foot stitches wait on Needle 1 while the heel is turned on Needle 2.
+        """
+        return (self.end_stitches(),self.stitches_after(row))
+
+    def summary(self):
+        """
+        Short version of the directions: the first three rows and how to carry on.
+        """
+        return tuple(str(m) for m in self.summary_messages())
+
+    def summary_messages(self):
+        g=self.geometry()
+        messages=[HEEL_START]
+        messages+=[self.row_message(row) for row in range(1,min(3,g.n_rows)+1)]
+        messages.append(Message("Continue as set, working 1 more stitch before the decrease on every row, until there are {0} stitches on the working needle ({1} rows).\n",(g.end_stitches,g.n_rows)))
+        messages.append(KNIT_ONE_ROUND)
+        return tuple(messages)
+
+    def messages(self):
+        messages=[HEEL_START]
+        messages+=[self.row_message(row) for row in range(1,self.geometry().n_rows+1)]
+        messages.append(Message("There are now {0} stitches on the working needle.\n",(self._measurements.end_stitches(),)))
+        messages.append(KNIT_ONE_ROUND)
+        return tuple(messages)
     
     def __str__(self):
         start=self.start_stitches()
@@ -225,10 +343,13 @@ class BasicCuff(IncOrDecPatternSection):
     def make_measure(self,measures_dict):
         self._measurements=IncOrDecPatternMeasure(measures_dict)
     
-    def write_directions(self):
-        self._directions.append("Row 1: K1, P1 for all {0} around".format(self._measurements.measure_values("start_stitches")))
-        self._directions.append("Repeat Row 1 for {0} rows.".format(self._measurements.measure_values("n_rows")))
-        self._directions.append("Bind off LOOSELY (or you won't be able to get the sock onto your foot).")
+    def row_instruction(self,row):
+        return self.directions()[0]
+
+    def messages(self):
+        return (Message("Row 1: K1, P1 for all {0} around",(self._measurements.measure_values("start_stitches"),)),
+            Message("Repeat Row 1 for {0} rows.",(self._measurements.measure_values("n_rows"),)),
+            Message("Bind off LOOSELY (or you won't be able to get the sock onto your foot)."))
     
     def __str__(self):
         return "Cuff {0} stitches for {1} rows".format(self.start_stitches(),self.n_rows())
@@ -236,15 +357,151 @@ class BasicCuff(IncOrDecPatternSection):
     def __repr__(self):
         return "Cuff({'start_stitches':{0},'end_stitches':{0},n_rows: {1})".format(self.start_stitches(),self.n_rows())
 
+def leg_increases(start_stitches,calf_stitches):
+    """
+    Number of calf increase rows. Increases are worked 2 at a time and the leg never decreases.
+    """
+    return max(0,round((calf_stitches-start_stitches)/2))
+
+def leg_end_stitches(start_stitches,calf_stitches):
+    """
+    Stitches at the top of the calf shaping
+    """
+    return start_stitches+2*leg_increases(start_stitches,calf_stitches)
+
+def leg_schedule(start_stitches,ankle_stitches,calf_stitches,calf_rows):
+    """
+    Leg rows (counting from 1) that are increase rows. The leg's circumference grows in a straight line from ankle_stitches
+    at the heel to calf_stitches at row calf_rows. Increase k is worked on the first row where that line reaches start_stitches+2k-1,
+    so a leg that starts wider than the ankle knits straight until the calf catches up.
+    """
+    n_increases=leg_increases(start_stitches,calf_stitches)
+    if n_increases>calf_rows:
+        raise ValueError(f"Not enough rows to shape the calf: {n_increases} increase rows in {calf_rows} rows.")
+    rows=[]
+    last=0
+    for k in range(1,n_increases+1):
+        if calf_stitches>ankle_stitches:
+            row=ceil((start_stitches+2*k-1-ankle_stitches)*calf_rows/(calf_stitches-ankle_stitches))
+        else:
+            row=k
+        #At least one row after the last increase, and every increase is done by calf_rows
+        row=min(max(row,last+1),calf_rows-(n_increases-k))
+        rows.append(row)
+        last=row
+    return tuple(rows)
+
+def leg_schedules(start_stitches,ankle_stitches,calf_stitches,calf_rows):
+    """
+    Calf shaping for a whole batch of customers. Returns a dictionary of arrays:
+    end_stitches (one per customer), offsets (one per customer plus one) and rows (every customer's increase rows, back to back).
+    Customer i's increase rows are rows[offsets[i]:offsets[i+1]].
+    """
+    n=len(start_stitches)
+    if not (len(ankle_stitches)==len(calf_stitches)==len(calf_rows)==n):
+        raise ValueError("Need an ankle, a calf and calf rows for every start_stitches.")
+    columns={"end_stitches":array('d'),"offsets":array('l',[0]),"rows":array('l')}
+    for start,ankle,calf,r in zip(start_stitches,ankle_stitches,calf_stitches,calf_rows):
+        columns["end_stitches"].append(leg_end_stitches(start,calf))
+        columns["rows"].extend(leg_schedule(start,ankle,calf,r))
+        columns["offsets"].append(len(columns["rows"]))
+    return columns
+
+class CalfShapingLeg(IncOrDecPatternSection):
+    """
+    Leg of a knee-high (or any length) toe-up sock with calf shaping on Needle 2 (the back of the leg).
+    measures_dict: start_stitches, n_rows (leg rows), calf_stitches, and optionally ankle_stitches (start_stitches by default)
+    and calf_rows (rows to the widest part of the calf, n_rows by default)
+    """
+    def __init__(self,measures_dict,label=""):
+        super().__init__(measures_dict,label=label)
+        if len(self.label())==0:
+            self.label("Leg")
+
+    def make_measure(self,measures_dict):
+        measures_dict=dict(measures_dict)
+        start=measures_dict.get("start_stitches")
+        n_rows=measures_dict.get("n_rows")
+        if start is None or n_rows is None:
+            raise ValueError("Leg measures dict has only: {0}. Need start_stitches and n_rows.".format(measures_dict.keys()))
+        if n_rows<1:
+            raise ValueError(f"A leg needs at least 1 row. Rows given is {n_rows}.")
+        measures_dict.setdefault("calf_stitches",start)
+        measures_dict.setdefault("ankle_stitches",start)
+        measures_dict["calf_rows"]=min(measures_dict.get("calf_rows",n_rows),n_rows)
+        measures_dict["end_stitches"]=leg_end_stitches(start,measures_dict["calf_stitches"])
+        self._schedule=leg_schedule(start,measures_dict["ankle_stitches"],measures_dict["calf_stitches"],measures_dict["calf_rows"])
+        self._measurements=IncOrDecPatternMeasure(measures_dict)
+
+    def schedule(self):
+        """
+        Leg rows that are increase rows
+        """
+        return self._schedule
+
+    def stitches_after(self,row):
+        if row<=0:
+            return self.start_stitches()
+        return self.start_stitches()+2*bisect_right(self._schedule,row)
+
+    def needle_counts(self,row):
+        """
+        Needle 1 (front of the leg) keeps half of the starting stitches. The calf increases are on Needle 2.
+        """
+        n_needle_1=exact_div(self.start_stitches(),2)
+        return (n_needle_1,self.stitches_after(row)-n_needle_1)
+
+    def increase_row(self):
+        return "Increase row: Needle 1: Knit all stitches across. Needle 2: K1, M1R, knit to last stitch, M1L, K1."
+
+    def row_instruction(self,row):
+        if row in self._schedule:
+            return self.increase_row()
+        return "Knit all stitches around."
+
+    def messages(self):
+        n_rows=self._measurements.n_rows()
+        if len(self._schedule)==0:
+            return (Message("Leg: Knit all stitches around for {0} rows.",(n_rows,)),)
+        n_needle_1,n_needle_2=self.needle_counts(n_rows)
+        return (Message(self.increase_row()),
+            Message("Leg: Knit {0} rows around, working the increase row on leg rows {1}.",(n_rows,", ".join(str(r) for r in self._schedule))),
+            Message("There are now {0} stitches ({1} on Needle 1 and {2} on Needle 2).",(self.end_stitches(),n_needle_1,n_needle_2)))
+
+    def __str__(self):
+        return "Leg {0} stitches inc to {1} stitches over {2} rows.".format(self.start_stitches(),self.end_stitches(),self.n_rows())
+
+    def __repr__(self):
+        m=self._measurements
+        return "CalfShapingLeg({{'start_stitches':{0},'n_rows':{1},'ankle_stitches':{2},'calf_stitches':{3},'calf_rows':{4}}})".format(
+            m.start_stitches(),m.n_rows(),m.measure_values("ankle_stitches"),m.measure_values("calf_stitches"),m.measure_values("calf_rows"))
+
+#Socks are knit 10% smaller than the foot (negative ease)
+FOOT_EASE=0.9
+#FOOT_EASE for exact arithmetic
+FOOT_EASE_EXACT=Fraction(9,10)
+#Optional leg measurements. Circumferences get the same negative ease as the foot. Lengths don't.
+LEG_CIRCUMFERENCES=("around_ankle","around_calf")
+LEG_LENGTHS=("leg_length","calf_height")
+#(stitches, rows) of the toe and gusset increases
+TOE_INCREASE=(4,2)
+GUSSET_INCREASE=(2,2)
+
 class FootMeasure(PatternMeasure):
     """
     A measurement class to hold physical measurements for a foot.
     Members
     units: 'in' or 'cm' ('in' by default)
     ease_adjusted: Socks have 10% or 1-1.5 inches negative ease. bool for whether foot measurements have been ease adjusted. 
+    verbose: print notes to the screen (False when output must stay clean, e.g. in a pipeline)
+    exact: keep measurements as ints or Fractions (see to_exact) instead of floats
     """
-    def __init__(self,measure_dict,units='in',ease=False):
+    def __init__(self,measure_dict,units='in',ease=False,verbose=True,exact=False):
+        if exact:
+            measure_dict={k:to_exact(v) for k,v in measure_dict.items()}
         super().__init__(["around_foot","toe_to_heel"],None,measure_dict)
+        self.verbose=verbose
+        self.exact=exact
         if units in ['cm', 'in']:
             self.units=units
         else:
@@ -258,10 +515,15 @@ class FootMeasure(PatternMeasure):
     
     def calc_ease(self):
         if self.ease_adjusted:
-            print("Measurements already ease adjusted: "+self.__str__())
+            if self.verbose:
+                print("Measurements already ease adjusted: "+self.__str__())
             return
-        self.measure_values("around_foot",value=(self.measure_values("around_foot")*0.9))
-        self.measure_values("toe_to_heel",value=(self.measure_values("toe_to_heel")*0.9))
+        ease=FOOT_EASE_EXACT if self.exact else FOOT_EASE
+        self.measure_values("around_foot",value=(self.measure_values("around_foot")*ease))
+        self.measure_values("toe_to_heel",value=(self.measure_values("toe_to_heel")*ease))
+        for k in LEG_CIRCUMFERENCES:
+            if k in self.what_do_i_have():
+                self.measure_values(k,value=(self.measure_values(k)*ease))
         self.ease_adjusted=True
     
     def __str__(self):
@@ -273,22 +535,49 @@ class FootMeasure(PatternMeasure):
 class SockStitches(NamedTuple):
     """
     NamedTuple that holds vital stitch statistics for a sock pattern
+    Int and Fraction counts stay exact (and hashable) through every property. Float counts give floats.
     """
     s_around_foot:float 
     r_toe_to_heel:float
     r_per_inch:float
     @property
     def toe_start(self):
-        return round(self.s_around_foot/2)
+        return round(exact_div(self.s_around_foot,2))
     @property
     def toe_rows(self):
-        return round(self.s_around_foot/2)
+        return round(exact_div(self.s_around_foot,2))
     @property
     def instep_rows(self):
         return self.r_toe_to_heel-self.toe_rows-self.r_per_inch*2
     @property
     def gusset_increase(self):
-        return self.s_around_foot/4
+        return exact_div(self.s_around_foot,4)
+
+class LegStitches(NamedTuple):
+    """
+    NamedTuple that holds the stitch and row counts for a sock's leg
+    s_ankle, s_calf: stitches around the ankle and the widest part of the calf
+    r_calf: leg rows to the widest part of the calf
+    r_leg: leg rows (not counting the cuff)
+    """
+    s_ankle:float
+    s_calf:float
+    r_calf:int
+    r_leg:int
+
+def leg_stitches(foot_measurements,guage,s_around_foot,exact=False):
+    """
+    LegStitches from the leg measurements in a FootMeasure (None if it has no leg_length).
+    Missing around_ankle and around_calf give a straight leg. A missing calf_height puts the widest part of the calf at the top of the leg.
+    """
+    have=foot_measurements.what_do_i_have()
+    if "leg_length" not in have:
+        return None
+    def stitches(k):
+        return guage.stitches(foot_measurements.measure_values(k),exact=exact) if k in have else s_around_foot
+    r_leg=round(guage.rows(foot_measurements.measure_values("leg_length"),exact=exact))
+    r_calf=round(guage.rows(foot_measurements.measure_values("calf_height"),exact=exact)) if "calf_height" in have else r_leg
+    return LegStitches(stitches("around_ankle"),stitches("around_calf"),min(r_calf,r_leg),r_leg)
 
 class SockPatternSections(NamedTuple):
     toe:float
@@ -298,36 +587,149 @@ class SockPatternSections(NamedTuple):
     leg:float
     cuff: float 
 
+def rows_per_inch(guage):
+    """
+    Whole rows per inch for a guage. Sock patterns measure the cuff and the heel allowance in rows per inch.
+    """
+    r_per_unit=round(guage.r_per_unit[0]/guage.r_per_unit[1])
+    if not (guage.units=='in'):
+        r_per_unit=round(r_per_unit*2.54)
+    return r_per_unit
+
+def check_overrides(overrides):
+    """
+    Copy of a section overrides dictionary (section name to measure values), checked for section names
+    """
+    if overrides is None:
+        return {}
+    for k in overrides.keys():
+        if k not in SockPatternSections._fields:
+            raise ValueError(f"Can't override section {k}. Sections are: {SockPatternSections._fields}")
+    return {k:dict(v) for k,v in overrides.items() if v}
+
 class SockPattern():
     """
     Implementation for measurements needed by any sock pattern.
+    Sections are built the first time they are used and cached in _sections.
+    exact=True carries stitch and row counts as ints or Fractions instead of floats, so sections join without float error
+    and the same inputs always give the same (hashable) counts.
+    Members
+    _sections: dictionary of section name to built section (None for sections the pattern doesn't have)
+    _built_for: the inputs the cached sections were built from
+    overrides: dictionary of section name to measure values that replace the calculated ones, e.g. {"cuff":{"n_rows":16}}
     """
-    def __init__(self,foot_measure_dict,guage,**kwargs):
+    def __init__(self,foot_measure_dict,guage,verbose=True,validate=True,exact=False,overrides=None,**kwargs):
         if not (isinstance(guage.s_per_unit,tuple) and isinstance(guage.r_per_unit,tuple) and isinstance(guage.units,str)):
             raise ValueError("Guage should be Guage((int,int),(int,int),units). Guage entered is {0}".format(guage.__repr__()))
         self.guage=guage
-        self.foot_measurements=FootMeasure(foot_measure_dict,units=guage.units,**kwargs)
-        foot_stitches=guage.stitches(self.foot_measurements.measure_values('around_foot'))
-        total_foot_rows=guage.rows(self.foot_measurements.measure_values('toe_to_heel'))
-        r_per_unit=round(guage.r_per_unit[0]/guage.r_per_unit[1])
-        if not (guage.units=='in'):
-            r_per_unit=round(r_per_unit*2.54) 
-        self.stitches=SockStitches(foot_stitches,total_foot_rows,r_per_unit)
+        self.verbose=verbose
+        self.foot_measurements=FootMeasure(foot_measure_dict,units=guage.units,verbose=verbose,exact=exact,**kwargs)
+        foot_stitches=guage.stitches(self.foot_measurements.measure_values('around_foot'),exact=exact)
+        total_foot_rows=guage.rows(self.foot_measurements.measure_values('toe_to_heel'),exact=exact)
+        self.stitches=SockStitches(foot_stitches,total_foot_rows,rows_per_inch(guage))
+        self.leg_stitches=leg_stitches(self.foot_measurements,guage,foot_stitches,exact=exact)
+        self.overrides=check_overrides(overrides)
+        self._sections={}
+        self._built_for=None
         self.calculate_pattern()
-        self.check_myself()
+        if validate:
+            self.check_myself()
+
+    @classmethod
+    def from_stitches(cls,stitches,guage,verbose=True,validate=True,overrides=None):
+        """
+        Create a pattern straight from SockStitches (e.g. whole stitch counts picked by a fit search) instead of foot measurements.
+        Foot measurements are calculated back from the stitches and are already ease adjusted.
+        Int or Fraction stitches give an exact pattern.
+        """
+        pattern=cls.__new__(cls)
+        pattern.guage=guage
+        pattern.verbose=verbose
+        exact=is_exact(stitches.s_around_foot) and is_exact(stitches.r_toe_to_heel)
+        foot_measure_dict={'around_foot':guage.units_to_stitches(stitches.s_around_foot,exact=exact),'toe_to_heel':guage.units_to_rows(stitches.r_toe_to_heel,exact=exact)}
+        pattern.foot_measurements=FootMeasure(foot_measure_dict,units=guage.units,ease=True,verbose=verbose,exact=exact)
+        pattern.stitches=stitches
+        pattern.leg_stitches=None
+        pattern.overrides=check_overrides(overrides)
+        pattern._sections={}
+        pattern._built_for=None
+        pattern.calculate_pattern()
+        if validate:
+            pattern.check_myself()
+        return pattern
+
+    def _section_inputs(self):
+        """
+        Everything the sections are calculated from. Cached sections are thrown away when this changes.
+        """
+        overrides=tuple(sorted((k,tuple(sorted(v.items()))) for k,v in self.overrides.items()))
+        return (self.stitches,self.leg_stitches,overrides)
+
+    def section_measures(self,which,measures_dict):
+        """
+        Measures dictionary for building section which, with this pattern's overrides for the section put in
+        """
+        overrides=self.overrides.get(which)
+        if not overrides:
+            return measures_dict
+        return {**measures_dict,**overrides}
+
+    def calculate_pattern(self):
+        """
+        Get ready to (re)build sections for the current inputs. Sections are built on first use.
+        Calling this again when the inputs haven't changed keeps the sections already built.
+        """
+        inputs=self._section_inputs()
+        if self._built_for==inputs:
+            return
+        self._sections={}
+        self._built_for=inputs
+
+    def section(self,which):
+        """
+        Pattern section by name (see SockPatternSections), built and cached the first time it is asked for.
+        Two threads may both build a section the first time; they build the same section and either one is kept.
+        """
+        if which not in SockPatternSections._fields:
+            raise ValueError(f"No pattern section named {which}. Sections are: {SockPatternSections._fields}")
+        if self._built_for!=self._section_inputs():
+            self.calculate_pattern()
+        sections=self._sections
+        if which not in sections:
+            sections[which]=self.make_section(which)
+        return sections[which]
+
+    @property
+    def pattern_sections(self):
+        """
+        SockPatternSections with every section built
+        """
+        return SockPatternSections(*(self.section(which) for which in SockPatternSections._fields))
 
     def start_stitches(self,which):
         """
         Start stitches for requested pattern section
         """
-        return self.pattern_sections.__getattribute__(which).start_stitches()
+        return self.section(which).start_stitches()
 
     def end_stitches(self,which):
         """
         End stitches for requested pattern section
         """
-        return self.pattern_sections.__getattribute__(which).end_stitches()
+        return self.section(which).end_stitches()
     
+    def directions(self):
+        """
+        All directions for the pattern in order. Doesn't change the pattern, so it is safe to call from several threads.
+        """
+        return tuple(d for s in self.pattern_sections if s is not None for d in s.directions())
+
+    def messages(self):
+        """
+        All directions for the pattern in order as Messages (see src/i18n.py)
+        """
+        return tuple(m for s in self.pattern_sections if s is not None for m in s.messages())
+
     def write_directions(self):
         """
         Populate directions for each pattern section
@@ -349,7 +751,10 @@ class SockPattern():
         pass
 
     @abstractclassmethod
-    def calculate_pattern(self):
+    def make_section(self,which):
+        """
+        Build one pattern section (or return None if the pattern doesn't have it).
+        """
         pass
 
 class ToeUpSockPattern(SockPattern):
@@ -358,24 +763,36 @@ class ToeUpSockPattern(SockPattern):
     Members
     guage: Guage object holding stitches/unit and rows/unit and units of pattern
     stitches:SockStitches object holding all the vital measurements
-    foot_measurements: FootMeasure object with foot measurements
+    leg_stitches: LegStitches for the leg (None for a sock without a leg, where the cuff follows the heel)
+    foot_measurements: FootMeasure object with foot measurements (and leg measurements for a leg)
     pattern_sections: Sock pattern sections named tuple
     Methods:
-    calculate_pattern(self): Measurements for pattern sections
+    make_section(self,which): Measurements for one pattern section
     """
     def __init__(self,foot_measure_dict,guage,**kwargs):
         super().__init__(foot_measure_dict,guage,**kwargs)
 
-    def calculate_pattern(self):
-        """
-        Create pattern sections for sock.
-        """
-        toe=ToeUpToeML({"start_stitches":self.stitches.toe_start, "end_stitches":self.stitches.s_around_foot,"increase_x_every_y":(4,2)})
-        instep=InstepML({"start_stitches":self.stitches.s_around_foot,"end_stitches":self.stitches.s_around_foot,"n_rows":self.stitches.instep_rows})
-        gusset=ToeUpGuessetML({"start_stitches":self.stitches.s_around_foot,"end_stitches":self.stitches.gusset_increase+self.stitches.s_around_foot,"increase_x_every_y":(2,2)})
-        heel_turn=HeelTurnML({"start_stitches":self.stitches.toe_start+self.stitches.gusset_increase,"end_stitches":(self.stitches.toe_start)})
-        cuff=BasicCuff({"start_stitches":self.stitches.s_around_foot,"end_stitches":self.stitches.s_around_foot,"n_rows":self.stitches.r_per_inch})
-        self.pattern_sections=SockPatternSections(toe,instep,gusset,heel_turn,None,cuff)
+    def make_section(self,which):
+        """
+        Create a pattern section for the sock.
+        """
+        if which=="toe":
+            return ToeUpToeML(self.section_measures(which,{"start_stitches":self.stitches.toe_start, "end_stitches":self.stitches.s_around_foot,"increase_x_every_y":TOE_INCREASE}))
+        if which=="instep":
+            return InstepML(self.section_measures(which,{"start_stitches":self.stitches.s_around_foot,"end_stitches":self.stitches.s_around_foot,"n_rows":self.stitches.instep_rows}))
+        if which=="gusset":
+            return ToeUpGuessetML(self.section_measures(which,{"start_stitches":self.stitches.s_around_foot,"end_stitches":self.stitches.gusset_increase+self.stitches.s_around_foot,"increase_x_every_y":GUSSET_INCREASE}))
+        if which=="heel":
+            return HeelTurnML(self.section_measures(which,{"start_stitches":self.stitches.toe_start+self.stitches.gusset_increase,"end_stitches":(self.stitches.toe_start)}))
+        if which=="leg":
+            if self.leg_stitches is None:
+                return None
+            leg=self.leg_stitches
+            return CalfShapingLeg(self.section_measures(which,{"start_stitches":self.stitches.s_around_foot,"n_rows":leg.r_leg,"ankle_stitches":leg.s_ankle,"calf_stitches":leg.s_calf,"calf_rows":leg.r_calf}))
+        if which=="cuff":
+            around=self.stitches.s_around_foot if self.leg_stitches is None else self.section("leg").end_stitches()
+            return BasicCuff(self.section_measures(which,{"start_stitches":around,"end_stitches":around,"n_rows":self.stitches.r_per_inch}))
+        return None
 
     def check_myself(self):
         """
@@ -384,16 +801,27 @@ class ToeUpSockPattern(SockPattern):
         toe_meets_instep=(self.end_stitches('toe')==self.start_stitches('instep'))
         instep_meets_gusset=(self.end_stitches('instep')==self.start_stitches('gusset'))
         heel_finish_correct=(self.end_stitches('heel')==round(self.stitches.s_around_foot/2)) 
-        if toe_meets_instep and instep_meets_gusset and heel_finish_correct:
-            print("Congratulations! Your sock has no holes")
+        if self.section('leg') is None:
+            heel_meets_leg=True
+            leg_meets_cuff=(self.start_stitches('cuff')==self.stitches.s_around_foot)
+        else:
+            heel_meets_leg=(self.start_stitches('leg')==self.stitches.s_around_foot)
+            leg_meets_cuff=(self.end_stitches('leg')==self.start_stitches('cuff'))
+        if toe_meets_instep and instep_meets_gusset and heel_finish_correct and heel_meets_leg and leg_meets_cuff:
+            if self.verbose:
+                print("Congratulations! Your sock has no holes")
             return
         errors=[]
         if not toe_meets_instep:
-            errors.append("Toe and instep won't meet: Toe ends with {0} stitches. Instep begins with {1}".format(self.pattern_sections.toe.end_stitches(),self.pattern_sections.instep.start_stitches()))
+            errors.append("Toe and instep won't meet: Toe ends with {0} stitches. Instep begins with {1}".format(self.end_stitches('toe'),self.start_stitches('instep')))
         if not instep_meets_gusset:
-            errors.append("Instep and Gueest won't meet: Instep ends with {0}. Gusset starts with: {1}.",self.pattern_sections.instep.end_stitches(),self.pattern_sections.gusset.start_stitches())
+            errors.append("Instep and Gueest won't meet: Instep ends with {0}. Gusset starts with: {1}.".format(self.end_stitches('instep'),self.start_stitches('gusset')))
         if not heel_finish_correct:
-            errors.append("Heel turn finishes with {0} stitches. It should have {1} stitches.".format(self.pattern_sections.heel.end_stitches(),self.stitches.s_around_foot))      
+            errors.append("Heel turn finishes with {0} stitches. It should have {1} stitches.".format(self.end_stitches('heel'),self.stitches.s_around_foot))      
+        if not heel_meets_leg:
+            errors.append("Heel and leg won't meet: Leg starts with {0} stitches. The round after the heel has {1}.".format(self.start_stitches('leg'),self.stitches.s_around_foot))
+        if not leg_meets_cuff:
+            errors.append("Leg and cuff won't meet: Cuff starts with {0} stitches.".format(self.start_stitches('cuff')))
         raise ValueError("\n".join(errors))
     
     def __str__(self):
@@ -405,10 +833,9 @@ def main():
     guage=Guage((32,4),(32,4),'in')
     print("Toe-up sock pattern for a {0} foot with a {1} Guage.".format(foot_measure_dict.__str__(),guage.__str__()))
     sock=ToeUpSockPattern(foot_measure_dict,guage)
-    sock.calculate_pattern()
     print("\n----Pattern Directions------")
     print(sock)
     sock.write_directions()
     sock.print_pattern()
     
-if __name__=="__main__": main()
\ No newline at end of file
+if __name__=="__main__": main()
@@ -0,0 +1,178 @@
+from array import array
+from math import ceil, floor, sqrt
+from statistics import NormalDist, median
+from src.catalog import _read_records
+from src.conversions import *
+"""
+Guage estimates from many swatch measurements (several knitters, many swatches per yarn weight and needle).
+Estimates are medians with outliers removed, so one mismeasured swatch doesn't move the guage.
+"""
+
+SWATCH_FIELDS=["weight","needle","stitches","stitch_length","rows","row_length","units"]
+#Outliers are further than this many (scaled) median absolute deviations from the median
+OUTLIER_Z=3.5
+#Scales the median absolute deviation to a standard deviation for normal data
+MAD_SCALE=1.4826
+
+class RobustEstimate(NamedTuple):
+    """
+    Outlier resistant estimate of one value
+    center: median of the values that aren't outliers
+    low, high: confidence interval for the median
+    n: values used
+    n_outliers: values dropped as outliers
+    """
+    center:float
+    low:float
+    high:float
+    n:int
+    n_outliers:int
+
+def robust_estimate(values,confidence=0.95,z=OUTLIER_Z):
+    """
+    Median of values after dropping outliers (modified z-score above z), with a distribution free confidence interval
+    for the median from order statistics.
+    """
+    values=sorted(values)
+    if len(values)==0:
+        raise ValueError("Need at least one value to estimate.")
+    m=median(values)
+    mad=median(abs(v-m) for v in values)*MAD_SCALE
+    if mad>0:
+        kept=[v for v in values if abs(v-m)/mad<=z]
+    else:
+        kept=[v for v in values if v==m]
+    n=len(kept)
+    center=median(kept)
+    #Ranks of the interval ends: n/2 -+ z*sqrt(n)/2 (normal approximation to the binomial)
+    half=NormalDist().inv_cdf(0.5+confidence/2)*sqrt(n)/2
+    lo=max(0,floor(n/2-half))
+    hi=min(n-1,ceil(n/2+half)-1)
+    return RobustEstimate(center,kept[lo],kept[hi],n,len(values)-n)
+
+class GuageEstimate(NamedTuple):
+    """
+    Guage estimated from the swatches of one yarn weight and needle
+    yarn_weight, needle_size: the group
+    units: 'in' or 'cm'. Guages are stitches and rows per 4 units.
+    stitches, rows: RobustEstimate of stitches and rows per 4 units
+    """
+    yarn_weight:int
+    needle_size:float
+    units:str
+    stitches:RobustEstimate
+    rows:RobustEstimate
+
+    def guage(self):
+        return Guage((self.stitches.center,4),(self.rows.center,4),self.units)
+
+class StandardComparison(NamedTuple):
+    """
+    A GuageEstimate next to the StandardGuage prediction (per 4 inches) for the same yarn weight and needle
+    predicted: StandardGuage stitches per 4 inches (None when the needle isn't recommended for the yarn weight)
+    difference: estimate - predicted
+    in_interval: True if the prediction is inside the estimate's confidence interval
+    """
+    estimate:GuageEstimate
+    predicted:float
+    difference:float
+    in_interval:bool
+
+class SwatchTable:
+    """
+    Swatch measurements stored as columns.
+    Members
+    _columns: dictionary of column name to array: weight, needle, s_per_inch, r_per_inch (one entry per swatch)
+    knitters: knitter name per swatch (None when not recorded)
+    """
+    def __init__(self):
+        self._columns={"weight":array('l'),"needle":array('d'),"s_per_inch":array('d'),"r_per_inch":array('d')}
+        self.knitters=[]
+
+    def append(self,weight,needle,stitches,stitch_length,rows,row_length,units='in',knitter=None):
+        """
+        Add one swatch: stitches counted over stitch_length and rows counted over row_length, in units ('in' or 'cm')
+        """
+        if units not in ('in','cm'):
+            raise ValueError(f"Swatches are measured in 'in' or 'cm'. Units given are {units}.")
+        if stitch_length<=0 or row_length<=0:
+            raise ValueError(f"Swatch lengths must be positive. Lengths given are {stitch_length} and {row_length}.")
+        per_inch=2.54 if units=='cm' else 1
+        self._columns["weight"].append(int(weight))
+        self._columns["needle"].append(float(needle))
+        self._columns["s_per_inch"].append(stitches/stitch_length*per_inch)
+        self._columns["r_per_inch"].append(rows/row_length*per_inch)
+        self.knitters.append(knitter)
+
+    @classmethod
+    def from_records(cls,records):
+        """
+        Table from dictionaries with SWATCH_FIELDS (and optionally knitter)
+        """
+        table=cls()
+        for r in records:
+            table.append(int(r["weight"]),float(r["needle"]),float(r["stitches"]),float(r["stitch_length"]),
+                float(r["rows"]),float(r["row_length"]),units=r["units"] or 'in',knitter=r.get("knitter") or None)
+        return table
+
+    @classmethod
+    def load(cls,path):
+        """
+        Load swatches from a .csv or .json file with columns: weight,needle,stitches,stitch_length,rows,row_length,units[,knitter]
+        """
+        return cls.from_records(_read_records(path,SWATCH_FIELDS))
+
+    def __len__(self):
+        return len(self._columns["weight"])
+
+    def __getitem__(self,name):
+        return self._columns[name]
+
+    def groups(self):
+        """
+        Dictionary of (yarn weight, needle) to the indexes of its swatches, in one pass over the table
+        """
+        groups={}
+        for i,key in enumerate(zip(self._columns["weight"],self._columns["needle"])):
+            groups.setdefault(key,[]).append(i)
+        return groups
+
+    def estimate(self,units='in',confidence=0.95,min_swatches=1):
+        """
+        Dictionary of (yarn weight, needle) to GuageEstimate for every group with at least min_swatches swatches
+        """
+        if units not in ('in','cm'):
+            raise ValueError(f"Guages are per 4 'in' or 'cm'. Units given are {units}.")
+        #Stitches per inch to stitches per 4 units
+        scale=4/2.54 if units=='cm' else 4
+        s=self._columns["s_per_inch"]
+        r=self._columns["r_per_inch"]
+        estimates={}
+        for (weight,needle),rows in sorted(self.groups().items()):
+            if len(rows)<min_swatches:
+                continue
+            estimates[(weight,needle)]=GuageEstimate(weight,needle,units,
+                _scale(robust_estimate([s[i] for i in rows],confidence=confidence),scale),
+                _scale(robust_estimate([r[i] for i in rows],confidence=confidence),scale))
+        return estimates
+
+def _scale(e,scale):
+    return RobustEstimate(e.center*scale,e.low*scale,e.high*scale,e.n,e.n_outliers)
+
+def compare_standard(estimates,guesser=None,knitter=0.5):
+    """
+    StandardComparison for each GuageEstimate (e.g. the values of SwatchTable.estimate(units='in')).
+    guesser is a StandardGuage (or CatalogGuage) that predicts stitches per 4 inches.
+    """
+    guesser=guesser if guesser is not None else StandardGuage()
+    comparisons=[]
+    for e in estimates:
+        if e.units!='in':
+            raise ValueError("StandardGuage predicts guage per 4 inches. Estimate in inches to compare.")
+        try:
+            predicted=guesser.guess_guage(e.yarn_weight,units='in',needle_size=e.needle_size,knitter=knitter).s_per_unit[0]
+        except (Warning,ValueError):
+            comparisons.append(StandardComparison(e,None,None,False))
+            continue
+        comparisons.append(StandardComparison(e,predicted,e.stitches.center-predicted,e.stitches.low<=predicted<=e.stitches.high))
+    return comparisons
@@ -0,0 +1,190 @@
+import argparse
+import sys
+from functools import lru_cache
+from math import nan
+from src.export import *
+"""
+Ahead-of-time size tables. Rounded to whole stitches around and whole foot rows, the inputs worth knitting are a small grid
+for each common guage. build_table works out every point of the grid with ToeUpSockPattern.from_stitches and writes the
+export columns (see src/export.py) to one file. SizeTable memory-maps the file the first time it is used, so a lookup is
+array indexing. Anything outside the grid (or that can't be knit) is worked out live.
+
+    python -m src.tables build sizes.knittab --stitches 32 96 --rows 40 120
+"""
+
+#Sock yarn guages (stitches and rows per 4 inches) for yarn weights 0-3
+COMMON_GUAGES=[Guage((n,4),(n,4),'in') for n in range(21,40)]
+#Stitches around: multiples of 8, so the toe and gusset increase rows are whole (see STITCH_MULTIPLE in src/fit.py)
+STITCHES=range(16,129,8)
+#Toe to heel rows
+ROWS=range(24,161)
+OK_COLUMN="ok"
+#Errors from sizes that can't be knit (e.g. a foot too short for an instep, or half an increase row)
+NOT_KNITTABLE=(ValueError,Warning,ZeroDivisionError)
+
+def check_increase_rows(pattern):
+    """
+    Make sure the toe and gusset gain the same whole number of stitches on every increase row.
+    """
+    for section,(x,y) in (("toe",TOE_INCREASE),("gusset",GUSSET_INCREASE)):
+        gained=pattern.end_stitches(section)-pattern.start_stitches(section)
+        if gained%x:
+            raise ValueError(f"The {section} gains {gained} stitches, which isn't a whole number of increase rows of {x} stitches.")
+
+def live_row(s_around_foot,r_toe_to_heel,guage,pattern_class=ToeUpSockPattern):
+    """
+    pattern_row for whole stitches around and foot rows, worked out now
+    """
+    stitches=SockStitches(s_around_foot,r_toe_to_heel,rows_per_inch(guage))
+    pattern=pattern_class.from_stitches(stitches,guage,verbose=False)
+    check_increase_rows(pattern)
+    return tuple(pattern_row(pattern))
+
+def _axis(values):
+    if not isinstance(values,range) or len(values)==0 or values.step<=0:
+        raise ValueError(f"Table axes must be non-empty increasing ranges. Given {values}.")
+    return values
+
+def _offset(axis,v):
+    """
+    Position of v in a range, or None if it isn't in it (without searching the range)
+    """
+    if v!=int(v):
+        return None
+    k,rem=divmod(int(v)-axis.start,axis.step)
+    return k if rem==0 and 0<=k<len(axis) else None
+
+def build_table(path,guages=COMMON_GUAGES,stitches=STITCHES,rows=ROWS,pattern_class=ToeUpSockPattern):
+    """
+    Work out every guage x stitches x rows point and write the table to path. Points that can't be knit are marked not ok.
+    Returns the number of points that are ok.
+    """
+    stitches=_axis(stitches)
+    rows=_axis(rows)
+    columns={c:array('d') for c in COLUMNS}
+    ok=array('b')
+    blank=[nan]*len(COLUMNS)
+    for g in guages:
+        for s in stitches:
+            for r in rows:
+                try:
+                    row=live_row(s,r,g,pattern_class)
+                    ok.append(1)
+                except NOT_KNITTABLE:
+                    row=blank
+                    ok.append(0)
+                for c,v in zip(COLUMNS,row):
+                    columns[c].append(v)
+    columns[OK_COLUMN]=ok
+    meta={"guages":[[list(g.s_per_unit),list(g.r_per_unit),g.units] for g in guages],
+        "stitches":[stitches.start,stitches.stop,stitches.step],"rows":[rows.start,rows.stop,rows.step],
+        "pattern_class":pattern_class.__name__}
+    write_columns(path,columns,meta=meta)
+    return sum(ok)
+
+class SizeTable:
+    """
+    Size table written by build_table, memory-mapped on first use.
+    Members
+    path: table file
+    pattern_class: class used for live rows (must be the class the table was built with)
+    hits, misses: lookups answered by the table and worked out live
+    _mapped: MappedColumns (None until first use)
+    _guages: dictionary of Guage to its position in the table
+    _stitches, _rows: table axes (ranges)
+    """
+    def __init__(self,path,pattern_class=ToeUpSockPattern):
+        self.path=path
+        self.pattern_class=pattern_class
+        self.hits=0
+        self.misses=0
+        self._mapped=None
+
+    def open(self):
+        if self._mapped is not None:
+            return
+        mapped=load_columns(self.path)
+        meta=mapped.meta
+        if OK_COLUMN not in mapped.columns() or "guages" not in meta:
+            mapped.close()
+            raise ValueError(f"{self.path} is not a size table.")
+        if meta.get("pattern_class")!=self.pattern_class.__name__:
+            mapped.close()
+            raise ValueError(f"{self.path} was built with {meta.get('pattern_class')}, not {self.pattern_class.__name__}.")
+        self._guages={Guage(tuple(s),tuple(r),u):i for i,(s,r,u) in enumerate(meta["guages"])}
+        self._stitches=range(*meta["stitches"])
+        self._rows=range(*meta["rows"])
+        self._columns=[mapped[c] for c in COLUMNS]
+        self._ok=mapped[OK_COLUMN]
+        self._mapped=mapped
+
+    def position(self,s_around_foot,r_toe_to_heel,guage):
+        """
+        Position of a point in the table, or None if the table doesn't have it
+        """
+        self.open()
+        g=self._guages.get(guage)
+        s=_offset(self._stitches,s_around_foot)
+        r=_offset(self._rows,r_toe_to_heel)
+        if g is None or s is None or r is None:
+            return None
+        i=(g*len(self._stitches)+s)*len(self._rows)+r
+        return i if self._ok[i] else None
+
+    def lookup(self,s_around_foot,r_toe_to_heel,guage):
+        """
+        pattern_row (as a tuple in COLUMNS order) for whole stitches around, foot rows and guage.
+        From the table when it has the point, otherwise worked out live (and live errors are raised).
+        """
+        i=self.position(s_around_foot,r_toe_to_heel,guage)
+        if i is None:
+            self.misses+=1
+            return live_row(s_around_foot,r_toe_to_heel,guage,self.pattern_class)
+        self.hits+=1
+        return tuple(c[i] for c in self._columns)
+
+    def lookup_dict(self,s_around_foot,r_toe_to_heel,guage):
+        return dict(zip(COLUMNS,self.lookup(s_around_foot,r_toe_to_heel,guage)))
+
+    def __len__(self):
+        self.open()
+        return len(self._mapped)
+
+    def close(self):
+        if self._mapped is not None:
+            self._columns=[]
+            self._ok=None
+            self._mapped.close()
+            self._mapped=None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        self.close()
+
+@lru_cache(maxsize=None)
+def size_table(path):
+    """
+    Shared SizeTable for a path (mapped once per process, on first lookup)
+    """
+    return SizeTable(path)
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(description="Build a size table of every whole stitch count and foot rows for common guages.")
+    sub=parser.add_subparsers(dest="command",required=True)
+    build=sub.add_parser("build",help="Work out the table and write it to a file.")
+    build.add_argument("path")
+    build.add_argument("--stitches",type=int,nargs=2,default=[STITCHES.start,STITCHES.stop-1],help="First and last stitches around.")
+    build.add_argument("--step",type=int,default=STITCHES.step,help="Stitches around between table points.")
+    build.add_argument("--rows",type=int,nargs=2,default=[ROWS.start,ROWS.stop-1],help="First and last toe to heel rows.")
+    build.add_argument("--guages",type=int,nargs=2,default=[21,39],help="First and last stitches (and rows) per 4 inches.")
+    args=parser.parse_args(argv)
+    guages=[Guage((n,4),(n,4),'in') for n in range(args.guages[0],args.guages[1]+1)]
+    n_ok=build_table(args.path,guages=guages,stitches=range(args.stitches[0],args.stitches[1]+1,args.step),
+        rows=range(args.rows[0],args.rows[1]+1))
+    print(f"Wrote {args.path}: {n_ok} sizes.")
+    return 0
+
+if __name__=="__main__":
+    sys.exit(main())
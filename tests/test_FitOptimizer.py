@@ -0,0 +1,69 @@
+import sys
+sys.path.append('..')
+import unittest
+from src.fit import *
+
+class TestFitOptimizer(unittest.TestCase):
+    foot_measure_dict={'around_foot':4.1*2,'toe_to_heel':9.5}
+    optimizer=FitOptimizer(foot_measure_dict,1)
+
+    def test_input_not_changed(self):
+        self.assertEqual(self.foot_measure_dict,{'around_foot':4.1*2,'toe_to_heel':9.5})
+
+    def test_whole_stitches(self):
+        """
+        Every candidate has a whole number of stitches that is a multiple of STITCH_MULTIPLE and whole rows
+        """
+        for c in self.optimizer.candidates():
+            self.assertEqual(c.stitches.s_around_foot%STITCH_MULTIPLE,0)
+            self.assertIsInstance(c.stitches.r_toe_to_heel,int)
+            self.assertGreater(c.stitches.instep_rows,0)
+
+    def test_best_is_smallest_error(self):
+        best=self.optimizer.best()
+        self.assertEqual(best.error,min(c.error for c in self.optimizer.candidates()))
+        self.assertIn(best.needle_size,RECOMMENDED_NEEDLES_IN_MM[1])
+        #Nearest multiple is never more than half a multiple away
+        ideal=best.guage.stitches(self.optimizer.foot_measurements.measure_values('around_foot'))
+        self.assertLessEqual(abs(best.stitches.s_around_foot-ideal),STITCH_MULTIPLE/2)
+
+    def test_parallel_matches_serial(self):
+        self.assertEqual(self.optimizer.best(max_workers=4),self.optimizer.best())
+
+    def test_best_pattern(self):
+        """
+        The best candidate makes a pattern with whole counts that meets up
+        """
+        sock=self.optimizer.best_pattern()
+        self.assertIsInstance(sock,ToeUpSockPattern)
+        self.assertEqual(sock.stitches,self.optimizer.best().stitches)
+        self.assertEqual(sock.end_stitches('toe'),sock.start_stitches('instep'))
+        self.assertEqual(sock.pattern_sections.toe.n_rows()%1,0)
+
+    def test_whole_increase_rows(self):
+        """
+        Every candidate's toe and gusset gain the same even number of stitches on each increase row
+        """
+        for c in self.optimizer.candidates():
+            sock=ToeUpSockPattern.from_stitches(c.stitches,c.guage,verbose=False)
+            self.assertEqual(sock.start_stitches('toe')%2,0)
+            for section,(x,y) in (("toe",TOE_INCREASE),("gusset",GUSSET_INCREASE)):
+                gained=sock.end_stitches(section)-sock.start_stitches(section)
+                self.assertEqual(gained%x,0,f"{section} of {c.stitches.s_around_foot} stitches")
+                self.assertEqual(getattr(sock.pattern_sections,section).n_rows(),gained//x*y)
+            sock.pattern_sections.toe.how_to_cast_on()
+
+    def test_pruned_needles(self):
+        """
+        Needles that aren't recommended for the yarn weight are pruned, so nothing fits
+        """
+        optimizer=FitOptimizer(self.foot_measure_dict,1,needles=[8.0])
+        self.assertEqual(optimizer.candidates(),[])
+        with self.assertRaises(ValueError):
+            optimizer.best()
+
+    def test_bad_weight(self):
+        with self.assertRaises(ValueError):
+            FitOptimizer(self.foot_measure_dict,9)
+
+if __name__=="__main__": unittest.main()
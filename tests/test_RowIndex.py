@@ -0,0 +1,69 @@
+import sys
+sys.path.append('..')
+import unittest
+from src.rowindex import *
+
+class TestRowIndex(unittest.TestCase):
+    sock=ToeUpSockPattern.from_stitches(SockStitches(64,72,8),Guage((32,4),(32,4),'in'),verbose=False)
+    index=RowIndex(sock)
+
+    def test_total_rows(self):
+        expected=sum(round(s.n_rows()) for s in self.sock.pattern_sections if s is not None)
+        self.assertEqual(len(self.index),expected)
+        self.assertEqual(len(list(self.index)),expected)
+
+    def test_sections_in_order(self):
+        self.assertEqual(self.index[1].section,"toe")
+        self.assertEqual(self.index.locate(1),("toe",1))
+        first,last=self.index.section_rows("instep")
+        self.assertEqual(self.index[first].section,"instep")
+        self.assertEqual(self.index[first-1].section,"toe")
+        self.assertEqual(self.index[last+1].section,"gusset")
+        self.assertEqual(self.index[len(self.index)].section,"cuff")
+
+    def test_out_of_range(self):
+        with self.assertRaises(IndexError):
+            self.index[0]
+        with self.assertRaises(IndexError):
+            self.index[len(self.index)+1]
+
+    def test_iter_from(self):
+        """
+        Iterating from a row gives the same rows as looking each one up
+        """
+        start=self.index.section_rows("gusset")[0]-3
+        rows=list(self.index.iter_from(start))
+        self.assertEqual(rows[0].row,start)
+        self.assertEqual(rows[-1].row,len(self.index))
+        for r in rows[:40]:
+            self.assertEqual(r,self.index[r.row])
+
+    def test_toe_counts(self):
+        """
+        Toe starts at 32 stitches and increases 4 on every other row
+        """
+        self.assertEqual(self.index[1].stitches,36)
+        self.assertEqual(self.index[2].stitches,36)
+        self.assertEqual(self.index[3].needle_counts,(20,20))
+        self.assertIn("M1R",self.index[1].instruction)
+        self.assertTrue(self.index[2].instruction.startswith("Row 2"))
+        last=self.index.section_rows("toe")[1]
+        self.assertEqual(self.index[last].stitches,64)
+
+    def test_gusset_matches_how_to_end(self):
+        """
+        The last gusset row has the per-needle counts given in the gusset directions
+        """
+        gusset=self.sock.section("gusset")
+        last=self.index[self.index.section_rows("gusset")[1]]
+        self.assertEqual(last.needle_counts,(32,48))
+        self.assertIn("32 stitches on Needle 1 and 48 stitches on Needle 2",gusset.how_to_end())
+
+    def test_heel(self):
+        first,last=self.index.section_rows("heel")
+        self.assertEqual(self.index[first].needle_counts,(32,47))
+        self.assertEqual(self.index[first].stitches,79,"stitches counts both needles on heel rows too")
+        self.assertEqual(self.index[last].needle_counts,(32,32))
+        self.assertTrue(self.index[first].instruction.startswith("Row 1:"))
+
+if __name__=="__main__": unittest.main()
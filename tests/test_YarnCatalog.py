@@ -0,0 +1,118 @@
+import sys
+sys.path.append('..')
+import os
+import json
+import random
+import tempfile
+import unittest
+from src.catalog import *
+
+class TestIntervalIndex(unittest.TestCase):
+    def test_stab_matches_scan(self):
+        """
+        Stabbing the tree should find exactly the intervals a linear scan finds
+        """
+        rng=random.Random(3)
+        intervals=[]
+        for i in range(500):
+            lo=rng.randint(0,100)
+            intervals.append((lo,lo+rng.randint(0,20),i))
+        index=IntervalIndex(intervals)
+        self.assertEqual(len(index),500)
+        for p in range(-2,125):
+            expected={i for lo,hi,i in intervals if lo<=p<=hi}
+            self.assertEqual(set(index.stab(p)),expected,f"Wrong intervals for point {p}")
+
+    def test_empty(self):
+        self.assertEqual(IntervalIndex([]).stab(3),[])
+
+    def test_bad_interval(self):
+        with self.assertRaises(ValueError):
+            IntervalIndex([(4,1,"backwards")])
+
+class TestYarnCatalog(unittest.TestCase):
+    yarns=[{"name":"Sock A","weight":1,"s_min":28,"s_max":32,"needle_min":2.25,"needle_max":2.75},
+        {"name":"Sock B","weight":1,"s_min":30,"s_max":34,"needle_min":2.0,"needle_max":2.5},
+        {"name":"Fingering C","weight":0,"s_min":32,"s_max":36,"needle_min":2.0,"needle_max":2.25},
+        {"name":"Worsted D","weight":4,"s_min":18,"s_max":20,"needle_min":4.5,"needle_max":5.5}]
+
+    def _write(self,suffix,text):
+        fd,path=tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(fd,"w") as f:
+            f.write(text)
+        self.addCleanup(os.remove,path)
+        return path
+
+    def _catalog(self):
+        return YarnCatalog.load(self._write(".json",json.dumps(self.yarns)))
+
+    def test_load_csv(self):
+        lines=[",".join(YARN_FIELDS)]+[",".join(str(y[k]) for k in YARN_FIELDS) for y in self.yarns]
+        catalog=YarnCatalog.load(self._write(".csv","\n".join(lines)))
+        self.assertEqual(len(catalog),4)
+        self.assertEqual(catalog.query(s_per_4=19)[0].name,"Worsted D")
+
+    def test_bad_extension(self):
+        with self.assertRaises(ValueError):
+            YarnCatalog.load("yarns.txt")
+
+    def test_query_stitches_and_needle(self):
+        """
+        All yarns whose stitch range covers 30 st/4in with a 2.25mm needle
+        """
+        names={y.name for y in self._catalog().query(s_per_4=30,needle_size=2.25)}
+        self.assertEqual(names,{"Sock A","Sock B"})
+
+    def test_query_matches_scan(self):
+        """
+        Queries on stitches, needle or both find exactly the yarns a linear scan finds
+        """
+        rng=random.Random(5)
+        yarns=[]
+        for i in range(300):
+            s=rng.randint(16,36)
+            n=rng.choice(list(NEEDLE_CHART.keys()))
+            yarns.append(YarnRecord(f"yarn {i}",rng.randint(0,7),s,s+rng.randint(0,6),n,n+rng.choice([0,0.25,0.5,1.0])))
+        catalog=YarnCatalog(yarns)
+        for s in (None,18,24,30.5):
+            for n in (None,2.25,3.5,5.0):
+                expected=[y for y in yarns if y.covers(s,n)]
+                self.assertEqual(sorted(catalog.query(s_per_4=s,needle_size=n)),sorted(expected),f"Wrong yarns for {s} st and {n}mm")
+
+    def test_query_weight(self):
+        names={y.name for y in self._catalog().query(needle_size=2.25,weight=0)}
+        self.assertEqual(names,{"Fingering C"})
+
+    def test_from_standard(self):
+        catalog=YarnCatalog.from_standard()
+        self.assertEqual(len(catalog),len(YarnWeight))
+        self.assertEqual([y.weight for y in catalog.query(s_per_4=35)],[0])
+
+    def test_catalog_guage(self):
+        """
+        Guesses come from yarn data when the catalog has a match
+        """
+        g=CatalogGuage(self._catalog())
+        self.assertEqual(g._guess_s_per_4(4,5.0,0.5),19)
+        self.assertEqual(g.guess_guage(4,needle_size=5.0).s_per_unit,(19,4))
+
+    def test_catalog_guage_fallback(self):
+        """
+        No catalog match falls back to StandardGuage
+        """
+        g=CatalogGuage(self._catalog())
+        self.assertEqual(g._guess_s_per_4(2,3.5,0.5),StandardGuage()._guess_s_per_4(2,3.5,0.5))
+
+class TestNeedleChart(unittest.TestCase):
+    def test_load_needle_chart(self):
+        fd,path=tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(fd,"w") as f:
+            f.write("mm,us,uk\n1.5,000,17\n2.25,1,13\n2.5,1.5,\n")
+        self.addCleanup(os.remove,path)
+        chart=load_needle_chart(path)
+        self.assertEqual(chart[1.5],Needle(mm=1.5,us='000',uk=17))
+        self.assertIsNone(chart[2.5].uk)
+        converter=NeedleConversion(chart)
+        self.assertEqual(converter.convert_needle(1,"us","uk"),13)
+
+if __name__=="__main__": unittest.main()
@@ -0,0 +1,82 @@
+import sys
+sys.path.append('..')
+import os
+import random
+import tempfile
+import unittest
+from src.allocation import *
+
+GUAGE=Guage((32,4),(32,4),'in')
+
+class TestYards(unittest.TestCase):
+    pattern=ToeUpSockPattern.from_stitches(SockStitches(64,72,8),GUAGE,verbose=False)
+
+    def test_stitches(self):
+        self.assertEqual(pattern_stitches(self.pattern),sum((s.start_stitches()+s.end_stitches())/2*s.n_rows() for s in self.pattern.pattern_sections if s is not None))
+
+    def test_yards(self):
+        one=yards_needed(self.pattern,socks=1,spare=0)
+        self.assertAlmostEqual(yards_needed(self.pattern,socks=2,spare=0.1),one*2*1.1)
+        longer=ToeUpSockPattern.from_stitches(SockStitches(64,90,8),GUAGE,verbose=False)
+        self.assertGreater(yards_needed(longer),yards_needed(self.pattern))
+
+    def test_units(self):
+        """
+        The same guage in inches and centimetres needs the same yarn
+        """
+        stitches=SockStitches(56,64,7.5)
+        inches=ToeUpSockPattern.from_stitches(stitches,Guage((30,4),(30,4),'in'),verbose=False)
+        cm=ToeUpSockPattern.from_stitches(stitches,Guage((30,10.16),(30,10.16),'cm'),verbose=False)
+        self.assertAlmostEqual(yards_needed(cm),yards_needed(inches))
+
+    def test_order_yarn(self):
+        self.assertEqual(order_yarn(7,self.pattern,YarnWeight.SUPERFINE).yarn_weight,1)
+        with self.assertRaises(ValueError):
+            order_yarn(7,self.pattern,9)
+
+class TestInventory(unittest.TestCase):
+    def test_fewest_left_over(self):
+        inventory=Inventory([Skein("a1",1,"A",400),Skein("b1",1,"B",200),Skein("b2",1,"B",231),Skein("c1",2,"C",1000)])
+        result=inventory.allocate([OrderYarn(1,1,380),OrderYarn(2,1,220)])
+        self.assertEqual(result.allocations,[Allocation(1,"A",("a1",),400,20),Allocation(2,"B",("b2",),231,11)])
+        self.assertEqual(result.unfilled,[])
+        self.assertEqual(len(inventory),2)
+
+    def test_one_lot_per_order(self):
+        """
+        An order no single dye lot can fill is left unfilled, even if lots together could fill it
+        """
+        inventory=Inventory([Skein("a1",1,"A",200),Skein("b1",1,"B",200),Skein("c1",2,"C",1000)])
+        result=inventory.allocate([OrderYarn(1,1,300),OrderYarn(2,3,100)])
+        self.assertEqual(result.allocations,[])
+        self.assertEqual([o.order for o in result.unfilled],[1,2])
+        self.assertEqual(inventory.yards(),1400)
+
+    def test_many_orders(self):
+        random.seed(3)
+        skeins=[Skein(i,random.choice([1,2]),(i//4)%500,random.choice([200,231,400,437])) for i in range(4000)]
+        orders=[OrderYarn(i,random.choice([1,2]),random.uniform(150,600)) for i in range(1500)]
+        lots={s.skein:s for s in skeins}
+        result=Inventory(skeins).allocate(orders)
+        self.assertEqual(len(result.allocations)+len(result.unfilled),len(orders))
+        used=[s for a in result.allocations for s in a.skeins]
+        self.assertEqual(len(used),len(set(used)),"No skein is given out twice")
+        need={o.order:o for o in orders}
+        for a in result.allocations:
+            self.assertEqual({(lots[s].lot,lots[s].yarn_weight) for s in a.skeins},{(a.lot,need[a.order].yarn_weight)})
+            self.assertEqual(a.yards,sum(lots[s].yards for s in a.skeins))
+            self.assertGreaterEqual(a.yards,need[a.order].yards)
+            self.assertAlmostEqual(a.leftover,a.yards-need[a.order].yards)
+
+    def test_load(self):
+        fd,path=tempfile.mkstemp(suffix=".csv")
+        os.close(fd)
+        self.addCleanup(os.remove,path)
+        with open(path,"w") as f:
+            f.write("skein,weight,lot,yards\ns1,1,L1,231\ns2,1,L1,231\ns3,2,L2,200\n")
+        inventory=Inventory.load(path)
+        self.assertEqual(len(inventory),3)
+        self.assertEqual(inventory.yards(1),462)
+
+if __name__=="__main__":
+    unittest.main()
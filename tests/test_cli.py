@@ -0,0 +1,95 @@
+import sys
+sys.path.append('..')
+import io
+import json
+import os
+import subprocess
+import unittest
+from contextlib import redirect_stdout
+from src.cli import *
+
+class TestProcess(unittest.TestCase):
+    lines=['{"id": "a", "around_foot": 8.2, "toe_to_heel": 9.5, "guage": {"s_per_unit": [30, 4], "r_per_unit": [30, 4], "units": "in"}}\n',
+        '\n',
+        '{"id": "b", "around_foot": 8.0, "toe_to_heel": 9.5, "yarn_weight": 1}\n',
+        '{"id": "c", "toe_to_heel": 9.5, "yarn_weight": 1}\n',
+        'not json\n',
+        '{"id": "d", "around_foot": 8.0, "toe_to_heel": 9.5, "ease": true, "guage": {"s_per_unit": [30, 4], "r_per_unit": [30, 4], "units": "in"}}\n']
+
+    def _run(self,**kwargs):
+        out=io.StringIO()
+        printed=io.StringIO()
+        with redirect_stdout(printed):
+            n_errors=process(iter(self.lines),out,**kwargs)
+        return n_errors,[json.loads(l) for l in out.getvalue().splitlines()],printed.getvalue()
+
+    def test_one_record_per_line(self):
+        n_errors,records,printed=self._run()
+        self.assertEqual([r.get("id") for r in records],["a","b","c",None,"d"])
+        self.assertEqual(n_errors,2)
+        self.assertIn("error",records[2])
+        self.assertEqual(records[3]["line"],5)
+
+    def test_zero_guage(self):
+        """
+        A guage with a zero denominator is an error record, not the end of the stream
+        """
+        lines=['{"id": "z", "around_foot": 8.2, "toe_to_heel": 9.5, "guage": {"s_per_unit": [30, 0], "r_per_unit": [30, 4], "units": "in"}}\n',self.lines[0]]
+        out=io.StringIO()
+        self.assertEqual(process(iter(lines),out),1)
+        records=[json.loads(l) for l in out.getvalue().splitlines()]
+        self.assertEqual([r["id"] for r in records],["z","a"])
+        self.assertEqual(records[0]["line"],1)
+        self.assertIn("error",records[0])
+
+    def test_bad_records(self):
+        """
+        A knitter out of range and a foot too short for its toe and heel are error records
+        """
+        lines=['{"id": "k", "around_foot": 8.2, "toe_to_heel": 9.5, "yarn_weight": 1, "knitter": 1}\n',
+            '{"id": "s", "around_foot": 8.2, "toe_to_heel": 2, "guage": {"s_per_unit": [30, 4], "r_per_unit": [30, 4], "units": "in"}}\n',self.lines[0]]
+        out=io.StringIO()
+        self.assertEqual(process(iter(lines),out),2)
+        records=[json.loads(l) for l in out.getvalue().splitlines()]
+        self.assertEqual([r["id"] for r in records],["k","s","a"])
+        self.assertIn("error",records[0])
+        self.assertIn("error",records[1])
+
+    def test_no_stray_prints(self):
+        """
+        check_myself and calc_ease notes must not end up in the output stream
+        """
+        n_errors,records,printed=self._run()
+        self.assertEqual(printed,"")
+
+    def test_matches_pattern(self):
+        n_errors,records,printed=self._run()
+        sock=ToeUpSockPattern({'around_foot':8.2,'toe_to_heel':9.5},Guage((30,4),(30,4),'in'),verbose=False)
+        self.assertEqual(records[0]["stitches"]["s_around_foot"],sock.stitches.s_around_foot)
+        self.assertEqual(records[0]["sections"]["heel"]["start_stitches"],sock.start_stitches("heel"))
+        self.assertEqual(records[0]["directions"],list(sock.directions()))
+        self.assertNotIn("leg",records[0]["sections"])
+
+    def test_leg(self):
+        out=io.StringIO()
+        process(['{"around_foot": 8.2, "toe_to_heel": 9.5, "leg_length": 12, "around_calf": 13, "guage": {"s_per_unit": [30, 4], "r_per_unit": [30, 4], "units": "in"}}'],out)
+        record=json.loads(out.getvalue())
+        self.assertEqual(record["sections"]["leg"]["start_stitches"],record["sections"]["instep"]["start_stitches"])
+        self.assertEqual(record["sections"]["cuff"]["start_stitches"],record["sections"]["leg"]["end_stitches"])
+
+    def test_no_directions(self):
+        n_errors,records,printed=self._run(directions=False)
+        self.assertNotIn("directions",records[0])
+
+class TestCommandLine(unittest.TestCase):
+    def test_pipe(self):
+        root=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        text='{"around_foot": 8.0, "toe_to_heel": 9.5, "yarn_weight": 1}\n{"around_foot": 8.2}\n'
+        done=subprocess.run([sys.executable,"-m","src.cli","--strict"],input=text,capture_output=True,text=True,cwd=root)
+        lines=done.stdout.splitlines()
+        self.assertEqual(len(lines),2)
+        self.assertIn("stitches",json.loads(lines[0]))
+        self.assertIn("error",json.loads(lines[1]))
+        self.assertEqual(done.returncode,1)
+
+if __name__=="__main__": unittest.main()
@@ -0,0 +1,55 @@
+import sys
+sys.path.append('..')
+import os
+import tempfile
+import unittest
+from src.compact import *
+from src.sock import *
+
+GUAGE=Guage((32,4),(32,4),'in')
+
+class TestDirectionTemplates(unittest.TestCase):
+    def test_split_line(self):
+        self.assertEqual(split_line("Row 12: S1, p10, p2tog, p1, turn."),(("Row ",": S",", p",", p2tog, p",", turn."),["12","1","10","1"]))
+        self.assertEqual(split_line("Knit 1 row around.\n"),(("Knit "," row around.\n"),["1"]))
+
+    def test_numbers_round_trip(self):
+        """
+        Numbers come back with exactly the text they had
+        """
+        t=DirectionTemplates()
+        lines=("Cast on 28 (14 per needle)","36.00000000000001 stitches (1107/40 on each needle).","You will have knitted 16.0 rows.","007 0 0.0 1e-05 rows","Row \u0663: \u0661\u0662 stitches, \u0663.0 rows","")
+        self.assertEqual(t.decode(t.encode(lines)),lines)
+
+    def test_patterns_round_trip(self):
+        archive=DirectionArchive()
+        patterns=[ToeUpSockPattern({'around_foot':a,'toe_to_heel':l},GUAGE,verbose=False,exact=exact).directions()
+            for a in (7.2,7.8,8.2) for l in (8.5,9.5,11.0) for exact in (False,True)]
+        patterns.append(ToeUpSockPattern.from_stitches(SockStitches(64,72,8),GUAGE,verbose=False).directions())
+        for d in patterns:
+            archive.append(d)
+        self.assertEqual(list(archive),patterns)
+        self.assertEqual(archive[3],patterns[3])
+        #Every pattern is built from the same few templates
+        self.assertLess(len(archive.templates),25)
+        self.assertLess(archive.n_bytes(),sum(len("".join(d).encode()) for d in patterns)/4)
+
+    def test_archive_file(self):
+        fd,path=tempfile.mkstemp(suffix=".knitdir")
+        os.close(fd)
+        self.addCleanup(os.remove,path)
+        archive=DirectionArchive()
+        sock=ToeUpSockPattern({'around_foot':8.2,'toe_to_heel':9.5},GUAGE,verbose=False)
+        archive.add_pattern(sock)
+        archive.append(())
+        archive.write(path)
+        loaded=DirectionArchive.load(path)
+        self.assertEqual(len(loaded),2)
+        self.assertEqual(loaded[0],sock.directions())
+        self.assertEqual(loaded[1],())
+        with open(path,"wb") as f:
+            f.write(b"not an archive")
+        with self.assertRaises(ValueError):
+            DirectionArchive.load(path)
+
+if __name__=="__main__": unittest.main()
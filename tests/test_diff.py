@@ -0,0 +1,93 @@
+import sys
+sys.path.append('..')
+import io
+import json
+import os
+import tempfile
+import unittest
+from src.diff import *
+from src.rowindex import RowIndex
+from src.cli import process
+
+GUAGE=Guage((32,4),(32,4),'in')
+
+class TestDiffPatterns(unittest.TestCase):
+    def test_same(self):
+        a=ToeUpSockPattern({'around_foot':8.2,'toe_to_heel':9.5},GUAGE,verbose=False,validate=False)
+        b=ToeUpSockPattern({'around_foot':8.2,'toe_to_heel':9.5},GUAGE,verbose=False,validate=False)
+        d=diff_patterns(a,b)
+        self.assertFalse(d)
+        self.assertEqual(str(d),"No changes.")
+        self.assertEqual(b._sections,{},"Patterns with the same inputs are compared without building sections")
+
+    def test_longer_foot(self):
+        """
+        A longer foot changes the instep only, and the rows reported match RowIndex
+        """
+        old=ToeUpSockPattern.from_stitches(SockStitches(64,72,8),GUAGE,verbose=False)
+        new=ToeUpSockPattern.from_stitches(SockStitches(64,80,8),GUAGE,verbose=False)
+        d=diff_patterns(old,new)
+        self.assertEqual(d.sections(),["instep"])
+        self.assertIn(FieldChange("stitches.r_toe_to_heel",72,80),d.changes)
+        self.assertIn(FieldChange("sections.instep.n_rows",24,32),d.section_changes("instep"))
+        self.assertEqual(d.rows["instep"],(RowIndex(old).section_rows("instep"),RowIndex(new).section_rows("instep")))
+
+    def test_new_guage(self):
+        old=ToeUpSockPattern.from_stitches(SockStitches(64,72,8),GUAGE,verbose=False)
+        new=ToeUpSockPattern.from_stitches(SockStitches(64,72,8),Guage((32,4),(36,4),'in'),verbose=False)
+        d=diff_patterns(old,new)
+        self.assertEqual([c.path for c in d.changes],["guage.r_per_unit"])
+        self.assertEqual(d.sections(),[])
+
+    def test_tolerance(self):
+        old=ToeUpSockPattern.from_stitches(SockStitches(64,72,8),GUAGE,verbose=False)
+        new=ToeUpSockPattern.from_stitches(SockStitches(64.0000001,72,8),GUAGE,verbose=False)
+        self.assertTrue(diff_patterns(old,new))
+        self.assertFalse(diff_patterns(old,new,tolerance=1e-6))
+
+class TestDiffCatalogs(unittest.TestCase):
+    def records(self,arounds):
+        return [json.dumps({"id":i,"around_foot":a,"toe_to_heel":9.5,"guage":{"s_per_unit":[32,4],"r_per_unit":[32,4],"units":"in"}}) for i,a in arounds]
+
+    def test_patterns(self):
+        old={a:ToeUpSockPattern({'around_foot':a,'toe_to_heel':9.5},GUAGE,verbose=False) for a in (7.2,7.8,8.2)}
+        new={a:ToeUpSockPattern({'around_foot':a,'toe_to_heel':l},GUAGE,verbose=False) for a,l in ((7.8,9.5),(8.2,10.0),(8.6,9.5))}
+        d=diff_catalogs(old,new)
+        self.assertEqual(d.added,[8.6])
+        self.assertEqual(d.removed,[7.2])
+        self.assertEqual(list(d.changed.keys()),[8.2])
+        self.assertEqual(d.unchanged,1)
+        self.assertEqual(str(d),"1 added, 1 removed, 1 changed, 1 unchanged.")
+
+    def test_jsonl(self):
+        """
+        Catalogs written by the command line tool are diffed without their directions
+        """
+        paths=[]
+        for arounds in (((1,7.2),(2,7.8),(3,8.2)),((1,7.2),(2,7.6),(3,8.2))):
+            fd,path=tempfile.mkstemp(suffix=".jsonl")
+            with os.fdopen(fd,"w") as f:
+                process(self.records(arounds),f)
+            self.addCleanup(os.remove,path)
+            paths.append(path)
+        old,new=load_catalog(paths[0]),load_catalog(paths[1])
+        d=diff_catalogs(old,new)
+        self.assertEqual(list(d.changed.keys()),[2])
+        self.assertEqual(d.unchanged,2)
+        self.assertIn("stitches.s_around_foot",[c.path for c in d.changed[2].changes])
+        self.assertFalse(any(c.path.startswith("directions") for c in d.changed[2].changes))
+
+    def test_pattern_and_record(self):
+        """
+        A pattern diffed against its own command line record has no changes
+        """
+        out=io.StringIO()
+        process(self.records(((1,7.8),)),out)
+        record=json.loads(out.getvalue())
+        pattern=ToeUpSockPattern({'around_foot':7.8,'toe_to_heel':9.5},GUAGE,verbose=False)
+        d=diff_catalogs({1:pattern},{1:record})
+        self.assertFalse(d)
+        self.assertEqual(d.unchanged,1)
+        self.assertFalse(diff_catalogs({1:record},{1:pattern}))
+
+if __name__=="__main__": unittest.main()
@@ -0,0 +1,96 @@
+import sys
+sys.path.append('..')
+import unittest
+from src.editlog import *
+
+GUAGE=Guage((32,4),(32,4),'in')
+MEASURES={'around_foot':8.2,'toe_to_heel':9.5}
+
+class TestOverrides(unittest.TestCase):
+    def test_cuff_rows(self):
+        p=ToeUpSockPattern(MEASURES,GUAGE,verbose=False,overrides={"cuff":{"n_rows":16}})
+        self.assertEqual(p.section("cuff").n_rows(),16)
+        self.assertNotEqual(ToeUpSockPattern(MEASURES,GUAGE,verbose=False).section("cuff").n_rows(),16)
+
+    def test_bad_section(self):
+        with self.assertRaises(ValueError):
+            ToeUpSockPattern(MEASURES,GUAGE,verbose=False,overrides={"ankle":{"n_rows":16}})
+
+class TestDesignSession(unittest.TestCase):
+    def test_undo_redo(self):
+        s=DesignSession(MEASURES,GUAGE)
+        start=s.state()
+        s.set_foot('toe_to_heel',10)
+        s.set_override("cuff","n_rows",16)
+        self.assertEqual(s.pattern().section("cuff").n_rows(),16)
+        s.undo()
+        self.assertEqual(s.state().get(OVERRIDE,("cuff","n_rows")),None)
+        s.undo()
+        self.assertEqual(s.state(),start)
+        with self.assertRaises(ValueError):
+            s.undo()
+        s.redo()
+        self.assertEqual(s.state().get(FOOT,'toe_to_heel'),10)
+        s.set_guage(Guage((30,4),(32,4),'in'))
+        with self.assertRaises(ValueError):
+            s.redo()
+        self.assertEqual(s.history(),(0,2,2))
+
+    def test_same_state_same_pattern(self):
+        s=DesignSession(MEASURES,GUAGE)
+        p=s.pattern()
+        s.set_foot('toe_to_heel',10)
+        s.undo()
+        self.assertIs(s.pattern(),p,"Undo goes back to a cached pattern")
+
+    def test_sessions_dont_share_patterns(self):
+        a=DesignSession(MEASURES,GUAGE)
+        b=DesignSession(MEASURES,GUAGE)
+        self.assertEqual(a.state(),b.state())
+        self.assertIsNot(a.pattern(),b.pattern())
+
+    def test_list_values(self):
+        """
+        List values (as they come from JSON) are frozen into tuples, so states stay hashable
+        """
+        s=DesignSession(MEASURES,GUAGE,overrides={"toe":{"increase_x_every_y":[4,2]}})
+        s.set_override("gusset","increase_x_every_y",[2,2])
+        self.assertEqual(s.state().get(OVERRIDE,("gusset","increase_x_every_y")),(2,2))
+        self.assertEqual(s.state().get(OVERRIDE,("toe","increase_x_every_y")),(4,2))
+        self.assertEqual(s.pattern().end_stitches("gusset"),ToeUpSockPattern(MEASURES,GUAGE,verbose=False).end_stitches("gusset"))
+        s.undo()
+        self.assertEqual(s.state().get(OVERRIDE,("gusset","increase_x_every_y")),None)
+        with self.assertRaises(ValueError):
+            s.set_override("cuff","n_rows",{"rows":16})
+
+    def test_state_at(self):
+        s=DesignSession(MEASURES,GUAGE,snapshot_every=4)
+        for n in range(10):
+            s.set_foot('toe_to_heel',9+n/10)
+        for n in range(11):
+            self.assertEqual(s.state_at(n).get(FOOT,'toe_to_heel'),9.5 if n==0 else 9+(n-1)/10)
+        self.assertEqual(s.state_at(10),s.state())
+
+    def test_compaction(self):
+        s=DesignSession(MEASURES,GUAGE,snapshot_every=4,max_history=8)
+        for n in range(100):
+            s.set_foot('toe_to_heel',9+n/100)
+        first,position,last=s.history()
+        self.assertEqual(position,100)
+        self.assertLessEqual(len(s),8+4)
+        self.assertLessEqual(first,100-8)
+        for n in range(position-first):
+            s.undo()
+        self.assertFalse(s.can_undo())
+        self.assertEqual(s.state(),s.state_at(first))
+
+    def test_bad_edit(self):
+        s=DesignSession(MEASURES,GUAGE)
+        with self.assertRaises(ValueError):
+            s.set_option("colour","red")
+        with self.assertRaises(ValueError):
+            s.set_override("ankle","n_rows",4)
+        self.assertEqual(len(s),0)
+
+if __name__=="__main__":
+    unittest.main()
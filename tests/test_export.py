@@ -0,0 +1,59 @@
+import sys
+sys.path.append('..')
+import os
+import tempfile
+import unittest
+from math import isnan
+from src.export import *
+
+GUAGE=Guage((30,4),(30,4),'in')
+
+class TestPatternColumns(unittest.TestCase):
+    socks=[ToeUpSockPattern({'around_foot':a,'toe_to_heel':9.5},GUAGE,verbose=False) for a in (7.0,7.5,8.2)]
+    columns=PatternColumns(socks)
+
+    def test_columns(self):
+        self.assertEqual(self.columns.columns(),COLUMNS)
+        self.assertEqual(len(self.columns),3)
+        for field in SockStitches._fields:
+            self.assertIn(field,COLUMNS)
+
+    def test_values(self):
+        sock=self.socks[2]
+        self.assertEqual(self.columns["s_around_foot"][2],sock.stitches.s_around_foot)
+        self.assertEqual(self.columns["instep_rows"][2],sock.stitches.instep_rows)
+        self.assertEqual(self.columns["heel_start_stitches"][2],sock.start_stitches("heel"))
+        self.assertEqual(self.columns["toe_rows"][2],sock.stitches.toe_rows)
+        self.assertEqual(self.columns["guage_stitches"][2],30)
+        self.assertTrue(isnan(self.columns["leg_n_rows"][2]))
+
+    def test_round_trip(self):
+        """
+        Mapped columns match what was written
+        """
+        fd,path=tempfile.mkstemp(suffix=".knitcol")
+        os.close(fd)
+        self.addCleanup(os.remove,path)
+        self.columns.write(path)
+        with load_columns(path) as mapped:
+            self.assertEqual(len(mapped),3)
+            self.assertEqual(mapped.columns(),COLUMNS)
+            for c in COLUMNS:
+                if c.startswith("leg"):
+                    self.assertTrue(all(isnan(v) for v in mapped[c]))
+                else:
+                    self.assertEqual(list(mapped[c]),list(self.columns[c]),f"Column {c} changed on disk")
+
+    def test_unequal_columns(self):
+        with self.assertRaises(ValueError):
+            write_columns("unused",{"a":array('d',[1]),"b":array('d')})
+
+    def test_not_a_column_file(self):
+        fd,path=tempfile.mkstemp()
+        with os.fdopen(fd,"wb") as f:
+            f.write(b"something else entirely")
+        self.addCleanup(os.remove,path)
+        with self.assertRaises(ValueError):
+            load_columns(path)
+
+if __name__=="__main__": unittest.main()
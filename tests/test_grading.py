@@ -0,0 +1,45 @@
+import sys
+sys.path.append('..')
+import unittest
+from src.grading import *
+
+class TestSizeRun(unittest.TestCase):
+    base=ToeUpSockPattern({'around_foot':4.1*2,'toe_to_heel':9.5},Guage((30,4),(30,4),'in'),verbose=False)
+    size_run=SizeRun(base,GradingRule(8,6),steps=range(-3,9))
+
+    def test_base_rounded_once(self):
+        i=self.size_run.steps.index(0)
+        self.assertEqual(self.size_run["s_around_foot"][i],56)
+        self.assertEqual(self.size_run["r_toe_to_heel"][i],round(self.base.stitches.r_toe_to_heel))
+        self.assertTrue(all(s%8==0 for s in self.size_run["s_around_foot"]))
+
+    def test_matches_patterns(self):
+        """
+        Graded section counts match patterns built for each size
+        """
+        for i in range(len(self.size_run)):
+            sock=self.size_run.pattern(i)
+            for section in ("toe","instep","gusset","heel","cuff"):
+                for field in SECTION_FIELDS:
+                    expected=getattr(sock.section(section),field)()
+                    self.assertEqual(self.size_run[f"{section}_{field}"][i],expected,f"{section} {field} is off for size step {self.size_run.steps[i]}")
+
+    def test_table(self):
+        table=self.size_run.table()
+        self.assertEqual(len(table),12)
+        self.assertEqual(len(table[0]),len(self.size_run.columns()))
+        self.assertEqual(table[0][0],-3)
+
+    def test_rule_keeps_multiple(self):
+        with self.assertRaises(ValueError):
+            SizeRun(self.base,GradingRule(6,6))
+        with self.assertRaises(ValueError):
+            SizeRun(self.base,GradingRule(4,6))
+        with self.assertRaises(ValueError):
+            SizeRun(self.base,GradingRule(4,6,multiple=4))
+
+    def test_too_small(self):
+        with self.assertRaises(ValueError):
+            SizeRun(self.base,GradingRule(8,6),steps=range(-6,1))
+
+if __name__=="__main__": unittest.main()
@@ -0,0 +1,83 @@
+import sys
+sys.path.append('..')
+import io
+import json
+import unittest
+from src.i18n import *
+from src.sock import *
+from src.cli import process
+
+GUAGE=Guage((32,4),(32,4),'in')
+
+def sample_patterns():
+    patterns=[]
+    for a in (7.2,7.8,8.2):
+        for extra in ({},{'leg_length':12,'around_calf':13},{'leg_length':5}):
+            for exact in (False,True):
+                patterns.append(ToeUpSockPattern(dict({'around_foot':a,'toe_to_heel':9.5},**extra),GUAGE,verbose=False,exact=exact))
+    return patterns
+
+class TestMessageCatalog(unittest.TestCase):
+    def test_messages(self):
+        """
+        Message ids only have placeholders for values that change from pattern to pattern
+        """
+        for p in sample_patterns():
+            self.assertEqual(tuple(str(m) for m in p.messages()),p.directions())
+            for m in p.messages():
+                self.assertNotIn("Figure {",m.msgid)
+                self.assertNotIn("K{",m.msgid)
+                self.assertNotIn("Needle {",m.msgid)
+        sock=sample_patterns()[0]
+        self.assertEqual(sock.section("cuff").messages()[1],Message("Repeat Row 1 for {0} rows.",(sock.section("cuff").n_rows(),)))
+
+    def test_english(self):
+        for p in sample_patterns():
+            self.assertEqual(render(p),p.directions())
+
+    def test_complete(self):
+        """
+        Every catalog translates every line the sections can write
+        """
+        patterns=sample_patterns()
+        for language in languages():
+            if language==DEFAULT_LANGUAGE:
+                continue
+            catalog=message_catalog(language)
+            for p in patterns:
+                self.assertEqual(catalog.missing(p.messages()),[],f"{language} is missing translations")
+                self.assertEqual(catalog.missing(p.section('heel').summary_messages()),[])
+
+    def test_french(self):
+        sock=ToeUpSockPattern({'around_foot':8.2,'toe_to_heel':9.5},GUAGE,verbose=False)
+        fr=render(sock,"fr")
+        self.assertEqual(len(fr),len(sock.directions()))
+        self.assertTrue(fr[0].startswith("Monter 30 mailles (15 par aiguille)"))
+        self.assertEqual(fr[-2],"Répéter le rang 1 pendant 8 rangs.")
+
+    def test_sections_not_rebuilt(self):
+        sock=ToeUpSockPattern({'around_foot':8.2,'toe_to_heel':9.5,'leg_length':12,'around_calf':13},GUAGE,verbose=False)
+        sections=sock.pattern_sections
+        for language in languages():
+            render(sock,language)
+        self.assertTrue(all(a is b for a,b in zip(sections,sock.pattern_sections)))
+
+    def test_cached(self):
+        self.assertIs(message_catalog("de"),message_catalog("de"))
+        with self.assertRaises(ValueError):
+            message_catalog("xx")
+        with self.assertRaises(ValueError):
+            message_catalog("../requests")
+
+    def test_bad_translation(self):
+        with self.assertRaises(ValueError):
+            MessageCatalog("xx",{"Knit {0} rows.":"Stricke {1} Runden."})
+        catalog=MessageCatalog("xx",{"Knit {0} rows.":"{0} Runden stricken."})
+        self.assertEqual(catalog.render([Message("Knit {0} rows.",(12,)),Message("Bind off.")]),("12 Runden stricken.","Bind off."))
+
+    def test_cli(self):
+        out=io.StringIO()
+        process(['{"around_foot": 8.2, "toe_to_heel": 9.5, "guage": {"s_per_unit": [32, 4], "r_per_unit": [32, 4], "units": "in"}}'],out,language="es")
+        self.assertTrue(json.loads(out.getvalue())["directions"][0].startswith("Montar"))
+
+if __name__=="__main__": unittest.main()
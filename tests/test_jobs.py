@@ -0,0 +1,97 @@
+import sys
+sys.path.append('..')
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from multiprocessing import Process
+from src.jobs import *
+
+def run_worker(input_path,output_dir,name):
+    JobRunner(input_path,output_dir,chunk_size=7,worker=name).run()
+
+class TestJobRunner(unittest.TestCase):
+    def setUp(self):
+        self.dir=tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree,self.dir)
+        self.input_path=os.path.join(self.dir,"feet.jsonl")
+        self.lines=[json.dumps({"id":i,"around_foot":7.0+(i%20)/10,"toe_to_heel":9.0,"guage":{"s_per_unit":[32,4],"r_per_unit":[32,4],"units":"in"}})+"\n" for i in range(50)]
+        with open(self.input_path,"w") as f:
+            f.writelines(self.lines)
+        self.output_dir=os.path.join(self.dir,"out")
+
+    def expected(self):
+        out=io.StringIO()
+        process(self.lines,out)
+        return out.getvalue()
+
+    def merged(self,runner):
+        out=io.StringIO()
+        runner.merge(out)
+        return out.getvalue()
+
+    def test_plan(self):
+        runner=JobRunner(self.input_path,self.output_dir,chunk_size=7)
+        self.assertEqual(runner.plan(),8)
+        self.assertEqual(runner.plan(),8,"Planning again must not add chunks")
+        self.assertEqual(runner.status(),{PENDING:8})
+
+    def test_resume(self):
+        """
+        A run that stops part way is finished by the next run without redoing chunks
+        """
+        first=JobRunner(self.input_path,self.output_dir,chunk_size=7,worker="first")
+        self.assertEqual(first.run(max_chunks=3),3)
+        self.assertFalse(first.done())
+        with self.assertRaises(ValueError):
+            first.merge(io.StringIO())
+        second=JobRunner(self.input_path,self.output_dir,chunk_size=7,worker="second")
+        self.assertEqual(second.run(),5)
+        self.assertTrue(second.done())
+        self.assertEqual(self.merged(second),self.expected())
+
+    def test_resume_other_chunk_size(self):
+        """
+        A run resumed with a different chunk size keeps the planned chunks and their line numbers
+        """
+        self.lines[20]="not json\n"
+        with open(self.input_path,"w") as f:
+            f.writelines(self.lines)
+        first=JobRunner(self.input_path,self.output_dir,chunk_size=7,worker="first")
+        self.assertEqual(first.run(max_chunks=1),1)
+        second=JobRunner(self.input_path,self.output_dir,chunk_size=10,worker="second")
+        self.assertEqual(second.run(),7)
+        merged=self.merged(second)
+        self.assertEqual(merged,self.expected())
+        self.assertIn('{"line": 21,',merged)
+
+    def test_expired_lease(self):
+        """
+        A chunk claimed by a worker that died is claimed again once its lease is up
+        """
+        dead=JobRunner(self.input_path,self.output_dir,chunk_size=7,worker="dead",lease=0)
+        dead.plan()
+        db=dead._connect()
+        self.assertEqual(dead.claim(db)[0],0)
+        db.close()
+        alive=JobRunner(self.input_path,self.output_dir,chunk_size=7,worker="alive",lease=0)
+        self.assertEqual(alive.run(),8)
+        self.assertEqual(self.merged(alive),self.expected())
+
+    def test_workers_share_job(self):
+        """
+        Several processes working on one job produce every chunk exactly once
+        """
+        workers=[Process(target=run_worker,args=(self.input_path,self.output_dir,f"w{i}")) for i in range(3)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        runner=JobRunner(self.input_path,self.output_dir,chunk_size=7)
+        self.assertTrue(runner.done())
+        self.assertEqual(self.merged(runner),self.expected())
+        self.assertEqual(sorted(f for f in os.listdir(self.output_dir) if f.endswith(".tmp")),[])
+
+if __name__=="__main__": unittest.main()
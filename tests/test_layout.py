@@ -0,0 +1,86 @@
+import sys
+sys.path.append('..')
+import unittest
+from src.layout import *
+from src.grading import GradingRule, SizeRun
+
+GUAGE=Guage((32,4),(32,4),'in')
+
+class TestSplit(unittest.TestCase):
+    def test_whole(self):
+        self.assertEqual(split_column([10,9,8],3),[[4,3,3],[3,3,3],[3,3,2]])
+        self.assertEqual([list(c) for c in split_column(array('l',[10,9]),2)],[[5,5],[5,4]])
+
+    def test_magic_loop_unchanged(self):
+        """
+        Magic loop keeps each section's own (front,back) counts, floats included
+        """
+        p=ToeUpSockPattern({'around_foot':8.2,'toe_to_heel':9.5},GUAGE,verbose=False)
+        ends=section_ends(p)
+        for name,counts in pattern_layout(p,MAGIC_LOOP).items():
+            self.assertEqual(counts,ends[name])
+        self.assertEqual(pattern_layout(p,TWO_CIRCULARS),pattern_layout(p,MAGIC_LOOP))
+
+    def test_dpns(self):
+        p=ToeUpSockPattern.from_stitches(SockStitches(64,72,8),GUAGE,verbose=False)
+        self.assertEqual(pattern_layout(p,DPN_4)["gusset"],(32,24,24))
+        self.assertEqual(pattern_layout(p,DPN_5)["instep"],(16,16,16,16))
+        for l in LAYOUTS.values():
+            for name,counts in pattern_layout(p,l).items():
+                self.assertEqual(len(counts),l.n_needles())
+                self.assertEqual(sum(counts),sum(section_ends(p)[name]))
+
+    def test_needle_line(self):
+        self.assertEqual(needle_line((16,16,32),DPN_4),"16 stitches on DPN 1, 16 stitches on DPN 2 and 32 stitches on DPN 3")
+        self.assertEqual(needle_line((16,32)),"16 stitches on Needle 1 and 32 stitches on Needle 2")
+        with self.assertRaises(ValueError):
+            needle_line((16,16),DPN_5)
+
+class TestDirections(unittest.TestCase):
+    pattern=ToeUpSockPattern.from_stitches(SockStitches(64,72,8),GUAGE,verbose=False)
+    leg=ToeUpSockPattern({'around_foot':8.2,'toe_to_heel':9.5,'leg_length':12,'around_calf':13},GUAGE,verbose=False)
+
+    def test_magic_loop_unchanged(self):
+        for p in (self.pattern,self.leg):
+            self.assertEqual(layout_directions(p,MAGIC_LOOP),p.directions())
+
+    def test_no_magic_loop_wording(self):
+        """
+        Every line that names a needle is written for the layout's needles
+        """
+        for p in (self.pattern,self.leg):
+            rendered=render_layouts(p)
+            self.assertEqual(set(rendered.keys()),set(LAYOUTS.keys()))
+            self.assertNotEqual(rendered["3 DPNs"],rendered["magic loop"])
+            for l in (DPN_3,DPN_4,DPN_5):
+                directions=rendered[l.name]
+                self.assertEqual(len(directions),len(p.directions()))
+                for line in directions:
+                    for magic_loop in ("Needle","two needles","per needle","each needle","cable"):
+                        self.assertNotIn(magic_loop,line,l.name)
+                self.assertIn(f"DPN {l.n_needles()}",directions[1])
+
+    def test_counts(self):
+        rendered=render_layouts(self.pattern)
+        self.assertIn("Repeat Rows 1 and 2 until there are 32 stitches on Circular 1 and 48 stitches on Circular 2.",rendered["two circulars"])
+        self.assertIn("Repeat Rows 1 and 2 until there are 32 stitches on DPN 1, 24 stitches on DPN 2 and 24 stitches on DPN 3.",rendered["4 DPNs"])
+        leg_end=layout_directions(self.leg,DPN_5)[-4]
+        self.assertTrue(leg_end.startswith(f"There are now {self.leg.end_stitches('leg')} stitches ("),leg_end)
+
+class TestSizeRun(unittest.TestCase):
+    def test_matches_patterns(self):
+        """
+        Laying out a size run by columns gives the same counts as building every size's sections
+        """
+        base=ToeUpSockPattern.from_stitches(SockStitches(64,72,8),GUAGE,verbose=False)
+        run=SizeRun(base,GradingRule(8,4),steps=range(-2,3))
+        layouts=size_run_layouts(run)
+        self.assertEqual(set(layouts.keys()),set(LAYOUTS.keys()))
+        for i in range(len(run)):
+            p=run.pattern(i)
+            for name,l in LAYOUTS.items():
+                for section,counts in pattern_layout(p,l).items():
+                    self.assertEqual(tuple(c[i] for c in layouts[name][section]),counts,(i,name,section))
+
+if __name__=="__main__":
+    unittest.main()
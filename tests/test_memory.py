@@ -0,0 +1,53 @@
+import sys
+sys.path.append('..')
+import io
+import unittest
+from src.memory import *
+
+class TestDeepSizeof(unittest.TestCase):
+    def test_shared_counted_once(self):
+        shared=["x"*1000]
+        self.assertEqual(deep_sizeof([shared,shared]),sys.getsizeof([shared,shared])+deep_sizeof(shared))
+        self.assertGreater(deep_sizeof(shared),1000)
+
+    def test_slots(self):
+        node=IntervalNodeLike()
+        self.assertGreater(deep_sizeof(node),sys.getsizeof(node)+1000)
+
+class IntervalNodeLike:
+    __slots__=("data",)
+    def __init__(self):
+        self.data="y"*1000
+
+class TestMemoryReport(unittest.TestCase):
+    patterns=workload(20)
+
+    def test_breakdowns(self):
+        report=memory_report(self.patterns)
+        self.assertEqual(sum(b for c,b in report.by_type.values()),report.total)
+        self.assertEqual(sum(c for c,b in report.by_type.values()),report.n_objects)
+        for name in ("IncOrDecPatternMeasure._measure_values","IncOrDecPatternMeasure._all_measures","HeelTurnML._directions"):
+            self.assertIn(name,report.by_attribute)
+        self.assertIn("NamedTuple SockStitches",report.by_type)
+        self.assertEqual(set(report.by_section.keys()),{"ToeUpToeML","InstepML","ToeUpGuessetML","HeelTurnML","BasicCuff"})
+        self.assertLessEqual(sum(b for c,b in report.by_section.values()),report.total)
+        top=report.top("by_type",3)
+        self.assertEqual(len(top),3)
+        self.assertGreaterEqual(top[0].n_bytes,top[1].n_bytes)
+
+    def test_directions_cost(self):
+        self.assertGreater(memory_report(self.patterns).total,memory_report(workload(20,directions=False)).total)
+
+    def test_traced(self):
+        result,allocations,n_bytes=traced(workload,5)
+        self.assertEqual(len(result),5)
+        self.assertGreater(n_bytes,0)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_cli(self):
+        out=io.StringIO()
+        self.assertEqual(main(["-n","10","--top","3"],out=out),0)
+        self.assertIn("By section class",out.getvalue())
+
+if __name__=="__main__":
+    unittest.main()
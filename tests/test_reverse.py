@@ -0,0 +1,76 @@
+import sys
+sys.path.append('..')
+import unittest
+from src.reverse import *
+
+class TestReverseIndex(unittest.TestCase):
+    index=ReverseIndex()
+
+    def test_only_recommended_needles(self):
+        for weight,needle in self.index.pairs():
+            self.assertIn(needle,RECOMMENDED_NEEDLES_IN_MM[weight])
+
+    def test_options_fit(self):
+        """
+        Every option found for a foot fits it within the tolerance, the way FitOptimizer measures fit error
+        """
+        options=self.index.options(8.2,weights=[1])
+        self.assertGreater(len(options),0)
+        for o in options:
+            ideal=o.guage.stitches(8.2*FOOT_EASE)
+            self.assertLessEqual(abs(o.s_around_foot-ideal)/ideal,self.index.tolerance)
+            self.assertEqual(o.yarn_weight,1)
+        best=FitOptimizer({'around_foot':8.2,'toe_to_heel':9.5},1).best()
+        self.assertIn((best.needle_size,best.stitches.s_around_foot),[(o.needle_size,o.s_around_foot) for o in options])
+
+    def test_ranges_match_brute_force(self):
+        needles=[2.25,2.5]
+        weights=[0,1]
+        ranges=self.index.ranges(needles,weights)
+        for lo,hi in zip(ranges,ranges[1:]):
+            self.assertLess(lo[1],hi[0])
+        for i in range(200):
+            foot=3+i*0.05
+            brute=len(self.index.options(foot,needles=needles,weights=weights))>0
+            self.assertEqual(self.index.knittable(foot,needles=needles,weights=weights),brute,foot)
+            self.assertEqual(self.index.query_batch([(needles,weights)],around_foot=foot),[brute])
+
+    def test_unowned_needles(self):
+        self.assertEqual(self.index.ranges([1.25],[4]),[])
+        self.assertFalse(self.index.knittable(8.2,needles=[1.25]))
+        with self.assertRaises(ValueError):
+            self.index.ranges([2.6],[1])
+
+    def test_batch(self):
+        inventories=[([2.25],[1]),([4.5,5.0],[4]),([2.25],[1])]
+        found=self.index.query_batch(inventories)
+        self.assertEqual(found[0],found[2])
+        self.assertEqual(found,[self.index.ranges(n,w) for n,w in inventories])
+        with self.assertRaises(ValueError):
+            self.index.query_batch(inventories,around_foot=[8.2])
+
+    def test_ease(self):
+        eased=ReverseIndex(ease=True)
+        measured=self.index.ranges(weights=[1])
+        adjusted=eased.ranges(weights=[1])
+        self.assertEqual(len(adjusted),len(measured))
+        for (lo,hi),(elo,ehi) in zip(measured,adjusted):
+            self.assertAlmostEqual(lo*FOOT_EASE,elo)
+            self.assertAlmostEqual(hi*FOOT_EASE,ehi)
+
+    def test_cm(self):
+        """
+        A cm index has the inch index's intervals in cm, and a 21.6 cm foot gets the same stitches as an 8.5 inch one
+        """
+        cm=ReverseIndex(units='cm')
+        inches=self.index.ranges(weights=[1])
+        centimetres=cm.ranges(weights=[1])
+        self.assertEqual(len(centimetres),len(inches))
+        for (lo,hi),(clo,chi) in zip(inches,centimetres):
+            self.assertAlmostEqual(lo*2.54,clo)
+            self.assertAlmostEqual(hi*2.54,chi)
+        self.assertEqual(sorted(o.s_around_foot for o in cm.options(8.5*2.54,weights=[1])),
+            sorted(o.s_around_foot for o in self.index.options(8.5,weights=[1])))
+
+if __name__=="__main__":
+    unittest.main()
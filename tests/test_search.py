@@ -0,0 +1,74 @@
+import sys
+sys.path.append('..')
+import os
+import tempfile
+import unittest
+from src.search import *
+
+GUAGES=(Guage((30,4),(30,4),'in'),Guage((32,4),(32,4),'in'),Guage((7.5,1),(8,1),'in'))
+
+def make_patterns():
+    return [ToeUpSockPattern.from_stitches(SockStitches(s,r,8),g,verbose=False) for g in GUAGES for s in (56,60,64,68) for r in (64,72)]
+
+class TestPatternIndex(unittest.TestCase):
+    patterns=make_patterns()
+
+    def scan(self,test):
+        return [i for i,p in enumerate(self.patterns) if test(p)]
+
+    def test_equality(self):
+        index=PatternIndex(self.patterns)
+        self.assertEqual(index.find(s_around_foot=64,guage_s_per_4=30),
+            self.scan(lambda p:p.stitches.s_around_foot==64 and p.guage.stitches(4)==30))
+        self.assertEqual(len(index.find(s_around_foot=64,guage_s_per_4=30)),4,"30 per 4 in and 7.5 per 1 in are the same guage")
+        self.assertEqual(index.find(heel_start_stitches=45),self.scan(lambda p:p.start_stitches("heel")==45))
+        self.assertEqual(index.find(s_around_foot=63),[])
+
+    def test_range(self):
+        index=PatternIndex(self.patterns)
+        self.assertEqual(index.find(s_around_foot=(58,66),instep_rows=(None,40)),
+            self.scan(lambda p:58<=p.stitches.s_around_foot<=66 and p.stitches.instep_rows<=40))
+        self.assertEqual(index.count(s_around_foot=(100,None)),0)
+        self.assertEqual(index.count(),len(self.patterns))
+        with self.assertRaises(ValueError):
+            index.find(ankle_stitches=3)
+
+    def test_missing_sections_not_indexed(self):
+        index=PatternIndex(self.patterns)
+        self.assertEqual(index.count(leg_n_rows=(None,None)),0)
+
+    def test_incremental(self):
+        """
+        Patterns appended after a column has been searched are found too
+        """
+        index=PatternIndex(self.patterns[:10])
+        before=index.find(s_around_foot=(60,64))
+        for i,p in enumerate(self.patterns[10:],start=10):
+            index.append(p,key=1000+i)
+        after=index.find(s_around_foot=(60,64))
+        self.assertEqual(after[:len(before)],before)
+        self.assertEqual(after,[i if i<10 else 1000+i for i in self.scan(lambda p:60<=p.stitches.s_around_foot<=64)])
+
+    def test_round_trip(self):
+        fd,path=tempfile.mkstemp(suffix=".knitidx")
+        os.close(fd)
+        self.addCleanup(os.remove,path)
+        index=PatternIndex()
+        index.extend(self.patterns,keys=range(5,5+len(self.patterns)))
+        index.write(path)
+        loaded=PatternIndex.load(path)
+        self.assertEqual(len(loaded),len(index))
+        self.assertEqual(loaded.find(gusset_end_stitches=(70,80)),index.find(gusset_end_stitches=(70,80)))
+        loaded.append(self.patterns[0],key=99)
+        self.assertIn(99,loaded.find(s_around_foot=self.patterns[0].stitches.s_around_foot))
+
+    def test_not_an_index(self):
+        fd,path=tempfile.mkstemp(suffix=".knitcol")
+        os.close(fd)
+        self.addCleanup(os.remove,path)
+        PatternColumns(self.patterns).write(path)
+        with self.assertRaises(ValueError):
+            PatternIndex.load(path)
+
+if __name__=="__main__":
+    unittest.main()
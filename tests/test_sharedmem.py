@@ -0,0 +1,67 @@
+import sys
+sys.path.append('..')
+import unittest
+from math import isnan
+from src.sharedmem import *
+from src.export import pattern_row
+
+GUAGE={"s_per_unit":[32,4],"r_per_unit":[32,4],"units":"in"}
+#Feet with an even toe cast on, then one that can't be made into a sock
+RECORDS=[{"id":i,"around_foot":7.0+(i%10)/10,"toe_to_heel":9.0+(i%5)/10,"guage":GUAGE} for i in range(40)
+    if round(8*0.9*(7.0+(i%10)/10)/2)%2==0]+[{"id":"bad","around_foot":8.0,"toe_to_heel":9.0}]
+
+class TestGenerateShared(unittest.TestCase):
+    def test_matches_serial(self):
+        """
+        Columns and directions read back from shared memory match patterns made in this process
+        """
+        with generate_shared(RECORDS,processes=2,chunk_size=7) as batch:
+            self.assertEqual(len(batch),len(RECORDS))
+            self.assertEqual(batch.columns(),COLUMNS)
+            self.assertEqual(batch.n_errors,1)
+            for i,record in enumerate(RECORDS[:-1]):
+                pattern=pattern_from_record(record)
+                self.assertTrue(batch.ok(i))
+                self.assertIsNone(batch.error(i))
+                for c,v in zip(COLUMNS,pattern_row(pattern)):
+                    if isnan(v):
+                        self.assertTrue(isnan(batch[c][i]))
+                    else:
+                        self.assertEqual(batch[c][i],v)
+                self.assertEqual(batch.directions(i),pattern.directions())
+
+    def test_error(self):
+        with generate_shared(RECORDS,processes=2) as batch:
+            last=len(RECORDS)-1
+            self.assertFalse(batch.ok(last))
+            self.assertIn("guage",batch.error(last))
+            with self.assertRaises(ValueError):
+                batch.directions(last)
+
+    def test_zero_guage(self):
+        """
+        A record with a zero in its guage fails on its own, not the whole batch
+        """
+        records=RECORDS[:3]+[{"id":"zero","around_foot":8.0,"toe_to_heel":9.0,"guage":{**GUAGE,"s_per_unit":[32,0]}}]
+        with generate_shared(records,processes=1) as batch:
+            self.assertEqual(batch.n_errors,1)
+            self.assertTrue(batch.ok(2))
+            self.assertFalse(batch.ok(3))
+
+    def test_no_directions(self):
+        with generate_shared(RECORDS[:4],processes=1,directions=False) as batch:
+            self.assertEqual(batch.directions(0),())
+            self.assertEqual(batch["s_around_foot"][0],pattern_from_record(RECORDS[0]).stitches.s_around_foot)
+
+    def test_text_size(self):
+        """
+        Directions and error messages take just the bytes they need, whatever their length
+        """
+        leg={**RECORDS[0],"leg_length":30.0,"around_ankle":7.0,"around_calf":14.0,"calf_height":20.0}
+        records=RECORDS[:2]+[leg,RECORDS[-1]]
+        with generate_shared(records,processes=2,chunk_size=2) as batch:
+            self.assertEqual(batch.directions(2),pattern_from_record(leg).directions())
+            texts=[LINE_SEPARATOR.join(batch.directions(i)) for i in range(3)]+[batch.error(3)]
+            self.assertEqual(batch.text_size,sum(len(text.encode()) for text in texts))
+
+if __name__=="__main__": unittest.main()
@@ -0,0 +1,77 @@
+import sys
+sys.path.append('..')
+import random
+import unittest
+from array import array
+from src.sizing import *
+
+def population(n=3000,seed=7):
+    """
+    Three groups of feet (small, medium and large) near whole sizes at 32 stitches per 4 in
+    """
+    rng=random.Random(seed)
+    around=array('d')
+    length=array('d')
+    for i in range(n):
+        a,l=((7.8,8.5),(8.9,9.5),(10.0,10.5))[i%3]
+        around.append(rng.gauss(a,0.1))
+        length.append(rng.gauss(l,0.15))
+    return around,length
+
+class TestSizeChart(unittest.TestCase):
+    guage=Guage((32,4),(32,4),'in')
+    around,length=population()
+    chart=SizeChart(guage,3,chunk_size=500)
+    sizes=chart.fit(around,length)
+
+    def test_three_sizes(self):
+        self.assertEqual(len(self.sizes),3)
+        self.assertEqual(sum(s.count for s in self.sizes),len(self.around))
+        self.assertEqual(self.chart.collapsed,[])
+        #Snapping to a multiple moves a size by up to half a multiple of stitches
+        delta=self.guage.units_to_stitches(STITCH_MULTIPLE/2)/FOOT_EASE
+        for s,expected in zip(self.sizes,(7.8,8.9,10.0)):
+            self.assertAlmostEqual(s.around_foot,expected,delta=delta)
+            self.assertEqual(s.count,1000)
+
+    def test_whole_stitches(self):
+        for s in self.sizes:
+            self.assertEqual(s.stitches.s_around_foot%STITCH_MULTIPLE,0)
+            self.assertIsInstance(s.stitches.r_toe_to_heel,int)
+            self.assertEqual(s.stitches.r_per_inch,8)
+
+    def test_coverage(self):
+        self.assertGreater(self.chart.coverage(),0.9)
+        for s in self.sizes:
+            self.assertLess(s.mean_error,self.chart.tolerance)
+
+    def test_chunk_size_does_not_matter(self):
+        one_chunk=SizeChart(self.guage,3,chunk_size=len(self.around)).fit(self.around,self.length)
+        self.assertEqual([s.stitches for s in one_chunk],[s.stitches for s in self.sizes])
+
+    def test_one_size(self):
+        sizes=SizeChart(self.guage,1).fit(self.around,self.length)
+        self.assertEqual(len(sizes),1)
+        self.assertEqual(sizes[0].count,len(self.around))
+
+    def test_collapsed(self):
+        """
+        Centres that snap onto the same whole size are reported, not silently dropped
+        """
+        chart=SizeChart(self.guage,6)
+        sizes=chart.fit(self.around,self.length)
+        self.assertLess(len(sizes),6)
+        self.assertTrue(chart.collapsed)
+        for c in chart.collapsed:
+            self.assertIn(c,[s.stitches[:2] for s in sizes])
+        self.assertIn("collapsed",str(chart))
+
+    def test_bad_input(self):
+        with self.assertRaises(ValueError):
+            SizeChart(self.guage,0)
+        with self.assertRaises(ValueError):
+            SizeChart(self.guage,2).fit([8.0],[])
+        with self.assertRaises(ValueError):
+            SizeChart(self.guage,2,multiple=4)
+
+if __name__=="__main__": unittest.main()
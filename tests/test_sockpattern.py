@@ -109,4 +109,191 @@ class TestPatternCalculator(unittest.TestCase):
         """
         self.assertEqual(self.sock.start_stitches('cuff'),self.sock.stitches.s_around_foot)
         
+class TestHeelTurn(unittest.TestCase):
+    def test_standard_heel(self):
+        """
+        A 30 stitch heel ending with 18 stitches: Row 1 k17, Row 2 p5, 12 rows
+        """
+        g=heel_turn_geometry(30,18)
+        self.assertEqual((g.n_rows,g.first_turn,g.second_turn,g.left_side,g.right_side),(12,17,5,10,10))
+
+    def test_every_stitch_worked(self):
+        """
+        For any size the short rows use up both sides and finish with end_stitches
+        """
+        for n_around in range(16,160,4):
+            for start,end in ((n_around*3//4,n_around//2),(n_around*3//4+1,n_around//2)):
+                g=heel_turn_geometry(start,end)
+                self.assertEqual(g.first_turn+3+g.left_side,start)
+                self.assertEqual(g.first_turn+2-(g.second_turn+4),g.right_side)
+                self.assertEqual(2*((g.n_rows-1)//2),g.left_side)
+                self.assertEqual(2*((g.n_rows-2)//2),g.right_side)
+                self.assertEqual(g.second_turn+g.n_rows+1,end)
+
+    def test_rows_written(self):
+        heel=HeelTurnML({"start_stitches":48,"end_stitches":32})
+        rows=list(heel.iter_rows())
+        self.assertEqual(len(rows),16)
+        self.assertEqual(rows[0],"Row 1: Knit 31 ssk k1,turn.")
+        self.assertEqual(rows[1],"Row 2: S1, p15, p2tog, p1, turn.")
+        self.assertEqual(rows[-1],"Row 16: S1, p29, p2tog, p1, turn.")
+        self.assertEqual(heel.directions()[1:17],tuple(rows))
+        self.assertEqual(len(heel.summary()),6)
+
+    def test_too_small(self):
+        with self.assertRaises(ValueError):
+            heel_turn_geometry(10,9)
+        with self.assertRaises(ValueError):
+            heel_turn_geometry(30,10)
+
+    def test_batch(self):
+        starts=[36,42,48,54]
+        ends=[24,28,32,36]
+        columns=heel_turn_geometries(starts,ends)
+        self.assertEqual(list(columns["n_rows"]),[12,14,16,18])
+        for i,(start,end) in enumerate(zip(starts,ends)):
+            self.assertEqual(tuple(columns[f][i] for f in HeelGeometry._fields),heel_turn_geometry(start,end))
+
+class TestLazySections(unittest.TestCase):
+    foot_measure_dict={'around_foot':4.1*2,'toe_to_heel':9.5}
+    guage=Guage((30,4),(30,4),'in')
+
+    def test_stitches_only(self):
+        """
+        Without validation no sections are built until asked for
+        """
+        s=ToeUpSockPattern(self.foot_measure_dict,self.guage,validate=False)
+        self.assertEqual(s._sections,{})
+        self.assertAlmostEqual(s.stitches.s_around_foot,4.1*2*30/4*0.9)
+        s.section('cuff')
+        self.assertEqual(list(s._sections.keys()),['cuff'])
+
+    def test_cached(self):
+        s=ToeUpSockPattern(self.foot_measure_dict,self.guage,verbose=False)
+        toe=s.section('toe')
+        self.assertIs(s.pattern_sections.toe,toe)
+        s.calculate_pattern()
+        self.assertIs(s.section('toe'),toe,"Recalculating with the same stitches should keep built sections")
+
+    def test_new_stitches(self):
+        """
+        Changing stitches throws the old sections away
+        """
+        s=ToeUpSockPattern(self.foot_measure_dict,self.guage,verbose=False)
+        toe=s.section('toe')
+        s.stitches=SockStitches(64,70,8)
+        self.assertIsNot(s.section('toe'),toe)
+        self.assertEqual(s.end_stitches('toe'),64)
+
+    def test_no_leg(self):
+        s=ToeUpSockPattern(self.foot_measure_dict,self.guage,verbose=False)
+        self.assertIsNone(s.section('leg'))
+        with self.assertRaises(ValueError):
+            s.section('ankle')
+
+class TestLeg(unittest.TestCase):
+    guage=Guage((32,4),(32,4),'in')
+    leg_dict={'around_foot':8.2,'toe_to_heel':9.5,'leg_length':12,'around_calf':13.5,'around_ankle':7.5,'calf_height':9}
+
+    def test_knee_high(self):
+        s=ToeUpSockPattern(self.leg_dict,self.guage,verbose=False)
+        leg=s.section('leg')
+        self.assertEqual(leg.start_stitches(),s.stitches.s_around_foot)
+        self.assertEqual(leg.n_rows(),96)
+        self.assertEqual(s.leg_stitches.r_calf,72)
+        #13.5in calf with ease is 97.2 stitches: 19 increase rows from 59.04
+        self.assertEqual(len(leg.schedule()),19)
+        self.assertAlmostEqual(leg.end_stitches(),s.stitches.s_around_foot+38)
+        self.assertEqual(s.start_stitches('cuff'),leg.end_stitches())
+        self.assertLessEqual(leg.schedule()[-1],72)
+        self.assertEqual(list(leg.schedule()),sorted(set(leg.schedule())))
+        #The ankle is narrower than the foot, so the leg knits straight before the first increase
+        self.assertGreater(leg.schedule()[0],1)
+        self.assertEqual(leg.stitches_after(leg.schedule()[0]-1),leg.start_stitches())
+        self.assertEqual(leg.needle_counts(96)[0],s.stitches.s_around_foot/2)
+
+    def test_straight_leg(self):
+        s=ToeUpSockPattern({'around_foot':8.2,'toe_to_heel':9.5,'leg_length':6},self.guage,verbose=False)
+        self.assertEqual(s.section('leg').schedule(),())
+        self.assertEqual(s.directions()[-4],"Leg: Knit all stitches around for 48 rows.")
+
+    def test_no_leg(self):
+        s=ToeUpSockPattern({'around_foot':8.2,'toe_to_heel':9.5},self.guage,verbose=False)
+        self.assertIsNone(s.leg_stitches)
+        self.assertEqual(s.start_stitches('cuff'),s.stitches.s_around_foot)
+
+    def test_bad_join(self):
+        s=ToeUpSockPattern(self.leg_dict,self.guage,verbose=False)
+        s.section('cuff')._measurements.start_stitches(60)
+        with self.assertRaises(ValueError) as e:
+            s.check_myself()
+        self.assertIn("Leg and cuff won't meet",str(e.exception))
+
+    def test_batch(self):
+        """
+        The batch schedule matches the schedule of each leg
+        """
+        starts=[56,60,64,72]
+        ankles=[52,64,60,70]
+        calves=[84,80,64,100]
+        calf_rows=[72,60,50,90]
+        columns=leg_schedules(starts,ankles,calves,calf_rows)
+        self.assertEqual(len(columns["offsets"]),5)
+        for i in range(4):
+            rows=tuple(columns["rows"][columns["offsets"][i]:columns["offsets"][i+1]])
+            self.assertEqual(rows,leg_schedule(starts[i],ankles[i],calves[i],calf_rows[i]))
+            self.assertEqual(columns["end_stitches"][i],starts[i]+2*len(rows))
+        self.assertEqual(leg_schedule(64,60,64,50),())
+        with self.assertRaises(ValueError):
+            leg_schedule(56,56,100,10)
+
+class TestExact(unittest.TestCase):
+    foot_measure_dict={'around_foot':6.4,'toe_to_heel':9.5}
+    guage=Guage((25,4),(25,4),'in')
+
+    def test_whole_counts(self):
+        """
+        6.4in at 25 stitches per 4in is 36 stitches after ease. Floats give 36.00000000000001.
+        """
+        s=ToeUpSockPattern(self.foot_measure_dict,self.guage,verbose=False)
+        self.assertNotEqual(s.stitches.s_around_foot,36)
+        e=ToeUpSockPattern(self.foot_measure_dict,self.guage,verbose=False,exact=True)
+        self.assertEqual(e.stitches.s_around_foot,36)
+        self.assertIs(type(e.stitches.s_around_foot),int)
+        self.assertEqual(e.stitches.r_toe_to_heel,Fraction(855,16))
+        self.assertEqual(e.end_stitches('gusset'),45)
+        self.assertIn("18 stitches on Needle 1 and 27 stitches on Needle 2",e.section('gusset').how_to_end())
+
+    def test_reproducible(self):
+        """
+        Exact patterns with the same inputs have equal, hashable counts
+        """
+        a=ToeUpSockPattern(self.foot_measure_dict,self.guage,verbose=False,exact=True)
+        b=ToeUpSockPattern(dict(self.foot_measure_dict),Guage((25,4),(25,4),'in'),verbose=False,exact=True)
+        self.assertEqual(hash(a._section_inputs()),hash(b._section_inputs()))
+        self.assertEqual(a.directions(),b.directions())
+
+    def test_from_stitches(self):
+        """
+        Int stitches stay ints through every section
+        """
+        s=ToeUpSockPattern.from_stitches(SockStitches(64,72,8),Guage((32,4),(32,4),'in'),verbose=False)
+        for section in s.pattern_sections:
+            if section is not None:
+                self.assertIsInstance(section.start_stitches(),int)
+                self.assertIsInstance(section.end_stitches(),int)
+        self.assertEqual(s.section('toe').n_rows(),16)
+
+    def test_exact_div(self):
+        self.assertEqual(exact_div(64,4),16)
+        self.assertIs(type(exact_div(64,4)),int)
+        self.assertEqual(exact_div(27,4),Fraction(27,4))
+        self.assertEqual(exact_div(Fraction(9,2),Fraction(3,2)),3)
+        self.assertIs(type(exact_div(Fraction(9,2),Fraction(3,2))),int)
+        self.assertEqual(exact_div(27.0,4),6.75)
+        self.assertEqual(to_exact(0.9),Fraction(9,10))
+        self.assertIs(type(to_exact(Fraction(4,2))),int)
+        with self.assertRaises(TypeError):
+            to_exact("9")
+
 if __name__=="__main__": unittest.main()
\ No newline at end of file
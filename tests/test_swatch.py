@@ -0,0 +1,87 @@
+import sys
+sys.path.append('..')
+import json
+import os
+import random
+import tempfile
+import unittest
+from src.swatch import *
+
+class TestRobustEstimate(unittest.TestCase):
+    def test_outliers(self):
+        values=[7.5,7.6,7.4,7.5,7.7,7.3,7.5,75.0]
+        e=robust_estimate(values)
+        self.assertEqual(e.n_outliers,1)
+        self.assertEqual(e.n,7)
+        self.assertEqual(e.center,7.5)
+        self.assertLessEqual(e.low,e.center)
+        self.assertGreaterEqual(e.high,e.center)
+
+    def test_interval_shrinks(self):
+        rng=random.Random(3)
+        small=robust_estimate([rng.gauss(7.5,0.3) for i in range(20)])
+        large=robust_estimate([rng.gauss(7.5,0.3) for i in range(2000)])
+        self.assertLess(large.high-large.low,small.high-small.low)
+        self.assertTrue(large.low<=7.5<=large.high)
+
+    def test_same_values(self):
+        self.assertEqual(robust_estimate([8.0,8.0,8.0]),RobustEstimate(8.0,8.0,8.0,3,0))
+        with self.assertRaises(ValueError):
+            robust_estimate([])
+
+class TestSwatchTable(unittest.TestCase):
+    def make_table(self):
+        rng=random.Random(7)
+        table=SwatchTable()
+        for i in range(3000):
+            weight,needle,s_per_4=((1,2.25,30),(1,3.0,28),(3,4.0,22))[i%3]
+            knitter=f"k{i%10}"
+            if i%2:
+                table.append(weight,needle,rng.gauss(s_per_4,0.5),4,rng.gauss(s_per_4+4,0.5),4,knitter=knitter)
+            else:
+                table.append(weight,needle,rng.gauss(s_per_4,0.5),10.16,rng.gauss(s_per_4+4,0.5),10.16,units='cm',knitter=knitter)
+        #A few swatches measured over 1 inch instead of 4
+        for i in range(5):
+            table.append(1,2.25,30,1,34,1)
+        return table
+
+    def test_groups(self):
+        table=self.make_table()
+        groups=table.groups()
+        self.assertEqual(sorted(groups.keys()),[(1,2.25),(1,3.0),(3,4.0)])
+        self.assertEqual(len(groups[(1,2.25)]),1005)
+
+    def test_estimate(self):
+        estimates=self.make_table().estimate()
+        e=estimates[(1,2.25)]
+        self.assertEqual(e.stitches.n_outliers,5)
+        self.assertAlmostEqual(e.stitches.center,30,delta=0.1)
+        self.assertAlmostEqual(e.rows.center,34,delta=0.1)
+        self.assertEqual(e.guage().units,'in')
+        self.assertEqual(e.guage().s_per_unit[1],4)
+        cm=self.make_table().estimate(units='cm')[(3,4.0)]
+        self.assertAlmostEqual(cm.stitches.center,22/2.54,delta=0.1)
+
+    def test_compare_standard(self):
+        comparisons=compare_standard(self.make_table().estimate().values())
+        self.assertEqual(len(comparisons),3)
+        by_needle={c.estimate.needle_size:c for c in comparisons}
+        self.assertEqual(by_needle[2.25].predicted,StandardGuage().guess_guage(1,needle_size=2.25).s_per_unit[0])
+        self.assertAlmostEqual(by_needle[2.25].difference,by_needle[2.25].estimate.stitches.center-by_needle[2.25].predicted)
+        with self.assertRaises(ValueError):
+            compare_standard(self.make_table().estimate(units='cm').values())
+
+    def test_load(self):
+        fd,path=tempfile.mkstemp(suffix=".json")
+        with os.fdopen(fd,"w") as f:
+            json.dump([{"weight":1,"needle":2.25,"stitches":30,"stitch_length":4,"rows":34,"row_length":4,"units":"in","knitter":"a"},
+                {"weight":1,"needle":2.25,"stitches":12,"stitch_length":4,"rows":13,"row_length":4,"units":"cm"}],f)
+        self.addCleanup(os.remove,path)
+        table=SwatchTable.load(path)
+        self.assertEqual(len(table),2)
+        self.assertEqual(table.knitters,["a",None])
+        self.assertAlmostEqual(table["s_per_inch"][1],3*2.54)
+        with self.assertRaises(ValueError):
+            table.append(1,2.25,30,0,34,4)
+
+if __name__=="__main__": unittest.main()
@@ -0,0 +1,89 @@
+import sys
+sys.path.append('..')
+import os
+import tempfile
+import unittest
+from math import isnan
+from src.tables import *
+
+GUAGES=[Guage((30,4),(30,4),'in'),Guage((32,4),(32,4),'in')]
+
+def same_row(a,b):
+    return all((isnan(x) and isnan(y)) or x==y for x,y in zip(a,b))
+
+class TestSizeTable(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        fd,cls.path=tempfile.mkstemp(suffix=".knittab")
+        os.close(fd)
+        cls.n_ok=build_table(cls.path,guages=GUAGES,stitches=range(48,73,8),rows=range(50,81))
+
+    @classmethod
+    def tearDownClass(cls):
+        os.remove(cls.path)
+
+    def test_matches_live(self):
+        with SizeTable(self.path) as table:
+            self.assertEqual(len(table),2*4*31)
+            for g in GUAGES:
+                for s in (48,64,72):
+                    for r in (50,66,80):
+                        self.assertIsNotNone(table.position(s,r,g))
+                        self.assertTrue(same_row(table.lookup(s,r,g),live_row(s,r,g)))
+            self.assertEqual(table.misses,0)
+            self.assertEqual(table.lookup_dict(64,72,GUAGES[0])["heel_start_stitches"],48)
+
+    def test_fallback(self):
+        """
+        Points outside the table are worked out live
+        """
+        with SizeTable(self.path) as table:
+            for s,r,g in ((80,72,GUAGES[0]),(64,90,GUAGES[1]),(64,72,Guage((28,4),(28,4),'in')),(64.5,72,GUAGES[0])):
+                self.assertIsNone(table.position(s,r,g))
+                if s==int(s):
+                    self.assertTrue(same_row(table.lookup(s,r,g),live_row(s,r,g)))
+            self.assertEqual(table.position(64.0,72,GUAGES[0]),table.position(64,72,GUAGES[0]))
+            self.assertEqual(table.hits,0)
+
+    def test_not_knittable(self):
+        """
+        Points that can't be knit aren't in the table and raise the live error
+        """
+        with SizeTable(self.path) as table:
+            self.assertLess(self.n_ok,len(table))
+            self.assertIsNone(table.position(72,52,GUAGES[0]))
+            with self.assertRaises(NOT_KNITTABLE):
+                table.lookup(72,52,GUAGES[0])
+
+    def test_half_increase_rows(self):
+        """
+        Stitches around that give the toe or gusset half an increase row can't be knit, in or out of the table
+        """
+        with self.assertRaises(ValueError):
+            live_row(60,72,GUAGES[0])
+        fd,path=tempfile.mkstemp(suffix=".knittab")
+        os.close(fd)
+        self.addCleanup(os.remove,path)
+        self.assertEqual(build_table(path,guages=GUAGES[:1],stitches=range(52,61,4),rows=range(70,73)),3)
+        with SizeTable(path) as table:
+            self.assertIsNotNone(table.position(56,72,GUAGES[0]))
+            self.assertIsNone(table.position(52,72,GUAGES[0]))
+            self.assertIsNone(table.position(60,72,GUAGES[0]))
+
+    def test_lazy_open(self):
+        table=SizeTable(self.path)
+        self.assertIsNone(table._mapped)
+        table.lookup(64,72,GUAGES[0])
+        self.assertIsNotNone(table._mapped)
+        table.close()
+
+    def test_not_a_table(self):
+        fd,path=tempfile.mkstemp(suffix=".knitcol")
+        os.close(fd)
+        self.addCleanup(os.remove,path)
+        PatternColumns([]).write(path)
+        with self.assertRaises(ValueError):
+            SizeTable(path).open()
+
+if __name__=="__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import sys
+sys.path.append('..')
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from src.sock import *
+
+def make_sock(args):
+    foot_measure_dict,guage=args
+    sock=ToeUpSockPattern(foot_measure_dict,guage,verbose=False)
+    sock.write_directions()
+    return sock.stitches,sock.directions()
+
+class TestSharedInputs(unittest.TestCase):
+    def test_toe_does_not_change_input(self):
+        """
+        Toe fills in increase_x_every_y on its own copy of the measures
+        """
+        measures={"start_stitches":32,"end_stitches":64}
+        ToeUpToeML(measures)
+        self.assertEqual(measures,{"start_stitches":32,"end_stitches":64})
+
+    def test_no_shared_default_measures(self):
+        m1=PatternMeasure(["a"],[],{"a":1})
+        m2=PatternMeasure(["b"],[],{"b":1})
+        self.assertEqual(m1.all_measures(),{"a"})
+        self.assertEqual(m2.all_measures(),{"b"})
+
+    def test_write_directions_twice(self):
+        """
+        Writing directions again replaces them instead of doubling them
+        """
+        toe=ToeUpToeML({"start_stitches":32,"end_stitches":64,"increase_x_every_y":(4,2)})
+        toe.write_directions()
+        first=toe._directions
+        toe.write_directions()
+        self.assertEqual(toe._directions,first)
+        self.assertEqual(len(toe._directions),len(toe.directions()))
+
+    def test_evolve(self):
+        """
+        evolve returns a changed copy, with its calculated values calculated again, and leaves the original alone
+        """
+        m=IncOrDecPatternMeasure({"start_stitches":12,"end_stitches":32,"n_rows":10})
+        m2=m.evolve({"n_rows":20,"note":"longer"})
+        self.assertEqual(m.n_rows(),10)
+        self.assertEqual(m.increase_x_every_y(),(2,1))
+        self.assertEqual(m2.n_rows(),20)
+        self.assertEqual(m2.end_stitches(),32)
+        self.assertEqual(m2.increase_x_every_y(),(1,1))
+        self.assertNotIn("note",m.what_do_i_have())
+        self.assertIn("note",m2.all_measures())
+        self.assertEqual(m2.start_stitches(),12)
+        m3=m.evolve({"increase_x_every_y":(4,2)})
+        self.assertEqual((m3.end_stitches(),m3.n_rows()),(32,10),"end_stitches is calculated again from the new increase rate")
+
+class TestThreadPool(unittest.TestCase):
+    def test_stress(self):
+        """
+        Many threads sharing the same input objects get the same answers as a serial run
+        """
+        guage=Guage((30,4),(30,4),'in')
+        #Toes cast on an even number of stitches
+        feet=[{'around_foot':7+i/10,'toe_to_heel':9+i/10} for i in range(40) if round(guage.stitches(0.9*(7+i/10))/2)%2==0]
+        snapshot=[dict(f) for f in feet]
+        work=[(feet[i%len(feet)],guage) for i in range(400)]
+        serial=[make_sock(w) for w in work]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            threaded=list(pool.map(make_sock,work))
+        self.assertEqual(threaded,serial)
+        self.assertEqual(feet,snapshot)
+
+    def test_shared_pattern(self):
+        """
+        Reading directions from one pattern in many threads doesn't change it
+        """
+        sock=ToeUpSockPattern({'around_foot':8.2,'toe_to_heel':9.5},Guage((30,4),(30,4),'in'),verbose=False)
+        expected=sock.directions()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            found=list(pool.map(lambda i:sock.directions(),range(200)))
+        self.assertTrue(all(f==expected for f in found))
+
+if __name__=="__main__": unittest.main()